@@ -2,216 +2,43 @@
 Flask Backend Server - MySQL Database
 Provides REST API for streaming movie platform
 """
-from flask import Flask, request, jsonify, send_from_directory, session
+from flask import Flask, request, jsonify, send_from_directory, session, Response, stream_with_context
 from flask_cors import CORS
-from werkzeug.security import generate_password_hash, check_password_hash
 import secrets
+import json
+import zlib
+import math
 from dotenv import load_dotenv
-import re
-import unicodedata
 import os
 
 # Environment will be loaded by db_manager; no need to load here
 
-from db_manager import DatabaseConnection
+from db_manager import DatabaseConnection, get_background_db
+from search_helper import smart_search
+from cache_manager import StaleWhileRevalidateCache
+from cache_warmer import CacheWarmer
+from fuzzy_index import RefreshingTitleIndex
+from import_state import IMPORT_STATE_TABLE_SQL, IMPORT_BACKFILL_TABLE_SQL
+from db_indexes import ensure_indexes
+from movie_changes import MOVIE_CHANGES_TABLE_SQL, MovieChangeListener, record_movie_change
+from progress_buffer import ProgressBuffer, EpisodeProgressBuffer, EPISODE_PROGRESS_TABLE_SQL, MAX_POSITION_SECONDS
+from rating_summary import MOVIE_RATING_SUMMARY_TABLE_SQL, apply_review, remove_user_reviews, ensure_summaries, get_summary
+from comment_threads import thread_page_query, build_comment_tree, add_comment, backfill_comment_threads
+from favorites_cache import FavoriteIdCache
+from server_session import USER_SESSIONS_TABLE_SQL, load_secret_key, make_session_interface
+from user_cache import UserCache, PUBLIC_USER_COLUMNS
+from password_hasher import PasswordHasher, HasherBusyError
+from login_throttle import SlidingWindowLimiter
+from entitlements import EntitlementService, SubscriptionExpiryJob
 from flask_caching import Cache
 from functools import wraps
 from pymysql import IntegrityError
-from datetime import timedelta
+from datetime import datetime, timedelta
+from array import array
 
 # Load environment variables FIRST
 load_dotenv()
 
-# ============================================================================
-# Smart Search Helper - Vietnamese Movie Search Optimization
-# ============================================================================
-
-class SmartSearchHelper:
-    """Helper class for intelligent movie search"""
-    
-    @staticmethod
-    def normalize_vietnamese(text):
-        """Normalize Vietnamese text: lowercase + trim spaces"""
-        if not text:
-            return ''
-        text = text.lower().strip()
-        return re.sub(r'\s+', ' ', text)
-    
-    @staticmethod
-    def remove_diacritics(text):
-        """Remove Vietnamese diacritics for fuzzy matching"""
-        if not text:
-            return ''
-        nfd = unicodedata.normalize('NFD', text)
-        without_accents = ''.join(char for char in nfd if unicodedata.category(char) != 'Mn')
-        return without_accents.replace('đ', 'd').replace('Đ', 'D')
-    
-    @staticmethod
-    def build_smart_search_query(user_query):
-        """Build optimized MySQL FULLTEXT search query with wildcards"""
-        if not user_query or not user_query.strip():
-            return None, None
-        
-        normalized = SmartSearchHelper.normalize_vietnamese(user_query)
-        has_operators = any(op in user_query for op in ['*', '+', '-', '"', '(', ')'])
-        
-        if has_operators:
-            return user_query, 'IN BOOLEAN MODE'
-        
-        words = normalized.split()
-        if not words:
-            return user_query, 'IN BOOLEAN MODE'
-        
-        fuzzy_terms = []
-        for word in words:
-            word_len = len(word)
-            if word_len <= 2:
-                fuzzy_terms.append(f'+{word}')  # Short: exact match
-            elif word_len <= 5:
-                fuzzy_terms.append(f'{word}*')  # Medium: suffix wildcard
-            else:
-                fuzzy_terms.append(f'{word}*')  # Long: flexible
-        
-        return ' '.join(fuzzy_terms), 'IN BOOLEAN MODE'
-    
-    @staticmethod
-    def calculate_relevance_boost(movie, query_words):
-        """Calculate custom relevance score boost for better ranking"""
-        if not movie or not query_words:
-            return 0.0
-        
-        score = 0.0
-        title_vn = movie.get('title', '').strip().lower()
-        title_en = movie.get('original_title', '').strip().lower()
-        title_vn_no_accent = SmartSearchHelper.remove_diacritics(title_vn)
-        
-        query_str = ' '.join(query_words).lower()
-        query_str_no_accent = SmartSearchHelper.remove_diacritics(query_str)
-        
-        # Priority 1: Title STARTS with full query (+1000)
-        if (title_vn.startswith(query_str) or 
-            title_vn_no_accent.startswith(query_str_no_accent) or
-            title_en.startswith(query_str)):
-            score += 1000.0
-        # Priority 2: Title STARTS with first word (+500)
-        elif query_words:
-            first_word = query_words[0].lower()
-            first_word_no_accent = SmartSearchHelper.remove_diacritics(first_word)
-            if (title_vn.startswith(first_word) or 
-                title_vn_no_accent.startswith(first_word_no_accent) or
-                title_en.startswith(first_word)):
-                score += 500.0
-            # Priority 3: Title STARTS with other word (+300)
-            else:
-                for word in query_words[1:]:
-                    word_norm = word.lower()
-                    word_no_accent = SmartSearchHelper.remove_diacritics(word)
-                    if (title_vn.startswith(word_norm) or 
-                        title_vn_no_accent.startswith(word_no_accent) or
-                        title_en.startswith(word_norm)):
-                        score += 300.0
-                        break
-        
-        # Exact match (+200)
-        if (query_str == title_vn or query_str_no_accent == title_vn_no_accent or query_str == title_en):
-            score += 200.0
-        
-        # All words present
-        words_in_title = sum(1 for word in query_words 
-                           if (word.lower() in title_vn or 
-                               SmartSearchHelper.remove_diacritics(word).lower() in title_vn_no_accent or 
-                               word.lower() in title_en))
-        score += 100.0 if words_in_title == len(query_words) else words_in_title * 30.0
-        
-        # Position bonus
-        for word in query_words:
-            positions = [p for p in [
-                title_vn.find(word.lower()),
-                title_vn_no_accent.find(SmartSearchHelper.remove_diacritics(word).lower()),
-                title_en.find(word.lower())
-            ] if p >= 0]
-            if positions:
-                pos = min(positions)
-                score += 50.0 if pos == 0 else (30.0 if pos <= 5 else (15.0 if pos <= 10 else 0))
-        
-        # Rating boost
-        rating = float(movie.get('imdb_rating', 0) or 0)
-        if rating >= 7.0:
-            score += rating * 5.0
-        
-        # Views boost
-        views = int(movie.get('views', 0) or 0)
-        score += min(views / 1000.0, 50.0)
-        
-        # Recent release boost
-        year = int(movie.get('release_year', 0) or 0)
-        if year >= 2020:
-            score += (year - 2019) * 3.0
-        
-        return score
-    
-    @staticmethod
-    def highlight_keywords(text, keywords):
-        """Highlight keywords in text with <mark> tags"""
-        if not text or not keywords:
-            return text
-        result = text
-        for keyword in keywords:
-            if len(keyword) >= 2:
-                pattern = re.compile(re.escape(keyword), re.IGNORECASE)
-                result = pattern.sub(lambda m: f'<mark>{m.group()}</mark>', result)
-        return result
-
-    @staticmethod
-    def compute_prefix_flags(movie, query_words):
-        """Compute strict prefix priority flags for sorting.
-        Priority order: full query prefix > first word prefix > any other word prefix.
-        Case- and accent-insensitive, supports Vietnamese.
-        Returns tuple: (full_prefix:int, first_prefix:int, other_prefix:int, matched_count:int)
-        """
-        try:
-            title_vn = (movie.get('title') or '').strip()
-            title_en = (movie.get('original_title') or '').strip()
-        except AttributeError:
-            title_vn = str(movie.get('title', '')).strip()
-            title_en = str(movie.get('original_title', '')).strip()
-
-        t_vn_l = title_vn.lower()
-        t_vn_na = SmartSearchHelper.remove_diacritics(t_vn_l)
-        t_en_l = title_en.lower()
-
-        q_words = [w.lower() for w in (query_words or []) if w]
-        q_words_na = [SmartSearchHelper.remove_diacritics(w) for w in q_words]
-
-        full_q = ' '.join(q_words)
-        full_q_na = ' '.join(q_words_na)
-
-        full_prefix = 1 if (t_vn_l.startswith(full_q) or t_vn_na.startswith(full_q_na) or t_en_l.startswith(full_q)) and full_q else 0
-
-        first_prefix = 0
-        other_prefix = 0
-        if not full_prefix and q_words:
-            fw = q_words[0]
-            fw_na = q_words_na[0]
-            if t_vn_l.startswith(fw) or t_vn_na.startswith(fw_na) or t_en_l.startswith(fw):
-                first_prefix = 1
-            else:
-                for w, wna in zip(q_words[1:], q_words_na[1:]):
-                    if t_vn_l.startswith(w) or t_vn_na.startswith(wna) or t_en_l.startswith(w):
-                        other_prefix = 1
-                        break
-
-        # Count how many query words appear anywhere (diacritics-insensitive)
-        matched_count = 0
-        for w, wna in zip(q_words, q_words_na):
-            if (w in t_vn_l) or (wna in t_vn_na) or (w in t_en_l):
-                matched_count += 1
-
-        return (full_prefix, first_prefix, other_prefix, matched_count)
-
-# Create singleton instance
-smart_search = SmartSearchHelper()
-
 # ============================================================================
 # Flask App Configuration
 # ============================================================================
@@ -219,7 +46,8 @@ smart_search = SmartSearchHelper()
 # App Configuration
 app = Flask(__name__)
 CORS(app, supports_credentials=True, resources={r"/api/*": {"origins": "*"}})
-app.secret_key = secrets.token_hex(32)
+# Same key in every worker and across restarts (SECRET_KEY or a generated key file)
+app.secret_key = load_secret_key(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'config', 'secret_key'))
 app.config['PERMANENT_SESSION_LIFETIME'] = timedelta(days=7)
 app.config['JSON_AS_ASCII'] = False
 app.config['JSONIFY_PRETTYPRINT_REGULAR'] = True
@@ -228,11 +56,20 @@ app.config['JSONIFY_PRETTYPRINT_REGULAR'] = True
 app.config['SESSION_COOKIE_SAMESITE'] = 'Lax'
 app.config['SESSION_COOKIE_HTTPONLY'] = True
 app.config['SESSION_COOKIE_SECURE'] = False  # Set to True in production with HTTPS
+# Session data lives server-side, shared by all workers: 'database' (user_sessions
+# table), 'memory' (single process) or 'cookie' (Flask's signed cookie)
+SESSION_STORE = os.getenv('SESSION_STORE', 'database')
+session_interface = make_session_interface(SESSION_STORE, DatabaseConnection)
+if session_interface:
+    app.session_interface = session_interface
 
 # Cache Configuration
 app.config['CACHE_TYPE'] = 'SimpleCache'  # In-memory cache
 app.config['CACHE_DEFAULT_TIMEOUT'] = 300  # 5 minutes
 cache = Cache(app)
+# Stampede-safe wrapper used by the public catalog routes: single-flight
+# rebuilds, stale-while-revalidate window and +/-10% jittered expiry
+swr_cache = StaleWhileRevalidateCache(cache, app, jitter=0.1, stale_factor=1.0)
 
 # ============================================================================
 # Static paths (absolute) for Linux compatibility
@@ -243,17 +80,283 @@ PAGES_DIR = os.path.join(FRONTEND_PUBLIC_DIR, 'pages')
 CSS_DIR = os.path.join(FRONTEND_PUBLIC_DIR, 'css')
 JS_DIR = os.path.join(FRONTEND_PUBLIC_DIR, 'js')
 
+# ============================================================================
+# Cache warm-up (startup, after /api/cache/clear and after importer runs)
+# ============================================================================
+cache_warmer = CacheWarmer(
+    app,
+    swr_cache,
+    seed_paths=[p.strip() for p in os.getenv('CACHE_WARM_PATHS', '').split(',') if p.strip()] or None,
+    hot_file=os.getenv('CACHE_WARM_FILE', os.path.join(BASE_DIR, 'config', 'cache_hot_keys.json')),
+    max_keys=int(os.getenv('CACHE_WARM_MAX_KEYS', 30)),
+    rate=float(os.getenv('CACHE_WARM_RATE', 5)),
+)
+
+# ============================================================================
+# Fuzzy title index (typo-tolerant fallback when FULLTEXT finds nothing)
+# ============================================================================
+def load_title_rows():
+    """Rows for the fuzzy title index: titles of all active movies"""
+    conn = get_db()
+    cursor = conn.cursor()
+    cursor.execute('SELECT id, title, original_title FROM movies WHERE status = "active"')
+    rows = cursor.fetchall()
+    conn.close()
+    return rows
+
+title_index = RefreshingTitleIndex(load_title_rows, ttl=int(os.getenv('FUZZY_INDEX_TTL', 600)))
+
+def load_favorite_ids(user_id):
+    """Favorite movie ids of one user (index-only read of UNIQUE(user_id, movie_id))"""
+    conn = get_db()
+    cursor = conn.cursor()
+    cursor.execute('SELECT movie_id FROM favorites WHERE user_id = ?', (user_id,))
+    ids = [row['movie_id'] for row in cursor.fetchall()]
+    conn.close()
+    return ids
+
+# Heart state of grids / detail page without joining movies
+favorite_ids = FavoriteIdCache(load_favorite_ids, ttl=int(os.getenv('FAVORITES_CACHE_TTL', 300)))
+FAVORITES_CONTAINS_MAX_IDS = 200
+
+# ============================================================================
+# Change feed (importer / admin writes -> targeted cache + index eviction)
+# ============================================================================
+def apply_movie_changes(changes):
+    """Evict what depends on the changed movies
+
+    Detail entries are dropped (rebuilt on the next request); the movie and
+    genre listings are marked stale so they keep serving while one
+    background rebuild runs; the fuzzy index is patched in place.
+    """
+    movie_ids = sorted({change['movie_id'] for change in changes})
+    
+    # Runs on the listener thread: raise on a connection failure, don't exit
+    conn = get_background_db()
+    cursor = conn.cursor()
+    placeholders = ','.join(['?'] * len(movie_ids))
+    cursor.execute(f'SELECT id, title, original_title, status FROM movies WHERE id IN ({placeholders})',
+                   tuple(movie_ids))
+    rows = {row['id']: row for row in cursor.fetchall()}
+    conn.close()
+    
+    dropped = sum(swr_cache.invalidate(f'/api/movies/{movie_id}') for movie_id in movie_ids)
+    for movie_id in movie_ids:
+        cache.delete(movie_premium_key(movie_id))
+    # Genre membership may have changed too, so every genre listing goes stale;
+    # so do search results and suggestions (their rebuild must not reuse the
+    # ranked ids cached before the change, hence the new generation)
+    global search_ids_generation
+    search_ids_generation += 1
+    list_paths = (['/api/movies', '/api/genres'] + swr_cache.cached_paths('/api/genres/') +
+                  swr_cache.cached_paths('/api/movies/search') + swr_cache.cached_paths('/api/search/'))
+    marked = sum(swr_cache.expire(path) for path in list_paths)
+    
+    index = title_index.index
+    if index is not None:
+        for movie_id in movie_ids:
+            row = rows.get(movie_id)
+            if row and row['status'] == 'active':
+                index.add_movie(movie_id, row['title'], row['original_title'])
+            else:
+                index.remove_movie(movie_id)
+    
+    print(f"🔔 [Changes] {len(movie_ids)} movies changed: {dropped} detail entries dropped, "
+          f"{marked} list entries marked stale")
+
+movie_change_listener = MovieChangeListener(
+    get_background_db,
+    apply_movie_changes,
+    interval=float(os.getenv('MOVIE_CHANGES_POLL_INTERVAL', 2)),
+)
+
+# ============================================================================
+# Watch progress (player heartbeats coalesced, flushed as one upsert)
+# ============================================================================
+progress_buffer = ProgressBuffer(
+    get_background_db,
+    flush_interval=float(os.getenv('WATCH_PROGRESS_FLUSH_INTERVAL', 2)),
+)
+# Per-episode resume positions (seconds), same coalescing
+episode_progress_buffer = EpisodeProgressBuffer(
+    get_background_db,
+    flush_interval=float(os.getenv('WATCH_PROGRESS_FLUSH_INTERVAL', 2)),
+)
+
+# Continue-watching rail: built from two indexed range reads, cached per user
+# and dropped whenever that user records progress
+CONTINUE_WATCHING_SIZE = 20
+CONTINUE_WATCHING_TTL = int(os.getenv('CONTINUE_WATCHING_TTL', 300))
+
+def continue_watching_key(user_id):
+    return f'continue_watching:{int(user_id)}'
+
+# Buffered rows are written later in a shared upsert: anything the database
+# would reject is refused here instead
+MAX_ROW_ID = 2147483647  # INT columns
+
+def parse_row_id(value):
+    """Positive INT id from JSON / query input, or None"""
+    if isinstance(value, bool):
+        return None
+    try:
+        row_id = int(value)
+    except (TypeError, ValueError, OverflowError):
+        return None
+    if isinstance(value, float) and value != row_id:
+        return None
+    return row_id if 1 <= row_id <= MAX_ROW_ID else None
+
+def parse_bounded(value, low, high):
+    """float(value) when finite and within [low, high], else None"""
+    if isinstance(value, bool):
+        return None
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        return None
+    return number if math.isfinite(number) and low <= number <= high else None
+
+def movie_exists(movie_id):
+    """Existence check served from the cached is_premium flag"""
+    return movie_is_premium(movie_id) is not None
+
+def existing_episodes(pairs):
+    """Subset of [(movie_id, episode_id)] naming real episodes of those movies"""
+    pairs = set(pairs)
+    if not pairs:
+        return set()
+    conn = get_db()
+    cursor = conn.cursor()
+    placeholders = ','.join(['?'] * len(pairs))
+    cursor.execute(f'SELECT id, movie_id FROM episodes WHERE id IN ({placeholders})',
+                   tuple(episode_id for _, episode_id in pairs))
+    found = {(row['movie_id'], row['id']) for row in cursor.fetchall()}
+    conn.close()
+    return pairs & found
+
+# Batched player heartbeats (/api/watch-history/batch)
+WATCH_BATCH_MAX_EVENTS = 500
+WATCH_BATCH_MAX_BYTES = 256 * 1024  # after gunzip
+WATCH_BATCH_MAX_LAG = 24 * 3600  # seconds an event may be older than the batch
+
+def read_json_body(max_bytes):
+    """Parse the JSON request body, gunzipping it for Content-Encoding: gzip
+    
+    Raises ValueError when the (decompressed) body exceeds max_bytes or is
+    not valid gzip / JSON.
+    """
+    if (request.content_length or 0) > max_bytes:
+        raise ValueError('Request body too large')
+    # Bounded read: chunked uploads carry no Content-Length
+    raw = request.stream.read(max_bytes + 1)
+    if len(raw) > max_bytes:
+        raise ValueError('Request body too large')
+    if request.headers.get('Content-Encoding', '').lower() == 'gzip':
+        decoder = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        try:
+            raw = decoder.decompress(raw, max_bytes + 1)
+        except zlib.error as e:
+            raise ValueError(f'Invalid gzip body: {e}')
+        if len(raw) > max_bytes or decoder.unconsumed_tail:
+            raise ValueError('Request body too large')
+    return json.loads(raw or b'null')
+
+# ============================================================================
+# Auth: bounded password hashing + login throttling
+# ============================================================================
+password_hasher = PasswordHasher(
+    max_workers=int(os.getenv('PASSWORD_HASH_WORKERS', 2)),
+    max_waiting=int(os.getenv('PASSWORD_HASH_QUEUE', 32)),
+)
+# Every login / register attempt per client IP; failed logins per account
+login_ip_limiter = SlidingWindowLimiter(int(os.getenv('LOGIN_IP_LIMIT', 30)), 300)
+login_failure_limiter = SlidingWindowLimiter(int(os.getenv('LOGIN_FAILURE_LIMIT', 10)), 900)
+
+def too_many_attempts(retry_after):
+    response = jsonify({'success': False, 'error': 'Too many attempts, please try again later'})
+    response.status_code = 429
+    response.headers['Retry-After'] = str(retry_after)
+    return response
+
+def hashing_busy():
+    response = jsonify({'success': False, 'error': 'Server is busy, please try again'})
+    response.status_code = 503
+    response.headers['Retry-After'] = '1'
+    return response
+
 def get_db():
     """Get database connection using db_manager"""
     return DatabaseConnection()
 
 def hash_password(password):
-    """Hash password using Werkzeug's secure hash"""
-    return generate_password_hash(password)
+    """Hash password using Werkzeug's secure hash (on the bounded hashing pool)"""
+    return password_hasher.hash(password)
 
 def verify_password(password, password_hash):
-    """Verify password against Werkzeug's hash"""
-    return check_password_hash(password_hash, password)
+    """Verify password against Werkzeug's hash (on the bounded hashing pool)"""
+    return password_hasher.verify(password_hash, password)
+
+def load_user_record(user_id):
+    """Public columns of one user (for user_cache)"""
+    conn = get_db()
+    cursor = conn.cursor()
+    cursor.execute(f'SELECT {PUBLIC_USER_COLUMNS} FROM users WHERE id = ?', (user_id,))
+    row = cursor.fetchone()
+    conn.close()
+    return row
+
+# Name / role / tier of the session user; invalidated by the routes that change them
+user_cache = UserCache(load_user_record, ttl=int(os.getenv('USER_CACHE_TTL', 60)))
+
+# Effective subscription tier per user (premium checks are a dict lookup);
+# a background job expires lapsed subscriptions in bulk
+entitlements = EntitlementService(DatabaseConnection, ttl=int(os.getenv('ENTITLEMENT_TTL', 300)))
+
+def on_subscriptions_expired(user_ids):
+    for user_id in user_ids:
+        entitlements.invalidate(user_id)
+        user_cache.invalidate(user_id)
+    print(f"⏰ [Subscriptions] Expired subscriptions of {len(user_ids)} users")
+
+# Background thread: a failed connect must raise, not sys.exit the job
+subscription_expiry_job = SubscriptionExpiryJob(
+    get_background_db,
+    on_subscriptions_expired,
+    interval=float(os.getenv('SUBSCRIPTION_EXPIRY_INTERVAL', 300)),
+)
+
+# is_premium per movie, dropped by apply_movie_changes
+MOVIE_PREMIUM_TTL = 3600
+
+def movie_premium_key(movie_id):
+    return f'movie_premium:{int(movie_id)}'
+
+def movie_is_premium(movie_id):
+    """True / False, or None for a missing movie"""
+    key = movie_premium_key(movie_id)
+    is_premium = cache.get(key)
+    if is_premium is None:
+        conn = get_db()
+        cursor = conn.cursor()
+        cursor.execute('SELECT is_premium FROM movies WHERE id = ?', (movie_id,))
+        row = cursor.fetchone()
+        conn.close()
+        if not row:
+            return None
+        is_premium = bool(row['is_premium'])
+        cache.set(key, is_premium, timeout=MOVIE_PREMIUM_TTL)
+    return is_premium
+
+def current_user():
+    """Record of the logged-in user, or None"""
+    if 'user_id' not in session:
+        return None
+    return user_cache.get(session['user_id'])
+
+def current_user_role():
+    user = current_user()
+    return user['role'] if user else None
 
 def login_required(f):
     """Decorator to require login for a route"""
@@ -261,6 +364,9 @@ def login_required(f):
     def decorated_function(*args, **kwargs):
         if 'user_id' not in session:
             return jsonify({'success': False, 'error': 'Authentication required'}), 401
+        if current_user() is None:
+            session.clear()  # account was deleted
+            return jsonify({'success': False, 'error': 'Authentication required'}), 401
         return f(*args, **kwargs)
     return decorated_function
 
@@ -333,6 +439,19 @@ def init_db():
     except Exception:
         pass  # Column already exists
     
+    # Accent-free search forms of the titles, written with every movie save
+    # (see SmartSearchHelper.to_search_form; backfill: scripts/backfill_search_columns.py)
+    for column in ('title_search', 'original_title_search'):
+        try:
+            cursor.execute(f"ALTER TABLE movies ADD COLUMN {column} VARCHAR(500)")
+        except Exception:
+            pass  # Column already exists
+    # Hash of the imported OPhim payload (importer skips writes when unchanged)
+    try:
+        cursor.execute("ALTER TABLE movies ADD COLUMN content_hash CHAR(64)")
+    except Exception:
+        pass  # Column already exists
+    
     # ===== GENRES TABLE =====
     cursor.execute(f'''
         CREATE TABLE IF NOT EXISTS genres (
@@ -405,14 +524,36 @@ def init_db():
             user_id INT NOT NULL,
             movie_id INT NOT NULL,
             parent_id INT,
+            root_id INT,
             comment_text TEXT NOT NULL,
             likes INT DEFAULT 0,
+            reply_count INT NOT NULL DEFAULT 0,
             created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
             FOREIGN KEY (user_id) REFERENCES users (id) ON DELETE CASCADE,
             FOREIGN KEY (movie_id) REFERENCES movies (id) ON DELETE CASCADE,
             FOREIGN KEY (parent_id) REFERENCES comments (id) ON DELETE CASCADE
         )
     ''')
+    # Thread columns (see comment_threads.py)
+    try:
+        cursor.execute("ALTER TABLE comments ADD COLUMN root_id INT")
+    except Exception:
+        pass  # Column already exists
+    try:
+        cursor.execute("ALTER TABLE comments ADD COLUMN reply_count INT NOT NULL DEFAULT 0")
+    except Exception:
+        pass  # Column already exists
+    # Older rows (root_id IS NULL) are filled in; retried on every start until done
+    try:
+        if backfill_comment_threads(cursor):
+            conn.commit()
+            print("💬 Comment threads backfilled (root_id, reply_count)")
+    except Exception as e:
+        conn.rollback()
+        print(f"⚠️ Comment thread backfill failed, will retry on next start: {e}")
+    
+    # ===== SESSIONS (server-side session store) =====
+    cursor.execute(USER_SESSIONS_TABLE_SQL)
     
     # ===== SUBSCRIPTIONS =====
     cursor.execute(f'''
@@ -462,56 +603,32 @@ def init_db():
         )
     ''')
     
-    # ===== SEED DATA =====
-    seed_initial_data(cursor)
+    # ===== IMPORT STATE (importer sync checkpoints) =====
+    cursor.execute(IMPORT_STATE_TABLE_SQL)
+    cursor.execute(IMPORT_BACKFILL_TABLE_SQL)
     
-    # ===== CREATE INDEXES FOR PERFORMANCE =====
-    print("📊 Creating indexes for performance...")
-    indexes = [
-        # Movies table indexes
-        "CREATE INDEX IF NOT EXISTS idx_movies_status_created ON movies(status, created_at)",
-        "CREATE INDEX IF NOT EXISTS idx_movies_status_views ON movies(status, views)",
-        "CREATE INDEX IF NOT EXISTS idx_movies_status_rating ON movies(status, imdb_rating)",
-        "CREATE INDEX IF NOT EXISTS idx_movies_type ON movies(type)",
-        "CREATE INDEX IF NOT EXISTS idx_movies_year ON movies(release_year)",
-        "CREATE INDEX IF NOT EXISTS idx_movies_slug ON movies(slug)",
-        # Genres table index
-        "CREATE INDEX IF NOT EXISTS idx_genres_slug ON genres(slug)",
-        # Movie_genres junction table indexes
-        "CREATE INDEX IF NOT EXISTS idx_movie_genres_genre ON movie_genres(genre_id, movie_id)",
-        "CREATE INDEX IF NOT EXISTS idx_movie_genres_movie ON movie_genres(movie_id, genre_id)",
-    ]
+    # ===== MOVIE CHANGES (change feed polled by the app) =====
+    cursor.execute(MOVIE_CHANGES_TABLE_SQL)
     
-    for idx_sql in indexes:
-        try:
-            cursor.execute(idx_sql)
-        except Exception:
-            pass  # Index already exists
+    # ===== EPISODE PROGRESS (resume position per user/episode) =====
+    cursor.execute(EPISODE_PROGRESS_TABLE_SQL)
     
-    print("✅ Indexes created successfully")
+    # ===== RATING SUMMARY (per-movie review aggregates) =====
+    cursor.execute(MOVIE_RATING_SUMMARY_TABLE_SQL)
+    if ensure_summaries(cursor):
+        print("⭐ Rating summaries rebuilt from existing reviews")
     
-    # ===== CREATE FULLTEXT INDEXES FOR SEARCH OPTIMIZATION =====
-    print("🔍 Creating FULLTEXT indexes for optimized search...")
-    fulltext_indexes = [
-        "CREATE FULLTEXT INDEX ft_title ON movies(title)",
-        "CREATE FULLTEXT INDEX ft_original_title ON movies(original_title)",
-        "CREATE FULLTEXT INDEX ft_description ON movies(description)",
-        "CREATE FULLTEXT INDEX ft_search_all ON movies(title, original_title, description)",
-    ]
-    
-    for ft_idx_sql in fulltext_indexes:
-        try:
-            cursor.execute(ft_idx_sql)
-            print(f"  ✅ Created: {ft_idx_sql.split('INDEX')[1].split('ON')[0].strip()}")
-        except Exception as e:
-            # Check if error is "Duplicate key name" - means index already exists
-            if "Duplicate key name" in str(e) or "already exists" in str(e).lower():
-                index_name = ft_idx_sql.split('INDEX')[1].split('ON')[0].strip()
-                print(f"  ℹ️  Already exists: {index_name}")
-            else:
-                print(f"  ⚠️  Failed to create FULLTEXT index: {str(e)}")
+    # ===== SEED DATA =====
+    seed_initial_data(cursor)
+    filled = fill_missing_search_columns(cursor)
+    if filled:
+        print(f"🔤 Search columns filled for {filled} movies")
     
-    print("✅ FULLTEXT indexes ready for fast search")
+    # ===== INDEXES (declared in db_indexes.REQUIRED_INDEXES) =====
+    print("📊 Creating missing indexes (online)...")
+    index_report = ensure_indexes(cursor)
+    print(f"✅ Indexes ready: {len(index_report['created'])} created, "
+          f"{len(index_report['present'])} already present, {len(index_report['failed'])} failed")
     
     conn.commit()
     conn.close()
@@ -535,10 +652,11 @@ def seed_initial_data(cursor):
             ('Bob Premium', 'bob@example.com', 'password123', 'user', 'premium'),
             ('Admin User', 'admin@example.com', 'admin123', 'admin', 'premium')
         ]
-        for name, email, password, role, tier in sample_users:
+        password_hashes = password_hasher.hash_many([user[2] for user in sample_users])
+        for (name, email, _, role, tier), password_hash in zip(sample_users, password_hashes):
             cursor.execute(
                 'INSERT INTO users (name, email, password_hash, role, subscription_tier) VALUES (?, ?, ?, ?, ?)',
-                (name, email, hash_password(password), role, tier)
+                (name, email, password_hash, role, tier)
             )
     
     # Insert genres
@@ -693,17 +811,45 @@ def seed_initial_data(cursor):
                 INSERT INTO movies (
                     title, original_title, description, release_year, duration,
                     country, language, director, cast, genres, imdb_rating,
-                    poster_url, backdrop_url, trailer_url, video_url, type, is_premium
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                    poster_url, backdrop_url, trailer_url, video_url, type, is_premium,
+                    title_search, original_title_search
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
             ''', (
                 movie['title'], movie['original_title'], movie['description'],
                 movie['release_year'], movie['duration'], movie['country'],
                 movie['language'], movie['director'], movie['cast'],
                 movie['genres'], movie['imdb_rating'], movie['poster_url'],
                 movie['backdrop_url'], movie['trailer_url'], movie['video_url'],
-                movie['type'], movie['is_premium']
+                movie['type'], movie['is_premium'],
+                smart_search.to_search_form(movie['title']),
+                smart_search.to_search_form(movie['original_title'])
             ))
 
+def fill_missing_search_columns(cursor, batch_size=500):
+    """Write title_search / original_title_search where still NULL; returns rows filled
+
+    Keyset batches (id > last_id) like scripts/backfill_search_columns.py,
+    so rows saved before the columns existed become searchable on startup.
+    """
+    last_id, filled = 0, 0
+    while True:
+        cursor.execute('''
+            SELECT id, title, original_title FROM movies
+            WHERE id > ? AND title_search IS NULL
+            ORDER BY id LIMIT ?
+        ''', (last_id, batch_size))
+        rows = cursor.fetchall()
+        if not rows:
+            return filled
+        cursor.executemany(
+            'UPDATE movies SET title_search = ?, original_title_search = ? WHERE id = ?',
+            [(smart_search.to_search_form(row['title']),
+              smart_search.to_search_form(row['original_title']),
+              row['id']) for row in rows]
+        )
+        last_id = rows[-1]['id']
+        filled += len(rows)
+
 
 @app.route('/')
 def home():
@@ -802,11 +948,15 @@ def register():
         if len(password) < 6:
             return jsonify({'success': False, 'error': 'Password must be at least 6 characters'}), 400
         
-        conn = get_db()
-        cursor = conn.cursor()
+        allowed, retry_after = login_ip_limiter.hit(request.remote_addr)
+        if not allowed:
+            return too_many_attempts(retry_after)
         
-        # Hash password and insert user
+        # Hash before taking a DB connection
         password_hash = hash_password(password)
+        
+        conn = get_db()
+        cursor = conn.cursor()
         cursor.execute(
             'INSERT INTO users (name, email, password_hash) VALUES (?, ?, ?)',
             (name, email, password_hash)
@@ -822,6 +972,8 @@ def register():
         }), 201
     except IntegrityError:
         return jsonify({'success': False, 'error': 'Email already exists'}), 409
+    except HasherBusyError:
+        return hashing_busy()
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
 
@@ -838,6 +990,14 @@ def login():
         if not email or not password:
             return jsonify({'success': False, 'error': 'Email and password are required'}), 400
         
+        allowed, retry_after = login_ip_limiter.hit(request.remote_addr)
+        if allowed:
+            account_key = email.strip().lower()
+            allowed, retry_after = login_failure_limiter.check(account_key)
+        if not allowed:
+            print(f"⛔ Login throttled: {email} from {request.remote_addr}")
+            return too_many_attempts(retry_after)
+        
         conn = get_db()
         cursor = conn.cursor()
         cursor.execute('SELECT * FROM users WHERE email = %s', (email,))
@@ -846,6 +1006,7 @@ def login():
         
         if not user:
             print(f"❌ User not found: {email}")
+            login_failure_limiter.hit(account_key)
             return jsonify({'success': False, 'error': 'Email or password is incorrect'}), 401
         
         print(f"✓ User found: {user['name']}")
@@ -857,15 +1018,18 @@ def login():
         
         if not password_valid:
             print("❌ Password verification failed")
+            login_failure_limiter.hit(account_key)
             return jsonify({'success': False, 'error': 'Email or password is incorrect'}), 401
         
-        # Store user in session
+        login_failure_limiter.reset(account_key)
+        
+        # Fresh session id on login; profile fields come from user_cache
+        session.clear()
+        if hasattr(session, 'rotate'):
+            session.rotate()
         session.permanent = True
         session['user_id'] = user['id']
-        session['user_name'] = user['name']
-        session['user_email'] = user['email']
-        session['user_role'] = user['role']
-        session['user_subscription_tier'] = user.get('subscription_tier', 'free')
+        user_cache.invalidate(user['id'])
         
         print(f"✅ Session created for user: {user['name']}")
         print(f"   Session data: {dict(session)}")
@@ -876,7 +1040,7 @@ def login():
             'name': user['name'],
             'email': user['email'],
             'role': user['role'],
-            'subscription_tier': user['subscription_tier'],
+            'subscription_tier': entitlements.tier(user['id']),
             'created_at': user['created_at']
         }
         
@@ -885,6 +1049,8 @@ def login():
             'message': 'Login successful',
             'data': user_data
         }), 200
+    except HasherBusyError:
+        return hashing_busy()
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
 
@@ -898,17 +1064,18 @@ def logout():
 def check_auth():
     """Check if user is authenticated"""
     print(f"🔍 Check auth - Session data: {dict(session)}")  # Debug log
-    if 'user_id' in session:
-        print(f"✅ User authenticated: {session['user_name']}")  # Debug log
+    user = current_user()
+    if user:
+        print(f"✅ User authenticated: {user['name']}")  # Debug log
         return jsonify({
             'success': True,
             'authenticated': True,
             'user': {
-                'id': session['user_id'],
-                'name': session['user_name'],
-                'role': session['user_role'],
-                    'email': session.get('user_email', ''),
-                    'subscription_tier': session.get('user_subscription_tier', 'free')
+                'id': user['id'],
+                'name': user['name'],
+                'role': user['role'],
+                    'email': user.get('email') or '',
+                    'subscription_tier': entitlements.tier(user['id'])
             }
         }), 200
     else:
@@ -972,7 +1139,7 @@ def get_user(user_id):
 def update_user(user_id):
     """Update user profile"""
     # Prevent users from updating other users' profiles unless they are an admin
-    if 'user_id' not in session or (session['user_id'] != user_id and session.get('user_role') != 'admin'):
+    if 'user_id' not in session or (session['user_id'] != user_id and current_user_role() != 'admin'):
         return jsonify({'success': False, 'error': 'Unauthorized'}), 403
         
     try:
@@ -1002,6 +1169,7 @@ def update_user(user_id):
         conn.commit()
         updated = cursor.rowcount
         conn.close()
+        user_cache.invalidate(user_id)
         
         if updated:
             return jsonify({'success': True, 'message': 'Profile updated successfully'})
@@ -1028,6 +1196,10 @@ def change_password(user_id):
         if len(new_password) < 6:
             return jsonify({'success': False, 'error': 'Password must be at least 6 characters'}), 400
         
+        allowed, retry_after = login_failure_limiter.check(f'user:{user_id}')
+        if not allowed:
+            return too_many_attempts(retry_after)
+        
         conn = get_db()
         cursor = conn.cursor()
         
@@ -1042,6 +1214,7 @@ def change_password(user_id):
         # Verify current password
         if not verify_password(current_password, user['password_hash']):
             conn.close()
+            login_failure_limiter.hit(f'user:{user_id}')
             return jsonify({'success': False, 'error': 'Current password is incorrect'}), 401
         
         # Update password
@@ -1055,7 +1228,13 @@ def change_password(user_id):
         conn.commit()
         conn.close()
         
+        # Log out the user's other sessions
+        if session_interface:
+            session_interface.store.delete_user(user_id, keep_sid=getattr(session, 'sid', None))
+        
         return jsonify({'success': True, 'message': 'Password changed successfully'})
+    except HasherBusyError:
+        return hashing_busy()
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
 
@@ -1064,16 +1243,24 @@ def change_password(user_id):
 def delete_user(user_id):
     """Delete user by ID"""
     # Only admin can delete users
-    if session.get('user_role') != 'admin':
+    if current_user_role() != 'admin':
         return jsonify({'success': False, 'error': 'Unauthorized'}), 403
         
     try:
         conn = get_db()
         cursor = conn.cursor()
+        # The user's reviews go with the row (ON DELETE CASCADE): take them
+        # out of the rating summaries in the same transaction
+        reviewed_movies = remove_user_reviews(cursor, user_id)
         cursor.execute('DELETE FROM users WHERE id = ?', (user_id,))
-        conn.commit()
         deleted = cursor.rowcount
+        conn.commit()
         conn.close()
+        for movie_id in reviewed_movies:
+            cache.delete(rating_summary_key(movie_id))
+        user_cache.invalidate(user_id)
+        if session_interface:
+            session_interface.store.delete_user(user_id)
         
         if deleted:
             return jsonify({'success': True, 'message': 'User deleted successfully'})
@@ -1179,7 +1366,7 @@ def delete_user(user_id):
 # ===== STREAMING PLATFORM APIs =====
 
 @app.route('/api/movies', methods=['GET'])
-@cache.cached(timeout=60, query_string=True)
+@swr_cache.cached(timeout=60, query_string=True)
 def get_movies():
     """Get all movies or filter by parameters with sorting and pagination"""
     try:
@@ -1298,8 +1485,75 @@ def get_movies():
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
 
+# Catalog export: rows are streamed from a server-side cursor in chunks,
+# so memory stays flat and the first bytes go out before the query ends
+EXPORT_CHUNK_ROWS = 500
+
+def export_row(row):
+    """ISO timestamps, so a row's updated_at can be passed back as updated_since"""
+    return {key: value.isoformat() if isinstance(value, datetime) else value for key, value in row.items()}
+
+@app.route('/api/export/movies.ndjson', methods=['GET'])
+def export_movies_ndjson():
+    """Stream the movie catalog as newline-delimited JSON (one movie per line)
+
+    Query params:
+        updated_since: ISO date/datetime; only movies updated at or after it
+            (use the last exported updated_at for incremental pulls). Values
+            with an offset or Z are converted to server local time
+        status: movie status to export (default 'active', 'all' for every row);
+            anything but 'active' is admin or localhost only
+    """
+    updated_since = request.args.get('updated_since')
+    status = request.args.get('status', 'active')
+    if status != 'active':
+        is_local = request.remote_addr in ('127.0.0.1', '::1')
+        if not is_local and current_user_role() != 'admin':
+            return jsonify({'success': False, 'error': 'Unauthorized'}), 403
+
+    where_clauses = []
+    params = []
+    if updated_since:
+        try:
+            since = datetime.fromisoformat(updated_since.replace('Z', '+00:00'))
+        except ValueError:
+            return jsonify({'success': False, 'error': 'updated_since must be an ISO date or datetime'}), 400
+        if since.tzinfo is not None:
+            # updated_at is local server time (exported values carry no offset)
+            since = since.astimezone().replace(tzinfo=None)
+        where_clauses.append('updated_at >= ?')
+        params.append(since.strftime('%Y-%m-%d %H:%M:%S'))
+    if status != 'all':
+        where_clauses.append('status = ?')
+        params.append(status)
+    where_sql = f"WHERE {' AND '.join(where_clauses)}" if where_clauses else ''
+
+    def generate():
+        conn = get_db()
+        cursor = conn.stream_cursor()
+        try:
+            cursor.execute(f'SELECT * FROM movies {where_sql} ORDER BY updated_at, id', tuple(params))
+            while True:
+                rows = cursor.fetchmany(EXPORT_CHUNK_ROWS)
+                if not rows:
+                    break
+                yield ''.join(app.json.dumps(export_row(row)) + '\n' for row in rows)
+        except Exception as e:
+            # Headers are already sent: report the failure as a last line
+            print(f"❌ [Export] movies.ndjson failed: {e}")
+            yield app.json.dumps({'error': str(e)}) + '\n'
+        finally:
+            cursor.close()
+            conn.close()
+
+    return Response(
+        stream_with_context(generate()),
+        mimetype='application/x-ndjson',
+        headers={'Content-Disposition': 'attachment; filename=movies.ndjson', 'X-Accel-Buffering': 'no'}
+    )
+
 @app.route('/api/movies/<int:movie_id>', methods=['GET'])
-@cache.cached(timeout=300)
+@swr_cache.cached(timeout=300)
 def get_movie_detail(movie_id):
     """Get movie detail by ID including episodes if series"""
     try:
@@ -1317,13 +1571,16 @@ def get_movie_detail(movie_id):
         
         print(f"✅ [API] Movie found: {movie.get('title', 'Unknown') if isinstance(movie, dict) else 'Movie data'}")
         
-        # Update views count
-        try:
-            cursor.execute('UPDATE movies SET views = views + 1 WHERE id = ?', (movie_id,))
-            conn.commit()
-        except Exception as view_error:
-            print(f"⚠️ [API] Could not update views: {view_error}")
-            # Continue even if view update fails
+        # Update views count - not for cache warm-ups / background refreshes,
+        # and without touching updated_at (ON UPDATE would mark the movie changed)
+        if not request.environ.get(swr_cache.WARM_ENVIRON_KEY):
+            try:
+                cursor.execute('UPDATE movies SET views = views + 1, updated_at = updated_at WHERE id = ?',
+                               (movie_id,))
+                conn.commit()
+            except Exception as view_error:
+                print(f"⚠️ [API] Could not update views: {view_error}")
+                # Continue even if view update fails
         
         # Convert to dict if needed (MySQL DictCursor usually returns dict)
         movie_dict = dict(movie) if not isinstance(movie, dict) else movie
@@ -1427,98 +1684,159 @@ def get_episode_detail(movie_id, episode_number):
         traceback.print_exc()
         return jsonify({'success': False, 'error': str(e)}), 500
 
+# Search pagination: the ranked id list of a normalized query is computed
+# once and cached compactly, pages are hydrated with one batched query
+SEARCH_MAX_CANDIDATES = 500
+SEARCH_MAX_PER_PAGE = 100
+SEARCH_IDS_TIMEOUT = 300
+# Part of the ranked-id cache key; apply_movie_changes bumps it so ids cached
+# before an import / rename / deactivation are never read again
+search_ids_generation = 0
+
+def like_prefix(text):
+    """LIKE pattern matching values that start with text (wildcards escaped)
+    
+    Bound as a parameter: a literal '%' in the SQL would break the %s
+    formatting of the ? placeholders.
+    """
+    escaped = text.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+    return escaped + '%'
+
+def get_ranked_search_ids(cursor, query):
+    """Return (ids, scores) arrays for a query, ranked best first
+
+    Only the columns needed for ranking are fetched, capped at
+    SEARCH_MAX_CANDIDATES, so memory and CPU per query stay bounded.
+    The result is cached per normalized query as array('l') + array('d').
+    """
+    query_forms = smart_search.query_forms(query)
+    normalized = query_forms.normalized
+    cache_key = f'search_ids:{search_ids_generation}:{normalized}'
+    cached = cache.get(cache_key)
+    if cached is not None:
+        return cached['ids'], cached['scores']
+
+    ids, scores = array('l'), array('d')
+    search_query, search_mode = smart_search.build_smart_search_query(query)
+    if not search_query or not search_mode:
+        return ids, scores
+
+    rank_columns = ("id, title, COALESCE(original_title, '') AS original_title, title_search, "
+                    "imdb_rating, views, release_year")
+    folded = query_forms.folded
+
+    # FULLTEXT search with Boolean mode for wildcard support
+    cursor.execute(f'''
+        SELECT {rank_columns}
+        FROM movies 
+        WHERE status = "active" 
+          AND MATCH(title) AGAINST(? {search_mode})
+        ORDER BY MATCH(title) AGAINST(? {search_mode}) DESC, imdb_rating DESC, views DESC
+        LIMIT ?
+    ''', (search_query, search_query, SEARCH_MAX_CANDIDATES))
+    candidates = [dict(row) for row in cursor.fetchall()]
+    
+    # Accent-free query (or an English title): match the precomputed search columns
+    if not candidates and folded:
+        folded_query, folded_mode = smart_search.build_smart_search_query(folded)
+        cursor.execute(f'''
+            SELECT {rank_columns}
+            FROM movies 
+            WHERE status = "active" 
+              AND MATCH(title_search, original_title_search) AGAINST(? {folded_mode})
+            ORDER BY MATCH(title_search, original_title_search) AGAINST(? {folded_mode}) DESC,
+                     imdb_rating DESC, views DESC
+            LIMIT ?
+        ''', (folded_query, folded_query, SEARCH_MAX_CANDIDATES))
+        candidates = [dict(row) for row in cursor.fetchall()]
+    
+    # Typo tolerance: misspelled titles get nothing from FULLTEXT, so look
+    # them up in the fuzzy title index and keep its (edit-distance) order
+    if not candidates and normalized:
+        fuzzy_hits = title_index.get().search(query, limit=SEARCH_MAX_CANDIDATES)
+        if fuzzy_hits:
+            placeholders = ','.join(['?'] * len(fuzzy_hits))
+            cursor.execute(
+                f'SELECT id FROM movies WHERE status = "active" AND id IN ({placeholders})',
+                tuple(movie_id for movie_id, _ in fuzzy_hits)
+            )
+            active_ids = {row['id'] for row in cursor.fetchall()}
+            for movie_id, score in fuzzy_hits:
+                if movie_id in active_ids:
+                    ids.append(movie_id)
+                    scores.append(score)
+            if ids:
+                cache.set(cache_key, {'ids': ids, 'scores': scores}, timeout=SEARCH_IDS_TIMEOUT)
+                return ids, scores
+    
+    # Fallback: if no FULLTEXT results, prefix-match the indexed search column
+    if not candidates and folded:
+        cursor.execute(f'''
+            SELECT {rank_columns}
+            FROM movies 
+            WHERE status = "active" 
+              AND title_search LIKE ?
+            ORDER BY imdb_rating DESC, views DESC
+            LIMIT ?
+        ''', (like_prefix(folded), SEARCH_MAX_CANDIDATES))
+        candidates = [dict(row) for row in cursor.fetchall()]
+    
+    # Strict prefix priority first, then match count, then boost, rating, views
+    order, boosts = smart_search.rank_positions(candidates, normalized)
+    for pos in order:
+        ids.append(candidates[pos]['id'])
+        scores.append(boosts[pos])
+    
+    cache.set(cache_key, {'ids': ids, 'scores': scores}, timeout=SEARCH_IDS_TIMEOUT)
+    return ids, scores
+
+def hydrate_movies(cursor, movie_ids):
+    """Fetch full movie rows for ids in one query, preserving id order"""
+    if not movie_ids:
+        return []
+    placeholders = ','.join(['?'] * len(movie_ids))
+    cursor.execute(f'SELECT * FROM movies WHERE id IN ({placeholders})', tuple(movie_ids))
+    rows = {row['id']: dict(row) for row in cursor.fetchall()}
+    return [rows[movie_id] for movie_id in movie_ids if movie_id in rows]
+
 @app.route('/api/movies/search', methods=['GET'])
-@cache.cached(timeout=60, query_string=True)  # Cache search results for 1 minute
+@swr_cache.cached(timeout=60, query_string=True)  # Cache search results for 1 minute
 def search_movies():
-    """Smart search movies using FULLTEXT indexes with fuzzy matching and synonym support"""
+    """Smart search movies using FULLTEXT indexes, ranked once per query and paginated"""
     try:
         query = request.args.get('q', '')
-        limit = int(request.args.get('limit', 100))  # Allow custom limit
+        page = max(int(request.args.get('page', 1)), 1)
+        # `limit` is the legacy name for the page size
+        per_page = int(request.args.get('per_page', request.args.get('limit', SEARCH_MAX_PER_PAGE)))
+        per_page = max(1, min(per_page, SEARCH_MAX_PER_PAGE))
         
-        if not query:
+        if not query or not query.strip():
             return jsonify({'success': True, 'data': [], 'count': 0})
         
         conn = get_db()
         cursor = conn.cursor()
         
-        # Use smart search helper for intelligent query building
-        search_query, search_mode = smart_search.build_smart_search_query(query)
-        
-        if not search_query or not search_mode:
-            return jsonify({'success': True, 'data': [], 'count': 0})
-
-        # Use FULLTEXT search with Boolean mode for wildcard support
-        # This enables fuzzy/partial matching while maintaining speed
-        cursor.execute(f'''
-            SELECT *, 
-                   MATCH(title) AGAINST(? {search_mode}) as relevance
-            FROM movies 
-            WHERE status = "active" 
-              AND MATCH(title) AGAINST(? {search_mode})
-            ORDER BY relevance DESC, imdb_rating DESC, views DESC
-            LIMIT ?
-        ''', (search_query, search_query, limit))
-        
-        movies = [dict(row) for row in cursor.fetchall()]
-        
-        # Fallback: if no FULLTEXT results and query is short, use LIKE with accent-insensitive collation
-        if not movies and len(query.strip()) >= 1:
-            normalized_q = smart_search.normalize_vietnamese(query).strip()
-            cursor.execute('''
-                SELECT * 
-                FROM movies 
-                WHERE status = "active" 
-                  AND LOWER(title) COLLATE utf8mb4_unicode_ci LIKE CONCAT(?, '%')
-                ORDER BY imdb_rating DESC, views DESC
-                LIMIT ?
-            ''', (normalized_q.lower(), limit))
-            movies = [dict(row) for row in cursor.fetchall()]
-        
-        # Apply strict prefix priority + custom relevance boost for better ranking
-        query_words = smart_search.normalize_vietnamese(query).split()
-        for movie in movies:
-            # Prefix flags
-            f_full, f_first, f_other, match_cnt = smart_search.compute_prefix_flags(movie, query_words)
-            movie['_p_full'] = f_full
-            movie['_p_first'] = f_first
-            movie['_p_other'] = f_other
-            movie['_match_cnt'] = match_cnt
-            # Calculate custom boost
-            boost = smart_search.calculate_relevance_boost(movie, query_words)
-            movie['_boost'] = boost
-            # Remove internal relevance score
-            movie.pop('relevance', None)
-
-        # Re-sort: strict prefix priority first, then match count, then boost, rating, views
-        movies.sort(
-            key=lambda m: (
-                m.get('_p_full', 0),
-                m.get('_p_first', 0),
-                m.get('_p_other', 0),
-                m.get('_match_cnt', 0),
-                float(m.get('_boost', 0) or 0),
-                float(m.get('imdb_rating', 0) or 0),
-                int(m.get('views', 0) or 0)
-            ),
-            reverse=True
-        )
-        
-        # Remove boost from final results
-        for movie in movies:
-            movie.pop('_boost', None)
-            movie.pop('_p_full', None)
-            movie.pop('_p_first', None)
-            movie.pop('_p_other', None)
-            movie.pop('_match_cnt', None)
+        ids, _ = get_ranked_search_ids(cursor, query)
+        offset = (page - 1) * per_page
+        movies = hydrate_movies(cursor, ids[offset:offset + per_page].tolist())
         
         conn.close()
         
-        return jsonify({'success': True, 'data': movies, 'count': len(movies), 'total': len(movies)})
+        total = len(ids)
+        return jsonify({
+            'success': True,
+            'data': movies,
+            'count': len(movies),
+            'total': total,
+            'page': page,
+            'per_page': per_page,
+            'total_pages': (total + per_page - 1) // per_page
+        })
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
 
 @app.route('/api/search/autocomplete', methods=['GET'])
-@cache.cached(timeout=60, query_string=True)  # Cache for 60 seconds per query
+@swr_cache.cached(timeout=60, query_string=True)  # Cache for 60 seconds per query
 def search_autocomplete():
     """Get autocomplete suggestions for search query"""
     try:
@@ -1553,9 +1871,49 @@ def search_autocomplete():
         cursor.execute(sql, (search_query,))
         results = [dict(row) for row in cursor.fetchall()]
         
-        # Fallback: if no FULLTEXT results, use LIKE with accent-insensitive collation
-        if not results and len(query.strip()) >= 1:
-            normalized_q = smart_search.normalize_vietnamese(query).strip()
+        # Accent-free query (or an English title): match the precomputed search columns
+        query_forms = smart_search.query_forms(query)
+        folded_q = query_forms.folded
+        if not results and folded_q:
+            folded_query, folded_mode = smart_search.build_smart_search_query(folded_q)
+            cursor.execute(f'''
+                SELECT m.*, 
+                       GROUP_CONCAT(DISTINCT g.name) as genres,
+                       m.imdb_rating as rating,
+                       m.views as views
+                FROM movies m
+                LEFT JOIN movie_genres mg ON m.id = mg.movie_id
+                LEFT JOIN genres g ON mg.genre_id = g.id
+                WHERE MATCH(m.title_search, m.original_title_search) AGAINST(? {folded_mode})
+                  AND m.status = "active"
+                GROUP BY m.id
+                LIMIT 200
+            ''', (folded_query,))
+            results = [dict(row) for row in cursor.fetchall()]
+        
+        # Typo tolerance: fall back to the fuzzy title index before LIKE
+        fuzzy_rank = None
+        if not results:
+            fuzzy_hits = title_index.get().search(query, limit=200)
+            if fuzzy_hits:
+                fuzzy_rank = {movie_id: rank for rank, (movie_id, _) in enumerate(fuzzy_hits)}
+                placeholders = ','.join(['?'] * len(fuzzy_hits))
+                cursor.execute(f'''
+                    SELECT m.*, 
+                           GROUP_CONCAT(DISTINCT g.name) as genres,
+                           m.imdb_rating as rating,
+                           m.views as views
+                    FROM movies m
+                    LEFT JOIN movie_genres mg ON m.id = mg.movie_id
+                    LEFT JOIN genres g ON mg.genre_id = g.id
+                    WHERE m.id IN ({placeholders})
+                      AND m.status = "active"
+                    GROUP BY m.id
+                ''', tuple(fuzzy_rank))
+                results = [dict(row) for row in cursor.fetchall()]
+        
+        # Fallback: if no FULLTEXT results, prefix-match the indexed search column
+        if not results and folded_q:
             sql_fallback = '''
                 SELECT m.*, 
                        GROUP_CONCAT(DISTINCT g.name) as genres,
@@ -1564,13 +1922,13 @@ def search_autocomplete():
                 FROM movies m
                 LEFT JOIN movie_genres mg ON m.id = mg.movie_id
                 LEFT JOIN genres g ON mg.genre_id = g.id
-                WHERE LOWER(m.title) COLLATE utf8mb4_unicode_ci LIKE CONCAT(?, '%')
+                WHERE m.title_search LIKE ?
                   AND m.status = "active"
                 GROUP BY m.id
                 ORDER BY m.imdb_rating DESC, m.views DESC
                 LIMIT 200
             '''
-            cursor.execute(sql_fallback, (normalized_q.lower(),))
+            cursor.execute(sql_fallback, (like_prefix(folded_q),))
             results = [dict(row) for row in cursor.fetchall()]
         
         conn.close()
@@ -1578,48 +1936,25 @@ def search_autocomplete():
         if not results:
             return jsonify({'success': True, 'data': [], 'count': 0, 'total': 0})
 
-        # Apply strict prefix priority + custom relevance boost
-        query_words = smart_search.normalize_vietnamese(query).split()
-
-        for movie in results:
-            f_full, f_first, f_other, match_cnt = smart_search.compute_prefix_flags(movie, query_words)
-            movie['_p_full'] = f_full
-            movie['_p_first'] = f_first
-            movie['_p_other'] = f_other
-            movie['_match_cnt'] = match_cnt
-            boost = smart_search.calculate_relevance_boost(movie, query_words)
-            movie['boost'] = boost
-
-            # Highlight keywords in title
-            movie['title_highlighted'] = smart_search.highlight_keywords(
-                movie.get('title', ''), 
-                query_words
-            )
+        query_words = list(query_forms.words)
 
-        # Sort by prefix priority first, then match count, then boost, rating, views
-        results.sort(
-            key=lambda x: (
-                x.get('_p_full', 0),
-                x.get('_p_first', 0),
-                x.get('_p_other', 0),
-                x.get('_match_cnt', 0),
-                float(x.get('boost', 0) or 0),
-                float(x.get('rating', 0) or 0),
-                int(x.get('views', 0) or 0)
-            ),
-            reverse=True
-        )
+        if fuzzy_rank is not None:
+            # Misspelled query: prefix flags are meaningless, keep edit-distance order
+            results.sort(key=lambda x: fuzzy_rank.get(x['id'], len(fuzzy_rank)))
+        else:
+            # Sort by prefix priority first, then match count, then boost, rating, views
+            order, _ = smart_search.rank_positions(results, query)
+            results = [results[pos] for pos in order]
 
         # Return top N results
         top_results = results[:limit]
 
-        # Remove internal boost score before returning
+        # Highlight keywords in title (only for the rows returned)
         for movie in top_results:
-            movie.pop('boost', None)
-            movie.pop('_p_full', None)
-            movie.pop('_p_first', None)
-            movie.pop('_p_other', None)
-            movie.pop('_match_cnt', None)
+            movie['title_highlighted'] = smart_search.highlight_keywords(
+                movie.get('title', ''), 
+                query_words
+            )
 
         return jsonify({
             'success': True,
@@ -1681,7 +2016,7 @@ def get_movies_by_mood(mood):
         return jsonify({'success': False, 'error': str(e)}), 500
 
 @app.route('/api/genres', methods=['GET'])
-@cache.cached(timeout=900)  # Cache for 15 minutes; clear via /api/cache/clear
+@swr_cache.cached(timeout=900)  # Cache for 15 minutes; clear via /api/cache/clear
 def get_genres():
     """Get all genres with movie count"""
     try:
@@ -1704,7 +2039,7 @@ def get_genres():
         return jsonify({'success': False, 'error': str(e)}), 500
 
 @app.route('/api/genres/<int:genre_id>/movies', methods=['GET'])
-@cache.cached(timeout=300, query_string=True) # Cache for 5 minutes
+@swr_cache.cached(timeout=300, query_string=True) # Cache for 5 minutes
 def get_movies_by_genre(genre_id):
     """Get all movies in a specific genre with pagination"""
     try:
@@ -1762,17 +2097,42 @@ def get_movies_by_genre(genre_id):
 @login_required
 def clear_all_cache():
     """Clear all cache (admin only)"""
-    if session.get('user_role') != 'admin':
+    if current_user_role() != 'admin':
         return jsonify({'success': False, 'error': 'Unauthorized'}), 403
     cache.clear()
+    cache_warmer.warm_async('cache-clear')
     return jsonify({'success': True, 'message': 'Cache cleared'})
 
+@app.route('/api/cache/warm', methods=['POST'])
+def warm_cache():
+    """Re-warm hot cache keys (admin or local importer only)"""
+    is_local = request.remote_addr in ('127.0.0.1', '::1')
+    if not is_local and current_user_role() != 'admin':
+        return jsonify({'success': False, 'error': 'Unauthorized'}), 403
+    
+    data = request.get_json(silent=True) or {}
+    report = cache_warmer.warm(data.get('reason', 'api'))
+    if report is None:
+        return jsonify({'success': True, 'message': 'Warm-up already running', 'data': cache_warmer.last_report})
+    return jsonify({'success': True, 'data': report})
+
+@app.route('/api/search/stats', methods=['GET'])
+def search_stats():
+    """Hit rates of the query normalization caches (admin or localhost only)"""
+    is_local = request.remote_addr in ('127.0.0.1', '::1')
+    if not is_local and current_user_role() != 'admin':
+        return jsonify({'success': False, 'error': 'Unauthorized'}), 403
+    return jsonify({'success': True, 'data': smart_search.cache_stats()})
+
 @app.route('/api/watch-history', methods=['GET', 'POST', 'DELETE'])
 @login_required
 def watch_history():
     """Get, update or delete watch history"""
     if request.method == 'GET':
         try:
+            # Read-your-writes: this user's buffered progress goes in first
+            progress_buffer.flush(session['user_id'])
+            
             conn = get_db()
             cursor = conn.cursor()
             cursor.execute('''
@@ -1795,34 +2155,19 @@ def watch_history():
     elif request.method == 'POST':
         try:
             data = request.get_json()
-            movie_id = data.get('movie_id')
-            progress = data.get('progress', 0)
+            movie_id = parse_row_id(data.get('movie_id'))
+            progress = parse_bounded(data.get('progress', 0), 0, 100)
             
-            if not movie_id:
+            if movie_id is None:
                 return jsonify({'success': False, 'error': 'movie_id required'}), 400
+            if progress is None:
+                return jsonify({'success': False, 'error': 'progress must be between 0 and 100'}), 400
+            if not movie_exists(movie_id):
+                return jsonify({'success': False, 'error': 'Movie not found'}), 404
             
-            conn = get_db()
-            cursor = conn.cursor()
-            
-            # Check if entry exists
-            cursor.execute('SELECT id FROM watch_history WHERE user_id = ? AND movie_id = ?',
-                         (session['user_id'], movie_id))
-            existing = cursor.fetchone()
-            
-            if existing:
-                cursor.execute('''
-                    UPDATE watch_history 
-                    SET progress = ?, completed = ?, last_watched = CURRENT_TIMESTAMP
-                    WHERE user_id = ? AND movie_id = ?
-                ''', (progress, 1 if progress >= 95 else 0, session['user_id'], movie_id))
-            else:
-                cursor.execute('''
-                    INSERT INTO watch_history (user_id, movie_id, progress, completed)
-                    VALUES (?, ?, ?, ?)
-                ''', (session['user_id'], movie_id, progress, 1 if progress >= 95 else 0))
-            
-            conn.commit()
-            conn.close()
+            # Buffered: the latest value per movie is upserted within a few seconds
+            progress_buffer.add(session['user_id'], movie_id, progress)
+            cache.delete(continue_watching_key(session['user_id']))
             
             return jsonify({'success': True, 'message': 'Watch history updated'})
         except Exception as e:
@@ -1831,11 +2176,15 @@ def watch_history():
     
     else:  # DELETE - Clear all watch history
         try:
+            progress_buffer.discard(session['user_id'])
+            episode_progress_buffer.discard(session['user_id'])
             conn = get_db()
             cursor = conn.cursor()
             cursor.execute('DELETE FROM watch_history WHERE user_id = ?', (session['user_id'],))
+            cursor.execute('DELETE FROM episode_progress WHERE user_id = ?', (session['user_id'],))
             conn.commit()
             conn.close()
+            cache.delete(continue_watching_key(session['user_id']))
             
             return jsonify({'success': True, 'message': 'Watch history cleared'})
         except Exception as e:
@@ -1844,6 +2193,267 @@ def watch_history():
         except Exception as e:
             return jsonify({'success': False, 'error': str(e)}), 500
 
+@app.route('/api/watch-history/batch', methods=['POST'])
+@login_required
+def watch_history_batch():
+    """Apply many player progress events in one upsert
+    
+    Body (optionally Content-Encoding: gzip), times in epoch milliseconds:
+        {"sent_at": 1700000000000, "events": [{"movie_id": 1, "progress": 42, "t": 1699999990000}]}
+    Episode events carry "episode_id", "position" and "duration" (seconds)
+    instead of "progress". Events are reduced to the latest per movie /
+    episode (by t, then array order).
+    Client clocks are not trusted: t only places an event relative to
+    sent_at, and that offset is applied to the server clock.
+    """
+    try:
+        data = read_json_body(WATCH_BATCH_MAX_BYTES)
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    
+    events = data.get('events') if isinstance(data, dict) else None
+    if not isinstance(events, list) or not events:
+        return jsonify({'success': False, 'error': 'events required'}), 400
+    if len(events) > WATCH_BATCH_MAX_EVENTS:
+        return jsonify({'success': False, 'error': f'At most {WATCH_BATCH_MAX_EVENTS} events per batch'}), 413
+    
+    def client_time(value):
+        if isinstance(value, (int, float)) and not isinstance(value, bool) and math.isfinite(value):
+            return float(value)
+        return None
+    
+    latest = {}  # (movie_id, episode_id or None) -> (order, value, t)
+    rejected = 0
+    for index, event in enumerate(events):
+        if not isinstance(event, dict):
+            rejected += 1
+            continue
+        movie_id = parse_row_id(event.get('movie_id'))
+        if event.get('episode_id') is None:
+            key = (movie_id, None)
+            value = parse_bounded(event.get('progress', 0), 0, 100)
+            valid = value is not None
+        else:
+            key = (movie_id, parse_row_id(event.get('episode_id')))
+            value = (parse_bounded(event.get('position'), 0, MAX_POSITION_SECONDS),
+                     parse_bounded(event.get('duration') or 0, 0, MAX_POSITION_SECONDS))
+            valid = key[1] is not None and None not in value
+        if movie_id is None or not valid:
+            rejected += 1
+            continue
+        sent = client_time(event.get('t'))
+        order = (sent if sent is not None else float('-inf'), index)
+        if key not in latest or order >= latest[key][0]:
+            latest[key] = (order, value, sent)
+    
+    # Unknown movies / episodes would fail the shared upsert later
+    try:
+        known_movies = {movie_id for movie_id in {key[0] for key in latest} if movie_exists(movie_id)}
+        known_episodes = existing_episodes(key for key in latest if key[1] is not None and key[0] in known_movies)
+    except Exception as e:
+        print(f"Error validating watch history batch: {e}")
+        return jsonify({'success': False, 'error': str(e)}), 500
+    for key in [key for key in latest
+                if key[0] not in known_movies or (key[1] is not None and key not in known_episodes)]:
+        del latest[key]
+        rejected += 1
+    
+    if not latest:
+        return jsonify({'success': False, 'error': 'No valid events', 'rejected': rejected}), 400
+    
+    now = datetime.now()
+    sent_at = client_time(data.get('sent_at'))
+    if sent_at is None:
+        sent_at = max((sent for _, _, sent in latest.values() if sent is not None), default=None)
+    movie_rows, episode_rows = [], []
+    for (movie_id, episode_id), (_, value, sent) in latest.items():
+        lag = (sent_at - sent) / 1000.0 if sent is not None and sent_at is not None else 0.0
+        watched_at = now - timedelta(seconds=min(max(lag, 0.0), WATCH_BATCH_MAX_LAG))
+        if episode_id is None:
+            movie_rows.append((movie_id, value, watched_at))
+        else:
+            episode_rows.append((movie_id, episode_id, value[0], value[1], watched_at))
+    
+    try:
+        # Merged with this user's buffered heartbeats, written as one multi-row upsert per table
+        progress_buffer.add_many(session['user_id'], movie_rows)
+        episode_progress_buffer.add_many(session['user_id'], episode_rows)
+        cache.delete(continue_watching_key(session['user_id']))
+        applied = progress_buffer.flush(session['user_id']) + episode_progress_buffer.flush(session['user_id'])
+    except Exception as e:
+        print(f"Error applying watch history batch: {e}")
+        return jsonify({'success': False, 'error': str(e)}), 500
+    
+    return jsonify({'success': True, 'received': len(events), 'applied': applied, 'rejected': rejected})
+
+@app.route('/api/episode-progress', methods=['GET', 'POST'])
+@login_required
+def episode_progress():
+    """Get the resume point of a series or record an episode position
+    
+    GET ?movie_id= returns the last-watched episode and its offset.
+    POST {"movie_id", "episode_id", "position", "duration"} (seconds).
+    """
+    if request.method == 'GET':
+        movie_id = request.args.get('movie_id', type=int)
+        if not movie_id:
+            return jsonify({'success': False, 'error': 'movie_id required'}), 400
+        try:
+            episode_progress_buffer.flush(session['user_id'])
+            
+            conn = get_db()
+            cursor = conn.cursor()
+            # Newest row of (user, movie) straight off idx_episode_progress_user_movie_recent
+            cursor.execute('''
+                SELECT ep.episode_id, ep.position_seconds, ep.duration_seconds, ep.updated_at,
+                       e.episode_number, e.episode_name, e.server_name
+                FROM episode_progress ep
+                JOIN episodes e ON e.id = ep.episode_id AND e.movie_id = ep.movie_id
+                WHERE ep.user_id = ? AND ep.movie_id = ?
+                ORDER BY ep.updated_at DESC
+                LIMIT 1
+            ''', (session['user_id'], movie_id))
+            row = cursor.fetchone()
+            conn.close()
+            
+            return jsonify({'success': True, 'data': dict(row) if row else None})
+        except Exception as e:
+            print(f"Error getting episode progress: {e}")
+            return jsonify({'success': False, 'error': str(e)}), 500
+    
+    try:
+        data = request.get_json() or {}
+        movie_id = parse_row_id(data['movie_id'])
+        episode_id = parse_row_id(data['episode_id'])
+        position = parse_bounded(data.get('position', 0), 0, MAX_POSITION_SECONDS)
+        duration = parse_bounded(data.get('duration') or 0, 0, MAX_POSITION_SECONDS)
+    except (KeyError, TypeError, AttributeError):
+        return jsonify({'success': False, 'error': 'movie_id, episode_id and position required'}), 400
+    if movie_id is None or episode_id is None:
+        return jsonify({'success': False, 'error': 'movie_id, episode_id and position required'}), 400
+    if position is None or duration is None:
+        return jsonify({'success': False,
+                        'error': f'position and duration must be between 0 and {MAX_POSITION_SECONDS} seconds'}), 400
+    
+    try:
+        if not movie_exists(movie_id) or not existing_episodes([(movie_id, episode_id)]):
+            return jsonify({'success': False, 'error': 'Episode not found'}), 404
+        episode_progress_buffer.add(session['user_id'], movie_id, episode_id, position, duration)
+        cache.delete(continue_watching_key(session['user_id']))
+        return jsonify({'success': True, 'message': 'Episode progress updated'})
+    except Exception as e:
+        print(f"Error updating episode progress: {e}")
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+def build_continue_watching(user_id):
+    """Unfinished titles of a user, newest first, with their resume point
+    
+    Series come from episode_progress (latest episode per series), single
+    movies from unfinished watch_history rows; both are ranged reads on a
+    (user_id, time) index, then one lookup each for titles and episodes.
+    """
+    conn = get_db()
+    cursor = conn.cursor()
+    try:
+        cursor.execute('''
+            SELECT movie_id, episode_id, position_seconds, duration_seconds, updated_at
+            FROM episode_progress
+            WHERE user_id = ?
+            ORDER BY updated_at DESC
+            LIMIT ?
+        ''', (user_id, CONTINUE_WATCHING_SIZE * 5))
+        items = {}
+        for row in cursor.fetchall():
+            items.setdefault(row['movie_id'], {
+                'movie_id': row['movie_id'],
+                'episode_id': row['episode_id'],
+                'position_seconds': row['position_seconds'],
+                'duration_seconds': row['duration_seconds'],
+                'progress': (min(100, int(row['position_seconds'] * 100 / row['duration_seconds']))
+                             if row['duration_seconds'] else None),
+                'last_watched': row['updated_at'],
+            })
+        
+        cursor.execute('''
+            SELECT movie_id, progress, last_watched
+            FROM watch_history
+            WHERE user_id = ? AND completed = 0
+            ORDER BY last_watched DESC
+            LIMIT ?
+        ''', (user_id, CONTINUE_WATCHING_SIZE))
+        for row in cursor.fetchall():
+            items.setdefault(row['movie_id'], {
+                'movie_id': row['movie_id'],
+                'episode_id': None,
+                'position_seconds': None,
+                'duration_seconds': None,
+                'progress': row['progress'],
+                'last_watched': row['last_watched'],
+            })
+        
+        rail = sorted(items.values(), key=lambda item: item['last_watched'], reverse=True)
+        rail = rail[:CONTINUE_WATCHING_SIZE]
+        if not rail:
+            return []
+        
+        movie_ids = [item['movie_id'] for item in rail]
+        placeholders = ','.join(['?'] * len(movie_ids))
+        cursor.execute(f'''
+            SELECT id, title, slug, poster_url, backdrop_url, type, release_year, imdb_rating
+            FROM movies
+            WHERE id IN ({placeholders}) AND status = 'active'
+        ''', tuple(movie_ids))
+        movies = {row['id']: dict(row) for row in cursor.fetchall()}
+        
+        episode_ids = [item['episode_id'] for item in rail if item['episode_id']]
+        episodes = {}
+        if episode_ids:
+            placeholders = ','.join(['?'] * len(episode_ids))
+            cursor.execute(f'''
+                SELECT id, movie_id, episode_number, episode_name
+                FROM episodes
+                WHERE id IN ({placeholders})
+            ''', tuple(episode_ids))
+            episodes = {row['id']: dict(row) for row in cursor.fetchall()}
+    finally:
+        conn.close()
+    
+    result = []
+    for item in rail:
+        movie = movies.get(item['movie_id'])
+        if not movie:
+            continue
+        episode = episodes.get(item['episode_id'])
+        if item['episode_id'] and (not episode or episode['movie_id'] != item['movie_id']):
+            continue  # episode re-imported under a new id
+        result.append({
+            **item,
+            'movie': movie,
+            'episode_number': episode['episode_number'] if episode else None,
+            'episode_name': episode['episode_name'] if episode else None,
+        })
+    return result
+
+@app.route('/api/continue-watching', methods=['GET'])
+@login_required
+def continue_watching():
+    """Continue-watching rail of the current user"""
+    try:
+        user_id = session['user_id']
+        # Buffered positions land first so the rail never lags behind the player
+        if progress_buffer.flush(user_id) + episode_progress_buffer.flush(user_id):
+            cache.delete(continue_watching_key(user_id))
+        
+        rail = cache.get(continue_watching_key(user_id))
+        if rail is None:
+            rail = build_continue_watching(user_id)
+            cache.set(continue_watching_key(user_id), rail, timeout=CONTINUE_WATCHING_TTL)
+        
+        return jsonify({'success': True, 'data': rail})
+    except Exception as e:
+        print(f"Error getting continue watching: {e}")
+        return jsonify({'success': False, 'error': str(e)}), 500
+
 @app.route('/api/favorites', methods=['GET', 'POST', 'DELETE'])
 @login_required
 def favorites():
@@ -1871,10 +2481,11 @@ def favorites():
     
     elif request.method == 'POST':
         try:
-            data = request.get_json()
-            movie_id = data.get('movie_id')
+            data = request.get_json(silent=True) or {}
+            # Same int for the INSERT and favorite_ids (MySQL would round 12.7)
+            movie_id = parse_row_id(data.get('movie_id'))
             
-            if not movie_id:
+            if movie_id is None:
                 return jsonify({'success': False, 'error': 'movie_id required'}), 400
             
             conn = get_db()
@@ -1885,6 +2496,7 @@ def favorites():
                              (session['user_id'], movie_id))
                 conn.commit()
                 conn.close()
+                favorite_ids.add(session['user_id'], movie_id)
                 return jsonify({'success': True, 'message': 'Added to favorites'})
             except Exception as inner_e:
                 conn.close()
@@ -1899,10 +2511,10 @@ def favorites():
     
     else:  # DELETE
         try:
-            data = request.get_json() or {}
-            movie_id = data.get('movie_id')
+            data = request.get_json(silent=True) or {}
+            movie_id = parse_row_id(data.get('movie_id'))
             
-            if not movie_id:
+            if movie_id is None:
                 return jsonify({'success': False, 'error': 'movie_id required'}), 400
             
             conn = get_db()
@@ -1911,6 +2523,7 @@ def favorites():
                          (session['user_id'], movie_id))
             conn.commit()
             conn.close()
+            favorite_ids.remove(session['user_id'], movie_id)
             
             return jsonify({'success': True, 'message': 'Removed from favorites'})
         except Exception as e:
@@ -1929,6 +2542,7 @@ def delete_favorite(movie_id):
         conn.commit()
         affected_rows = cursor.rowcount
         conn.close()
+        favorite_ids.remove(session['user_id'], movie_id)
         
         if affected_rows > 0:
             return jsonify({'success': True, 'message': 'Removed from favorites'})
@@ -1937,110 +2551,243 @@ def delete_favorite(movie_id):
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
 
-@app.route('/api/reviews', methods=['GET', 'POST'])
+@app.route('/api/favorites/ids', methods=['GET'])
+@login_required
+def favorite_movie_ids():
+    """Ids of the current user's favorite movies, ascending"""
+    try:
+        ids = favorite_ids.ids(session['user_id'])
+        return jsonify({'success': True, 'data': ids.tolist(), 'count': len(ids)})
+    except Exception as e:
+        print(f"Error getting favorite ids: {e}")
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@app.route('/api/favorites/contains', methods=['GET'])
+@login_required
+def favorites_contain():
+    """Which of ?ids=1,2,3 are favorites of the current user -> {"1": true, ...}"""
+    try:
+        movie_ids = [int(value) for value in request.args.get('ids', '').split(',') if value.strip()]
+    except ValueError:
+        return jsonify({'success': False, 'error': 'ids must be comma-separated integers'}), 400
+    if not movie_ids:
+        return jsonify({'success': False, 'error': 'ids required'}), 400
+    if len(movie_ids) > FAVORITES_CONTAINS_MAX_IDS:
+        return jsonify({'success': False, 'error': f'At most {FAVORITES_CONTAINS_MAX_IDS} ids'}), 400
+    
+    try:
+        found = favorite_ids.contains(session['user_id'], movie_ids)
+        return jsonify({'success': True, 'data': {str(movie_id): hit for movie_id, hit in found.items()}})
+    except Exception as e:
+        print(f"Error checking favorites: {e}")
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+# Reviews: keyset pages on (movie_id, created_at, id), newest first
+REVIEWS_PAGE_SIZE = 20
+REVIEWS_MAX_PAGE_SIZE = 100
+RATING_SUMMARY_TTL = int(os.getenv('RATING_SUMMARY_TTL', 300))
+
+def rating_summary_key(movie_id):
+    return f'rating_summary:{int(movie_id)}'
+
+def encode_keyset_cursor(row):
+    """Position after a row of a (created_at, id) listing: '<created_at ISO>_<id>'"""
+    created_at = row['created_at']
+    if isinstance(created_at, datetime):
+        created_at = created_at.strftime('%Y-%m-%dT%H:%M:%S')
+    return f"{str(created_at).replace(' ', 'T')}_{row['id']}"
+
+def decode_keyset_cursor(value):
+    """'<created_at ISO>_<id>' -> ('YYYY-MM-DD HH:MM:SS', id); ValueError if malformed"""
+    created_at, _, review_id = value.rpartition('_')
+    created_at = datetime.fromisoformat(created_at)
+    return created_at.strftime('%Y-%m-%d %H:%M:%S'), int(review_id)
+
+@app.route('/api/reviews', methods=['GET'])
 def reviews():
-    """Get or create reviews"""
-    if request.method == 'GET':
-        try:
-            movie_id = request.args.get('movie_id')
-            if not movie_id:
-                return jsonify({'success': False, 'error': 'movie_id required'}), 400
-            
-            conn = get_db()
-            cursor = conn.cursor()
-            cursor.execute('''
-                SELECT r.*, u.name as user_name
-                FROM reviews r
-                JOIN users u ON r.user_id = u.id
-                WHERE r.movie_id = ?
-                ORDER BY r.created_at DESC
-            ''', (movie_id,))
-            
-            reviews_list = [dict(row) for row in cursor.fetchall()]
-            conn.close()
-            
-            return jsonify({'success': True, 'data': reviews_list})
-        except Exception as e:
-            return jsonify({'success': False, 'error': str(e)}), 500
+    """Get a page of reviews
     
-    else:  # POST
+    Query params:
+        movie_id: required
+        limit: page size (default 20, max 100)
+        cursor: next_cursor of the previous page; without it the first page
+            also carries the rating summary (count, average, histogram)
+    """
+    try:
+        movie_id = request.args.get('movie_id', type=int)
+        if not movie_id:
+            return jsonify({'success': False, 'error': 'movie_id required'}), 400
+        limit = min(max(request.args.get('limit', REVIEWS_PAGE_SIZE, type=int), 1), REVIEWS_MAX_PAGE_SIZE)
+        after = request.args.get('cursor')
         try:
-            data = request.get_json()
-            user_id = data.get('user_id')
-            movie_id = data.get('movie_id')
-            rating = data.get('rating')
-            review_text = data.get('review_text', '')
-            
-            if not user_id or not movie_id or not rating:
-                return jsonify({'success': False, 'error': 'user_id, movie_id, and rating required'}), 400
-            
-            if rating < 1 or rating > 5:
-                return jsonify({'success': False, 'error': 'rating must be between 1 and 5'}), 400
-            
-            conn = get_db()
-            cursor = conn.cursor()
-            cursor.execute('''
-                INSERT INTO reviews (user_id, movie_id, rating, review_text)
-                VALUES (?, ?, ?, ?)
-            ''', (user_id, movie_id, rating, review_text))
-            
-            conn.commit()
-            conn.close()
-            
-            return jsonify({'success': True, 'message': 'Review submitted'})
-        except Exception as e:
-            return jsonify({'success': False, 'error': str(e)}), 500
+            after = decode_keyset_cursor(after) if after else None
+        except ValueError:
+            return jsonify({'success': False, 'error': 'Invalid cursor'}), 400
+        
+        conn = get_db()
+        cursor = conn.cursor()
+        where_sql = 'r.movie_id = ?'
+        params = [movie_id]
+        if after:
+            where_sql += ' AND (r.created_at < ? OR (r.created_at = ? AND r.id < ?))'
+            params += [after[0], after[0], after[1]]
+        cursor.execute(f'''
+            SELECT r.*, u.name as user_name
+            FROM reviews r
+            JOIN users u ON r.user_id = u.id
+            WHERE {where_sql}
+            ORDER BY r.created_at DESC, r.id DESC
+            LIMIT ?
+        ''', (*params, limit + 1))
+        
+        reviews_list = [dict(row) for row in cursor.fetchall()]
+        has_more = len(reviews_list) > limit
+        reviews_list = reviews_list[:limit]
+        
+        summary = None
+        if not after:
+            summary = cache.get(rating_summary_key(movie_id))
+            if summary is None:
+                summary = get_summary(cursor, movie_id)
+                cache.set(rating_summary_key(movie_id), summary, timeout=RATING_SUMMARY_TTL)
+        conn.close()
+        
+        return jsonify({
+            'success': True,
+            'data': reviews_list,
+            'summary': summary,
+            'has_more': has_more,
+            'next_cursor': encode_keyset_cursor(reviews_list[-1]) if has_more else None,
+        })
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@app.route('/api/reviews', methods=['POST'])
+@login_required
+def create_review():
+    """Review a movie as the logged-in user"""
+    try:
+        data = request.get_json()
+        user_id = session['user_id']
+        movie_id = data.get('movie_id')
+        rating = data.get('rating')
+        review_text = data.get('review_text', '')
+
+        if not movie_id or not rating:
+            return jsonify({'success': False, 'error': 'movie_id and rating required'}), 400
 
-@app.route('/api/comments', methods=['GET', 'POST'])
+        if not isinstance(rating, int) or rating < 1 or rating > 5:
+            return jsonify({'success': False, 'error': 'rating must be between 1 and 5'}), 400
+
+        conn = get_db()
+        cursor = conn.cursor()
+        cursor.execute('''
+            INSERT INTO reviews (user_id, movie_id, rating, review_text)
+            VALUES (?, ?, ?, ?)
+        ''', (user_id, movie_id, rating, review_text))
+        # Same transaction: the summary never disagrees with the reviews
+        apply_review(cursor, movie_id, rating)
+
+        conn.commit()
+        conn.close()
+        cache.delete(rating_summary_key(movie_id))
+
+        return jsonify({'success': True, 'message': 'Review submitted'})
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+# Comments: pages of whole threads, keyset on the top-level comments
+COMMENT_THREADS_PAGE_SIZE = 10
+COMMENT_THREADS_MAX_PAGE_SIZE = 50
+COMMENTS_FIRST_PAGE_TTL = int(os.getenv('COMMENTS_FIRST_PAGE_TTL', 300))
+
+def comments_first_page_key(movie_id):
+    return f'comments_first_page:{int(movie_id)}'
+
+@app.route('/api/comments', methods=['GET'])
 def comments():
-    """Get or create comments"""
-    if request.method == 'GET':
+    """Get a page of comment threads
+    
+    Query params:
+        movie_id: required
+        limit: top-level comments per page (default 10, max 50), each with
+            its whole reply tree under 'replies'
+        cursor: next_cursor of the previous page
+    """
+    try:
+        movie_id = request.args.get('movie_id', type=int)
+        if not movie_id:
+            return jsonify({'success': False, 'error': 'movie_id required'}), 400
+        limit = min(max(request.args.get('limit', COMMENT_THREADS_PAGE_SIZE, type=int), 1),
+                    COMMENT_THREADS_MAX_PAGE_SIZE)
+        after = request.args.get('cursor')
         try:
-            movie_id = request.args.get('movie_id')
-            if not movie_id:
-                return jsonify({'success': False, 'error': 'movie_id required'}), 400
-            
-            conn = get_db()
-            cursor = conn.cursor()
-            cursor.execute('''
-                SELECT c.*, u.name as user_name
-                FROM comments c
-                JOIN users u ON c.user_id = u.id
-                WHERE c.movie_id = ? AND c.parent_id IS NULL
-                ORDER BY c.created_at DESC
-            ''', (movie_id,))
-            
-            comments_list = [dict(row) for row in cursor.fetchall()]
-            conn.close()
-            
-            return jsonify({'success': True, 'data': comments_list})
-        except Exception as e:
-            return jsonify({'success': False, 'error': str(e)}), 500
+            after = decode_keyset_cursor(after) if after else None
+        except ValueError:
+            return jsonify({'success': False, 'error': 'Invalid cursor'}), 400
+        
+        # Default first pages take the read traffic; dropped on every new comment
+        cacheable = not after and limit == COMMENT_THREADS_PAGE_SIZE
+        if cacheable:
+            cached = cache.get(comments_first_page_key(movie_id))
+            if cached is not None:
+                return jsonify(cached)
+        
+        conn = get_db()
+        cursor = conn.cursor()
+        # One more root than shown tells whether another page exists
+        sql, params = thread_page_query(movie_id, limit + 1, after)
+        cursor.execute(sql, params)
+        threads = build_comment_tree(cursor.fetchall())
+        conn.close()
+        
+        has_more = len(threads) > limit
+        threads = threads[:limit]
+        result = {
+            'success': True,
+            'data': threads,
+            'has_more': has_more,
+            'next_cursor': encode_keyset_cursor(threads[-1]) if has_more else None,
+        }
+        if cacheable:
+            cache.set(comments_first_page_key(movie_id), result, timeout=COMMENTS_FIRST_PAGE_TTL)
+        
+        return jsonify(result)
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@app.route('/api/comments', methods=['POST'])
+@login_required
+def create_comment():
+    """Comment as the logged-in user
     
-    else:  # POST
+    Body: movie_id, comment_text, parent_id (optional, for a reply)
+    """
+    try:
+        data = request.get_json()
+        user_id = session['user_id']
+        movie_id = data.get('movie_id')
+        comment_text = data.get('comment_text')
+        parent_id = data.get('parent_id')
+        
+        if not movie_id or not comment_text:
+            return jsonify({'success': False, 'error': 'movie_id and comment_text required'}), 400
+        
+        conn = get_db()
+        cursor = conn.cursor()
         try:
-            data = request.get_json()
-            user_id = data.get('user_id')
-            movie_id = data.get('movie_id')
-            comment_text = data.get('comment_text')
-            parent_id = data.get('parent_id')
-            
-            if not user_id or not movie_id or not comment_text:
-                return jsonify({'success': False, 'error': 'user_id, movie_id, and comment_text required'}), 400
-            
-            conn = get_db()
-            cursor = conn.cursor()
-            cursor.execute('''
-                INSERT INTO comments (user_id, movie_id, parent_id, comment_text)
-                VALUES (?, ?, ?, ?)
-            ''', (user_id, movie_id, parent_id, comment_text))
-            
-            conn.commit()
+            comment_id = add_comment(cursor, user_id, movie_id, comment_text, parent_id)
+        except ValueError as e:
             conn.close()
-            
-            return jsonify({'success': True, 'message': 'Comment posted'})
-        except Exception as e:
-            return jsonify({'success': False, 'error': str(e)}), 500
+            return jsonify({'success': False, 'error': str(e)}), 400
+        
+        conn.commit()
+        conn.close()
+        cache.delete(comments_first_page_key(movie_id))
+        
+        return jsonify({'success': True, 'message': 'Comment posted', 'id': comment_id})
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
 
 @app.route('/api/subscription/plans', methods=['GET'])
 def get_subscription_plans():
@@ -2075,16 +2822,17 @@ def get_subscription_plans():
     return jsonify({'success': True, 'data': plans})
 
 @app.route('/api/subscription/subscribe', methods=['POST'])
+@login_required
 def subscribe():
-    """Subscribe to a plan"""
+    """Subscribe the logged-in user to a plan"""
     try:
         data = request.get_json()
-        user_id = data.get('user_id')
+        user_id = session['user_id']
         plan_id = data.get('plan_id')
         payment_method = data.get('payment_method')
         
-        if not user_id or not plan_id:
-            return jsonify({'success': False, 'error': 'user_id and plan_id required'}), 400
+        if not plan_id:
+            return jsonify({'success': False, 'error': 'plan_id required'}), 400
         
         # Get plan details
         plans = {
@@ -2103,7 +2851,7 @@ def subscribe():
         # Create subscription
         cursor.execute('''
             INSERT INTO subscriptions (user_id, plan_name, price, end_date, status)
-            VALUES (?, ?, ?, datetime('now', '+' || ? || ' days'), 'active')
+            VALUES (?, ?, ?, DATE_ADD(NOW(), INTERVAL ? DAY), 'active')
         ''', (user_id, plan['name'], plan['price'], plan['days']))
         
         subscription_id = cursor.lastrowid
@@ -2111,7 +2859,7 @@ def subscribe():
         # Update user subscription tier
         cursor.execute('''
             UPDATE users 
-            SET subscription_tier = ?, subscription_expires = datetime('now', '+' || ? || ' days')
+            SET subscription_tier = ?, subscription_expires = DATE_ADD(NOW(), INTERVAL ? DAY)
             WHERE id = ?
         ''', (plan_id, plan['days'], user_id))
         
@@ -2126,6 +2874,8 @@ def subscribe():
         
         conn.commit()
         conn.close()
+        user_cache.invalidate(user_id)
+        entitlements.invalidate(user_id)
         
         return jsonify({
             'success': True, 
@@ -2135,6 +2885,34 @@ def subscribe():
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
 
+@app.route('/api/subscription/entitlement', methods=['GET'])
+def get_entitlement():
+    """Effective subscription tier of the current user ('free' when logged out)"""
+    try:
+        return jsonify({'success': True, 'data': entitlements.get(session.get('user_id'))})
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@app.route('/api/movies/<int:movie_id>/access', methods=['GET'])
+def get_movie_access(movie_id):
+    """Whether the current user may play a movie (premium content needs a paid tier)"""
+    try:
+        is_premium = movie_is_premium(movie_id)
+        if is_premium is None:
+            return jsonify({'success': False, 'error': 'Movie not found'}), 404
+        tier = entitlements.tier(session.get('user_id'))
+        return jsonify({
+            'success': True,
+            'data': {
+                'movie_id': movie_id,
+                'is_premium': is_premium,
+                'tier': tier,
+                'can_watch': not is_premium or tier != 'free'
+            }
+        })
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
 # ===== ADMIN APIs =====
 
 @app.route('/api/admin/movies', methods=['POST'])
@@ -2154,8 +2932,9 @@ def admin_create_movie():
             INSERT INTO movies (
                 title, original_title, description, release_year, duration,
                 country, language, director, cast, genres, imdb_rating,
-                poster_url, backdrop_url, trailer_url, video_url, is_premium, status
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                poster_url, backdrop_url, trailer_url, video_url, is_premium, status,
+                title_search, original_title_search
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
         ''', (
             data.get('title'),
             data.get('original_title'),
@@ -2173,11 +2952,14 @@ def admin_create_movie():
             data.get('trailer_url'),
             data.get('video_url'),
             data.get('is_premium', 0),
-            data.get('status', 'active')
+            data.get('status', 'active'),
+            smart_search.to_search_form(data.get('title')),
+            smart_search.to_search_form(data.get('original_title'))
         ))
+        movie_id = cursor.lastrowid
+        record_movie_change(cursor, movie_id, 'inserted')
         
         conn.commit()
-        movie_id = cursor.lastrowid
         conn.close()
         
         return jsonify({'success': True, 'message': 'Movie created', 'id': movie_id}), 201
@@ -2199,6 +2981,7 @@ def admin_update_movie(movie_id):
                 duration = ?, country = ?, language = ?, director = ?, cast = ?,
                 genres = ?, imdb_rating = ?, poster_url = ?, backdrop_url = ?,
                 trailer_url = ?, video_url = ?, is_premium = ?, status = ?,
+                title_search = ?, original_title_search = ?,
                 updated_at = CURRENT_TIMESTAMP
             WHERE id = ?
         ''', (
@@ -2219,8 +3002,11 @@ def admin_update_movie(movie_id):
             data.get('video_url'),
             data.get('is_premium', 0),
             data.get('status', 'active'),
+            smart_search.to_search_form(data.get('title')),
+            smart_search.to_search_form(data.get('original_title')),
             movie_id
         ))
+        record_movie_change(cursor, movie_id, 'updated')
         
         conn.commit()
         conn.close()
@@ -2236,6 +3022,7 @@ def admin_delete_movie(movie_id):
         conn = get_db()
         cursor = conn.cursor()
         cursor.execute('DELETE FROM movies WHERE id = ?', (movie_id,))
+        record_movie_change(cursor, movie_id, 'deleted')
         conn.commit()
         conn.close()
         
@@ -2315,6 +3102,19 @@ if __name__ == '__main__':
     init_db()
     print('✅ Database initialized successfully!\n')
     
+    # Warm hot cache keys in the background while the server starts
+    loaded = cache_warmer.load_hot_paths()
+    print(f'🔥 Cache warm-up scheduled ({loaded} recorded hot paths)')
+    cache_warmer.warm_async('startup', delay=1.0)
+    
+    # Follow importer / admin writes and evict only what they touched
+    movie_change_listener.start()
+    print('🔔 Listening for movie changes')
+    
+    # Expire lapsed subscriptions now and every SUBSCRIPTION_EXPIRY_INTERVAL seconds
+    subscription_expiry_job.start()
+    print('⏰ Subscription expiry job started')
+    
     print('🌐 Starting Flask server...')
     print('━'*70)
     print('� Server Status: ONLINE')
@@ -0,0 +1,267 @@
+"""
+Cache Manager - Stampede-safe view caching
+Wraps the Flask-Caching backend with single-flight recomputation,
+soft/hard TTLs (stale-while-revalidate) and jittered expiry
+"""
+
+import math
+import random
+import threading
+import time
+from collections import Counter, defaultdict
+from functools import wraps
+from urllib.parse import urlencode
+
+from flask import request
+
+
+class StaleWhileRevalidateCache:
+    """View cache decorator that never lets an expiry turn into a stampede
+
+    Each entry has a soft TTL (jittered around ``timeout``) and a hard TTL
+    (soft TTL + stale window). Between the two the stale response is served
+    immediately while exactly one background thread rebuilds it. On a hard
+    miss only one request per key recomputes; concurrent requests wait for
+    its result instead of all hitting MySQL with the same query.
+    """
+
+    # Requests with this WSGI environ key bypass the cached entry and rebuild
+    # it; they are not counted as user traffic. Only the in-process warmer and
+    # background refreshes set it (environ_overrides) - HTTP headers land under HTTP_*
+    WARM_ENVIRON_KEY = 'swr_cache.warm'
+
+    def __init__(self, cache, app=None, jitter=0.1, stale_factor=1.0, wait_timeout=10.0,
+                 max_tracked_paths=2000, max_variants_per_path=5000):
+        self.cache = cache
+        self.app = app
+        self.jitter = jitter
+        self.stale_factor = stale_factor
+        self.wait_timeout = wait_timeout
+        self.max_tracked_paths = max_tracked_paths
+        self._mutex = threading.Lock()
+        self._inflight = {}  # key -> threading.Event, only while recomputing
+        self._path_counts = Counter()  # request frequency per cached path
+        self.max_variants_per_path = max_variants_per_path
+        self._variants = defaultdict(set)  # request.path -> keys stored for it (all query strings)
+
+    def init_app(self, app):
+        """Bind the Flask app (needed to rebuild entries outside a request)"""
+        self.app = app
+
+    # ------------------------------------------------------------------
+    # Keys
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def make_path(path, args=None):
+        """Canonical path + sorted query string for a cached request"""
+        if not args:
+            return path
+        items = args.items(multi=True) if hasattr(args, 'getlist') else args.items()
+        return f'{path}?{urlencode(sorted(items))}'
+
+    @classmethod
+    def make_key(cls, path, args=None):
+        """Build the cache key for a path and (optional) query args"""
+        return f'swr:{cls.make_path(path, args)}'
+
+    # ------------------------------------------------------------------
+    # Request frequency (feeds the cache warmer)
+    # ------------------------------------------------------------------
+
+    def record_request(self, path, count=1):
+        """Count a request for a cached path, pruning cold paths when full"""
+        with self._mutex:
+            self._path_counts[path] += count
+            if len(self._path_counts) > self.max_tracked_paths:
+                keep = self._path_counts.most_common(self.max_tracked_paths // 2)
+                self._path_counts = Counter(dict(keep))
+
+    def hot_paths(self, limit=50):
+        """Most frequently requested cached paths as [(path, count)]"""
+        with self._mutex:
+            return self._path_counts.most_common(limit)
+
+    # ------------------------------------------------------------------
+    # Entries
+    # ------------------------------------------------------------------
+
+    def _soft_ttl(self, timeout):
+        """Jittered soft TTL so entries created together don't expire together"""
+        if not self.jitter:
+            return float(timeout)
+        return timeout * random.uniform(1.0 - self.jitter, 1.0 + self.jitter)
+
+    def _compute(self, key, f, args, kwargs, timeout, stale_timeout):
+        """Run the view and store the response if it is cacheable
+
+        Returns (response, entry); entry is None for non-200 responses,
+        which are passed through but never cached.
+        """
+        response = self.app.make_response(f(*args, **kwargs))
+        if response.status_code != 200 or response.direct_passthrough:
+            return response, None
+
+        soft_ttl = self._soft_ttl(timeout)
+        stale = timeout * self.stale_factor if stale_timeout is None else stale_timeout
+        hard_ttl = int(math.ceil(soft_ttl + stale))
+        entry = {
+            'body': response.get_data(),
+            'content_type': response.content_type,
+            'soft_expires': time.time() + soft_ttl,
+            'hard_expires': time.time() + hard_ttl,
+        }
+        self.cache.set(key, entry, timeout=hard_ttl)
+        self._track(request.path, key)
+        return response, entry
+
+    # ------------------------------------------------------------------
+    # Targeted invalidation (change feed)
+    # ------------------------------------------------------------------
+
+    def _track(self, path, key):
+        with self._mutex:
+            variants = self._variants[path]
+            if len(variants) >= self.max_variants_per_path:
+                # Untracked entries still expire on their own TTL
+                variants.clear()
+            variants.add(key)
+
+    def _take_variants(self, path):
+        with self._mutex:
+            return self._variants.pop(path, set())
+
+    def invalidate(self, path):
+        """Delete every cached variant (query string) of a path
+
+        The next request rebuilds it (single-flight). Returns the number of
+        keys dropped.
+        """
+        keys = self._take_variants(path)
+        for key in keys:
+            self.cache.delete(key)
+        return len(keys)
+
+    def expire(self, path):
+        """Mark every cached variant of a path stale without dropping it
+
+        The next request is still served instantly from the old body while
+        one background thread rebuilds it - for hot list pages where a short
+        stale window beats a synchronous rebuild. Returns the number of
+        entries marked.
+        """
+        marked = 0
+        now = time.time()
+        for key in self._take_variants(path):
+            entry = self.cache.get(key)
+            if entry is None:
+                continue
+            remaining = int(entry.get('hard_expires', 0) - now)
+            if remaining <= 0:
+                self.cache.delete(key)
+                continue
+            entry['soft_expires'] = 0
+            self.cache.set(key, entry, timeout=remaining)
+            self._track(path, key)
+            marked += 1
+        return marked
+
+    def cached_paths(self, prefix=''):
+        """Paths (without query string) that currently have tracked entries"""
+        with self._mutex:
+            return [path for path, keys in self._variants.items() if keys and path.startswith(prefix)]
+
+    def _to_response(self, entry):
+        return self.app.response_class(entry['body'], status=200, content_type=entry['content_type'])
+
+    # ------------------------------------------------------------------
+    # Single-flight bookkeeping
+    # ------------------------------------------------------------------
+
+    def _claim(self, key):
+        """Return (event, is_leader) for the in-flight computation of key"""
+        with self._mutex:
+            event = self._inflight.get(key)
+            if event is not None:
+                return event, False
+            event = self._inflight[key] = threading.Event()
+            return event, True
+
+    def _release(self, key, event):
+        with self._mutex:
+            self._inflight.pop(key, None)
+        event.set()
+
+    def _refresh_in_background(self, key, f, args, kwargs, timeout, stale_timeout):
+        """Rebuild a stale entry in a daemon thread (at most one per key)"""
+        event, is_leader = self._claim(key)
+        if not is_leader:
+            return
+
+        path = request.path
+        query_string = request.query_string.decode('utf-8')
+
+        def refresh():
+            try:
+                # Marked like a warm-up: no user is behind this request
+                with self.app.test_request_context(path, query_string=query_string,
+                                                   environ_overrides={self.WARM_ENVIRON_KEY: True}):
+                    self._compute(key, f, args, kwargs, timeout, stale_timeout)
+            except Exception as e:
+                print(f"⚠️ [Cache] Background refresh failed for {key}: {e}")
+            finally:
+                self._release(key, event)
+
+        threading.Thread(target=refresh, daemon=True).start()
+
+    # ------------------------------------------------------------------
+    # Decorator
+    # ------------------------------------------------------------------
+
+    def cached(self, timeout=300, stale_timeout=None, query_string=False):
+        """Cache a GET view with stale-while-revalidate semantics
+
+        Args:
+            timeout: Soft TTL in seconds (jittered by ``self.jitter``)
+            stale_timeout: How long a stale entry may still be served while
+                it is being rebuilt (default: ``timeout * stale_factor``)
+            query_string: Include the sorted query args in the cache key
+        """
+        def decorator(f):
+            @wraps(f)
+            def decorated_function(*args, **kwargs):
+                if request.method != 'GET':
+                    return f(*args, **kwargs)
+
+                path = self.make_path(request.path, request.args if query_string else None)
+                key = f'swr:{path}'
+                if request.environ.get(self.WARM_ENVIRON_KEY):
+                    response, _ = self._compute(key, f, args, kwargs, timeout, stale_timeout)
+                    return response
+
+                self.record_request(path)
+                entry = self.cache.get(key)
+
+                if entry is not None:
+                    if time.time() >= entry['soft_expires']:
+                        self._refresh_in_background(key, f, args, kwargs, timeout, stale_timeout)
+                    return self._to_response(entry)
+
+                # Hard miss: one leader recomputes, followers wait for its result
+                event, is_leader = self._claim(key)
+                if is_leader:
+                    try:
+                        response, _ = self._compute(key, f, args, kwargs, timeout, stale_timeout)
+                        return response
+                    finally:
+                        self._release(key, event)
+
+                event.wait(self.wait_timeout)
+                entry = self.cache.get(key)
+                if entry is not None:
+                    return self._to_response(entry)
+                # Leader failed or produced an uncacheable response
+                return f(*args, **kwargs)
+
+            return decorated_function
+        return decorator
@@ -0,0 +1,150 @@
+"""
+Cache Warmer - Replays hot cached routes after boot, cache clears and imports
+Hot paths come from recorded request frequency (persisted across restarts)
+plus a configurable seed list, replayed at a bounded rate
+"""
+
+import json
+import os
+import threading
+import time
+
+# Routes the home page needs on every cold start
+DEFAULT_SEED_PATHS = [
+    '/api/movies?order=desc&per_page=500&sort=updated_at',
+    '/api/movies',
+    '/api/genres',
+]
+
+
+class CacheWarmer:
+    """Rebuilds the hottest cache entries so first visitors don't pay for them"""
+
+    def __init__(self, app, swr_cache, seed_paths=None, hot_file=None, max_keys=30, rate=5.0):
+        """
+        Args:
+            app: Flask app (requests are replayed through its test client)
+            swr_cache: StaleWhileRevalidateCache that records request frequency
+            seed_paths: Paths that are always warmed, hot or not
+            hot_file: JSON file where request counts survive restarts
+            max_keys: Maximum number of paths replayed per warm-up
+            rate: Maximum paths replayed per second (protects MySQL)
+        """
+        self.app = app
+        self.swr_cache = swr_cache
+        self.seed_paths = list(seed_paths if seed_paths is not None else DEFAULT_SEED_PATHS)
+        self.hot_file = hot_file
+        self.max_keys = max_keys
+        self.rate = rate
+        self.last_report = None
+        self._running = threading.Lock()
+
+    # ------------------------------------------------------------------
+    # Persisted request frequency
+    # ------------------------------------------------------------------
+
+    def load_hot_paths(self):
+        """Seed the request counter from the last saved snapshot"""
+        if not self.hot_file or not os.path.exists(self.hot_file):
+            return 0
+        try:
+            with open(self.hot_file, 'r', encoding='utf-8') as fh:
+                counts = json.load(fh)
+            for path, count in counts.items():
+                self.swr_cache.record_request(path, int(count))
+            return len(counts)
+        except Exception as e:
+            print(f"⚠️ [Warmup] Could not load hot paths: {e}")
+            return 0
+
+    def save_hot_paths(self, limit=200):
+        """Persist the current top paths so the next boot knows what is hot"""
+        if not self.hot_file:
+            return
+        try:
+            counts = dict(self.swr_cache.hot_paths(limit))
+            tmp_file = f'{self.hot_file}.tmp'
+            with open(tmp_file, 'w', encoding='utf-8') as fh:
+                json.dump(counts, fh, ensure_ascii=False)
+            os.replace(tmp_file, self.hot_file)
+        except Exception as e:
+            print(f"⚠️ [Warmup] Could not save hot paths: {e}")
+
+    # ------------------------------------------------------------------
+    # Warm-up
+    # ------------------------------------------------------------------
+
+    def paths_to_warm(self):
+        """Seed paths first, then the most requested ones, up to max_keys"""
+        paths = []
+        for path in self.seed_paths:
+            if path not in paths:
+                paths.append(path)
+        for path, _ in self.swr_cache.hot_paths(self.max_keys * 2):
+            if len(paths) >= self.max_keys:
+                break
+            if path not in paths:
+                paths.append(path)
+        return paths[:self.max_keys]
+
+    def warm(self, reason='manual'):
+        """Replay hot paths synchronously and return a report dict
+
+        Only one warm-up runs at a time; a concurrent call returns None.
+        """
+        if not self._running.acquire(blocking=False):
+            print(f"⏭️ [Warmup] Skipped ({reason}): a warm-up is already running")
+            return None
+
+        try:
+            self.save_hot_paths()
+            paths = self.paths_to_warm()
+            interval = 1.0 / self.rate if self.rate else 0.0
+            warmed = 0
+            failed = []
+            started = time.time()
+
+            client = self.app.test_client()
+            for path in paths:
+                key_started = time.time()
+                try:
+                    response = client.get(path, environ_overrides={self.swr_cache.WARM_ENVIRON_KEY: True})
+                    if response.status_code == 200:
+                        warmed += 1
+                    else:
+                        failed.append(path)
+                except Exception as e:
+                    print(f"⚠️ [Warmup] {path} failed: {e}")
+                    failed.append(path)
+                # Rate limit: never replay more than `rate` paths per second
+                remaining = interval - (time.time() - key_started)
+                if remaining > 0:
+                    time.sleep(remaining)
+
+            report = {
+                'reason': reason,
+                'warmed': warmed,
+                'failed': len(failed),
+                'failed_paths': failed,
+                'duration_ms': round((time.time() - started) * 1000.0, 1),
+                'finished_at': time.strftime('%Y-%m-%d %H:%M:%S'),
+            }
+            self.last_report = report
+            print(f"🔥 [Warmup] {reason}: warmed {warmed}/{len(paths)} keys in {report['duration_ms']} ms")
+            return report
+        finally:
+            self._running.release()
+
+    def warm_async(self, reason='manual', delay=0.0):
+        """Run warm() in a daemon thread (optionally after a delay)"""
+        def run():
+            if delay:
+                time.sleep(delay)
+            try:
+                self.warm(reason)
+            except Exception as e:
+                print(f"❌ [Warmup] {reason} failed: {e}")
+
+        thread = threading.Thread(target=run, daemon=True)
+        thread.start()
+        return thread
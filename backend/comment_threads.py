@@ -0,0 +1,112 @@
+"""
+Comment Threads - Root-keyed comment trees
+Every comment stores the id of its thread's top-level comment (root_id; a
+top-level comment is its own root) and a count of its direct replies, so a
+page of threads is one indexed query on (movie_id, root_id, created_at) and
+the tree is rebuilt in a single pass over the rows
+"""
+
+# Whole threads of one page of top-level comments (newest first). The
+# derived table picks the roots (keyset on created_at, id); the outer join
+# pulls each root's subtree through idx_comments_movie_root_created.
+THREAD_PAGE_SQL = '''
+    SELECT c.id, c.user_id, c.movie_id, c.parent_id, c.root_id, c.comment_text,
+           c.likes, c.reply_count, c.created_at, u.name AS user_name
+    FROM (
+        SELECT id FROM comments
+        WHERE movie_id = ? AND parent_id IS NULL {keyset}
+        ORDER BY created_at DESC, id DESC
+        LIMIT ?
+    ) page
+    JOIN comments c ON c.movie_id = ? AND c.root_id = page.id
+    JOIN users u ON c.user_id = u.id
+    ORDER BY c.created_at, c.id
+'''
+
+THREAD_PAGE_KEYSET = 'AND (created_at < ? OR (created_at = ? AND id < ?))'
+
+
+def thread_page_query(movie_id, limit, after=None):
+    """(sql, params) of a page of ``limit`` threads; after = (created_at, id) of the last root shown"""
+    if after:
+        return (THREAD_PAGE_SQL.format(keyset=THREAD_PAGE_KEYSET),
+                (movie_id, after[0], after[0], after[1], limit, movie_id))
+    return THREAD_PAGE_SQL.format(keyset=''), (movie_id, limit, movie_id)
+
+
+def build_comment_tree(rows):
+    """Nest rows (oldest first, as THREAD_PAGE_SQL returns them) into threads in O(n)
+
+    A parent is always older than its replies, so one pass sees it first.
+    Roots come back newest first, replies under their parent oldest first
+    (conversation order). Each node gets a 'replies' list.
+    """
+    nodes = {}
+    roots = []
+    for row in rows:
+        node = dict(row)
+        node['replies'] = []
+        nodes[node['id']] = node
+        if node['parent_id'] is None:
+            roots.append(node)
+        elif node['parent_id'] in nodes:
+            nodes[node['parent_id']]['replies'].append(node)
+    roots.reverse()
+    return roots
+
+
+def add_comment(cursor, user_id, movie_id, comment_text, parent_id=None):
+    """Insert a comment with its root_id and bump the parent's reply_count
+
+    Call inside the transaction (commit afterwards). Returns the new id, or
+    raises ValueError when the parent does not exist on this movie.
+    """
+    root_id = None
+    if parent_id:
+        cursor.execute('SELECT id, movie_id, root_id FROM comments WHERE id = ?', (parent_id,))
+        parent = cursor.fetchone()
+        if not parent or int(parent['movie_id']) != int(movie_id):
+            raise ValueError('Parent comment not found')
+        root_id = parent['root_id'] or parent['id']
+
+    cursor.execute('''
+        INSERT INTO comments (user_id, movie_id, parent_id, root_id, comment_text)
+        VALUES (?, ?, ?, ?, ?)
+    ''', (user_id, movie_id, parent_id or None, root_id, comment_text))
+    comment_id = cursor.lastrowid
+
+    if parent_id:
+        cursor.execute('UPDATE comments SET reply_count = reply_count + 1 WHERE id = ?', (parent_id,))
+    else:
+        cursor.execute('UPDATE comments SET root_id = id WHERE id = ?', (comment_id,))
+    return comment_id
+
+
+def backfill_comment_threads(cursor):
+    """Fill root_id / reply_count of comments written before the columns existed
+
+    Does nothing (returns False) once no comment has root_id IS NULL.
+    """
+    cursor.execute('SELECT 1 AS found FROM comments WHERE root_id IS NULL LIMIT 1')
+    if not cursor.fetchone():
+        return False
+    cursor.execute('UPDATE comments SET root_id = id WHERE parent_id IS NULL AND root_id IS NULL')
+    # One level of depth per pass
+    while True:
+        cursor.execute('''
+            UPDATE comments c
+            JOIN comments p ON c.parent_id = p.id
+            SET c.root_id = p.root_id
+            WHERE c.root_id IS NULL AND p.root_id IS NOT NULL
+        ''')
+        if not cursor.rowcount:
+            break
+    cursor.execute('''
+        UPDATE comments c
+        JOIN (
+            SELECT parent_id, COUNT(*) AS replies FROM comments
+            WHERE parent_id IS NOT NULL GROUP BY parent_id
+        ) r ON r.parent_id = c.id
+        SET c.reply_count = r.replies
+    ''')
+    return True
@@ -0,0 +1,275 @@
+"""
+DB Indexes - Declared secondary indexes and query plan report
+Every index the routes and the importer rely on is listed here per table;
+ensure_indexes() creates the missing ones online (InnoDB in-place, no
+write lock) and explain_report() runs EXPLAIN on the route queries to
+flag full table scans
+"""
+
+from collections import namedtuple
+
+IndexSpec = namedtuple('IndexSpec', 'table name columns kind')
+
+
+def _index(table, name, *columns, kind='INDEX'):
+    return IndexSpec(table, name, tuple(columns), kind)
+
+
+REQUIRED_INDEXES = [
+    # Movies: listing filters / sorts, detail by slug, importer lookup, exports
+    _index('movies', 'idx_movies_status_created', 'status', 'created_at'),
+    _index('movies', 'idx_movies_status_updated', 'status', 'updated_at'),
+    _index('movies', 'idx_movies_status_views', 'status', 'views'),
+    _index('movies', 'idx_movies_status_rating', 'status', 'imdb_rating'),
+    _index('movies', 'idx_movies_type', 'type'),
+    _index('movies', 'idx_movies_year', 'release_year'),
+    _index('movies', 'idx_movies_slug', 'slug(191)'),
+    _index('movies', 'idx_movies_title', 'title(191)'),
+    _index('movies', 'idx_movies_title_search', 'title_search(191)'),
+    _index('movies', 'idx_movies_updated', 'updated_at', 'id'),
+    # Genres
+    _index('genres', 'idx_genres_slug', 'slug'),
+    _index('movie_genres', 'idx_movie_genres_genre', 'genre_id', 'movie_id'),
+    _index('movie_genres', 'idx_movie_genres_movie', 'movie_id', 'genre_id'),
+    # User-scoped tables: profile pages read the newest rows of one user
+    _index('watch_history', 'idx_watch_history_user_recent', 'user_id', 'last_watched'),
+    # One row per (user, movie): progress writes are upserts on this key
+    _index('watch_history', 'uq_watch_history_user_movie', 'user_id', 'movie_id', kind='UNIQUE'),
+    _index('favorites', 'idx_favorites_user_created', 'user_id', 'created_at'),
+    # Resume point of one series / continue-watching rail of one user
+    _index('episode_progress', 'idx_episode_progress_user_movie_recent', 'user_id', 'movie_id', 'updated_at'),
+    _index('episode_progress', 'idx_episode_progress_user_recent', 'user_id', 'updated_at'),
+    # Detail page: reviews / comments of one movie, newest first (the implicit
+    # trailing primary key makes the reviews one a (movie_id, created_at, id) keyset)
+    _index('reviews', 'idx_reviews_movie_created', 'movie_id', 'created_at'),
+    _index('comments', 'idx_comments_movie_created', 'movie_id', 'created_at'),
+    # Comment threads: top-level page, then whole subtrees by root
+    _index('comments', 'idx_comments_movie_parent_created', 'movie_id', 'parent_id', 'created_at'),
+    _index('comments', 'idx_comments_movie_root_created', 'movie_id', 'root_id', 'created_at'),
+    # Subscriptions: entitlement of one user, bulk expiry of lapsed rows
+    _index('subscriptions', 'idx_subscriptions_user_status_end', 'user_id', 'status', 'end_date'),
+    _index('subscriptions', 'idx_subscriptions_status_end', 'status', 'end_date'),
+    _index('users', 'idx_users_subscription_expires', 'subscription_expires'),
+    # Episodes: player lookup by number, importer dedupe by (name, server)
+    _index('episodes', 'idx_episodes_movie_number', 'movie_id', 'episode_number'),
+    _index('episodes', 'idx_episodes_movie_name_server', 'movie_id', 'episode_name(191)', 'server_name'),
+    # Search
+    _index('movies', 'ft_title', 'title', kind='FULLTEXT'),
+    _index('movies', 'ft_original_title', 'original_title', kind='FULLTEXT'),
+    _index('movies', 'ft_description', 'description', kind='FULLTEXT'),
+    _index('movies', 'ft_search_all', 'title', 'original_title', 'description', kind='FULLTEXT'),
+    _index('movies', 'ft_title_search', 'title_search', 'original_title_search', kind='FULLTEXT'),
+]
+
+# Run right before creating a unique index that is missing: rows that would
+# violate it are removed (for watch_history the most recent row is kept)
+DEDUPE_BEFORE_UNIQUE = {
+    'uq_watch_history_user_movie': '''
+        DELETE older FROM watch_history older
+        JOIN watch_history newer
+          ON newer.user_id = older.user_id AND newer.movie_id = older.movie_id
+         AND (newer.last_watched > older.last_watched
+              OR (newer.last_watched = older.last_watched AND newer.id > older.id))
+    ''',
+}
+
+
+def _column_name(column):
+    """'title(191)' -> 'title'"""
+    return column.split('(', 1)[0].strip()
+
+
+def existing_indexes(cursor):
+    """{table: {index_name: (kind, [columns in order])}} of the current schema"""
+    cursor.execute('''
+        SELECT TABLE_NAME AS table_name, INDEX_NAME AS index_name, COLUMN_NAME AS column_name,
+               NON_UNIQUE AS non_unique, INDEX_TYPE AS index_type
+        FROM information_schema.STATISTICS
+        WHERE TABLE_SCHEMA = DATABASE()
+        ORDER BY TABLE_NAME, INDEX_NAME, SEQ_IN_INDEX
+    ''')
+    indexes = {}
+    for row in cursor.fetchall():
+        if row['index_type'] == 'FULLTEXT':
+            kind = 'FULLTEXT'
+        elif row['index_name'] == 'PRIMARY' or not int(row['non_unique']):
+            kind = 'UNIQUE'
+        else:
+            kind = 'INDEX'
+        table = indexes.setdefault(row['table_name'], {})
+        table.setdefault(row['index_name'], (kind, []))[1].append(row['column_name'])
+    return indexes
+
+
+def covering_index(spec, table_indexes):
+    """Name of an existing index that already serves spec, or None
+
+    A B-tree index whose leading columns are spec's columns covers it (a
+    unique one covers a plain one, not the other way round); FULLTEXT
+    indexes must match exactly.
+    """
+    if spec.name in table_indexes:
+        return spec.name
+    wanted = [_column_name(column) for column in spec.columns]
+    for name, (kind, columns) in table_indexes.items():
+        if spec.kind == 'FULLTEXT':
+            if kind == 'FULLTEXT' and sorted(columns) == sorted(wanted):
+                return name
+        elif kind != 'FULLTEXT' and columns[:len(wanted)] == wanted:
+            if spec.kind != 'UNIQUE' or (kind == 'UNIQUE' and len(columns) == len(wanted)):
+                return name
+    return None
+
+
+def create_index_sql(spec, online=True):
+    """ALTER TABLE statement adding spec (in place, without blocking writes)"""
+    keyword = {'INDEX': 'INDEX', 'UNIQUE': 'UNIQUE INDEX', 'FULLTEXT': 'FULLTEXT INDEX'}[spec.kind]
+    sql = f"ALTER TABLE {spec.table} ADD {keyword} {spec.name} ({', '.join(spec.columns)})"
+    if online:
+        # FULLTEXT builds in place but needs a shared lock (reads keep going)
+        sql += ', ALGORITHM=INPLACE, LOCK=' + ('SHARED' if spec.kind == 'FULLTEXT' else 'NONE')
+    return sql
+
+
+def ensure_indexes(cursor, specs=None, verbose=True):
+    """Create every declared index that is missing
+
+    Returns {'created': [...], 'present': [...], 'failed': [(name, error)]}.
+    """
+    specs = REQUIRED_INDEXES if specs is None else specs
+    current = existing_indexes(cursor)
+    report = {'created': [], 'present': [], 'failed': []}
+
+    for spec in specs:
+        table_indexes = current.get(spec.table)
+        if table_indexes is None:
+            report['failed'].append((spec.name, f'table {spec.table} does not exist'))
+            continue
+        if covering_index(spec, table_indexes):
+            report['present'].append(spec.name)
+            continue
+        try:
+            if spec.name in DEDUPE_BEFORE_UNIQUE:
+                cursor.execute(DEDUPE_BEFORE_UNIQUE[spec.name])
+                if verbose and cursor.rowcount:
+                    print(f"  🧹 Removed {cursor.rowcount} duplicate rows from {spec.table}")
+            try:
+                cursor.execute(create_index_sql(spec))
+            except Exception as e:
+                # Server refused the online algorithm: fall back to its default
+                if 'ALGORITHM' not in str(e) and 'LOCK' not in str(e):
+                    raise
+                cursor.execute(create_index_sql(spec, online=False))
+            table_indexes[spec.name] = (spec.kind, [_column_name(column) for column in spec.columns])
+            report['created'].append(spec.name)
+            if verbose:
+                print(f"  ✅ Created: {spec.name} ON {spec.table}({', '.join(spec.columns)})")
+        except Exception as e:
+            report['failed'].append((spec.name, str(e)))
+            if verbose:
+                print(f"  ⚠️  Failed to create {spec.name}: {e}")
+    return report
+
+
+# Representative queries of the routes / importer (sample parameters)
+ROUTE_QUERIES = [
+    ('GET /api/movies (newest)',
+     "SELECT * FROM movies WHERE status = 'active' ORDER BY created_at DESC LIMIT 20", ()),
+    ('GET /api/movies (recently updated)',
+     "SELECT * FROM movies WHERE status = 'active' ORDER BY updated_at DESC LIMIT 20", ()),
+    ('GET /api/movies (popular)',
+     "SELECT * FROM movies WHERE status = 'active' ORDER BY views DESC LIMIT 20", ()),
+    ('GET /api/movies/<id>', 'SELECT * FROM movies WHERE id = ?', (1,)),
+    ('GET /api/movies/<id> episodes',
+     'SELECT * FROM episodes WHERE movie_id = ? ORDER BY episode_number ASC', (1,)),
+    ('GET /api/movies/<id>/episodes/<n>',
+     'SELECT * FROM episodes WHERE movie_id = ? AND episode_number = ?', (1, 1)),
+    ('GET /api/genres/<id>/movies',
+     "SELECT m.* FROM movies m JOIN movie_genres mg ON m.id = mg.movie_id "
+     "WHERE mg.genre_id = ? AND m.status = 'active' ORDER BY m.created_at DESC LIMIT 20", (1,)),
+    ('GET /api/watch-history',
+     'SELECT wh.*, m.title FROM watch_history wh JOIN movies m ON wh.movie_id = m.id '
+     'WHERE wh.user_id = ? ORDER BY wh.last_watched DESC LIMIT 20', (1,)),
+    ('watch-history row of (user, movie)',
+     'SELECT id FROM watch_history WHERE user_id = ? AND movie_id = ?', (1, 1)),
+    ('GET /api/episode-progress (resume point)',
+     'SELECT episode_id, position_seconds FROM episode_progress '
+     'WHERE user_id = ? AND movie_id = ? ORDER BY updated_at DESC LIMIT 1', (1, 1)),
+    ('GET /api/continue-watching',
+     'SELECT movie_id, episode_id FROM episode_progress WHERE user_id = ? ORDER BY updated_at DESC LIMIT 100', (1,)),
+    ('entitlement of one user',
+     "SELECT plan_name, end_date FROM subscriptions WHERE user_id = ? AND status = 'active' AND end_date > NOW()",
+     (1,)),
+    ('subscription expiry job',
+     "SELECT DISTINCT user_id FROM subscriptions WHERE status = 'active' AND end_date <= NOW()", ()),
+    ('subscription expiry job (users)',
+     "SELECT id FROM users WHERE subscription_expires <= NOW() AND subscription_tier <> 'free'", ()),
+    ('GET /api/favorites',
+     'SELECT f.*, m.title FROM favorites f JOIN movies m ON f.movie_id = m.id '
+     'WHERE f.user_id = ? ORDER BY f.created_at DESC', (1,)),
+    ('GET /api/reviews (next page)',
+     'SELECT r.*, u.name FROM reviews r JOIN users u ON r.user_id = u.id '
+     'WHERE r.movie_id = ? AND (r.created_at < ? OR (r.created_at = ? AND r.id < ?)) '
+     'ORDER BY r.created_at DESC, r.id DESC LIMIT 21', (1, '2030-01-01 00:00:00', '2030-01-01 00:00:00', 1)),
+    ('GET /api/comments (page of threads)',
+     'SELECT c.*, u.name FROM (SELECT id FROM comments WHERE movie_id = ? AND parent_id IS NULL '
+     'ORDER BY created_at DESC, id DESC LIMIT 11) page '
+     'JOIN comments c ON c.movie_id = ? AND c.root_id = page.id JOIN users u ON c.user_id = u.id', (1, 1)),
+    ('GET /api/export/movies.ndjson',
+     'SELECT * FROM movies WHERE updated_at >= ? ORDER BY updated_at, id', ('2024-01-01 00:00:00',)),
+    ('importer: movie lookup',
+     'SELECT id, updated_at, content_hash FROM movies WHERE title = ? OR slug = ?', ('x', 'x')),
+    ('importer: existing episodes',
+     'SELECT episode_name, server_name FROM episodes WHERE movie_id = ?', (1,)),
+]
+
+
+def explain_report(connect, queries=None):
+    """EXPLAIN each route query; returns [{'name', 'rows': [...], 'full_scans': [...], 'filesort'}]"""
+    queries = ROUTE_QUERIES if queries is None else queries
+    conn = connect()
+    try:
+        cursor = conn.cursor()
+        report = []
+        for name, sql, params in queries:
+            try:
+                cursor.execute(f'EXPLAIN {sql}', params)
+                plan = cursor.fetchall()
+            except Exception as e:
+                report.append({'name': name, 'error': str(e), 'rows': [], 'full_scans': [], 'filesort': False})
+                continue
+            report.append({
+                'name': name,
+                'rows': plan,
+                'full_scans': [row['table'] for row in plan if (row.get('type') or '').upper() == 'ALL'],
+                'filesort': any('filesort' in (row.get('Extra') or '') for row in plan),
+            })
+        return report
+    finally:
+        conn.close()
+
+
+def print_explain_report(connect):
+    """Print the EXPLAIN report; returns the number of queries with a full scan"""
+    print("=" * 60)
+    print("QUERY PLAN REPORT (EXPLAIN)")
+    print("=" * 60)
+    flagged = 0
+    for entry in explain_report(connect):
+        if entry.get('error'):
+            print(f"\n❓ {entry['name']}: {entry['error']}")
+            continue
+        if entry['full_scans']:
+            flagged += 1
+            status = f"❌ FULL SCAN on {', '.join(entry['full_scans'])}"
+        elif entry['filesort']:
+            status = "⚠️  filesort"
+        else:
+            status = "✅ indexed"
+        print(f"\n{status}  {entry['name']}")
+        for row in entry['rows']:
+            print(f"   {row.get('table')}: type={row.get('type')} key={row.get('key')} "
+                  f"rows={row.get('rows')} {row.get('Extra') or ''}")
+    print(f"\n{flagged} of {len(ROUTE_QUERIES)} queries do a full table scan")
+    print("(tiny tables are often scanned even with an index - re-check on real data)")
+    return flagged
@@ -66,11 +66,17 @@ class MySQLCursorWrapper:
 
 
 class DatabaseConnection:
-    """MySQL Database connection wrapper"""
+    """MySQL Database connection wrapper
     
-    def __init__(self):
+    exit_on_error=False re-raises connection failures (pymysql
+    OperationalError) instead of exiting: background threads catch them and
+    retry on their next run.
+    """
+    
+    def __init__(self, exit_on_error=True):
         self.use_mysql = True
         self.connection = None
+        self.exit_on_error = exit_on_error
         self._connect_mysql()
     
     def _connect_mysql(self):
@@ -95,6 +101,8 @@ class DatabaseConnection:
             print("[HINT] Install with: pip install pymysql cryptography")
             sys.exit(1)
         except Exception as e:
+            if not self.exit_on_error:
+                raise
             print(f"[ERROR] MySQL connection failed: {e}")
             print("[HINT] Check your MySQL server and credentials in config/.env")
             sys.exit(1)
@@ -103,6 +111,16 @@ class DatabaseConnection:
         """Get database cursor with placeholder conversion support"""
         return MySQLCursorWrapper(self.connection.cursor())
     
+    def stream_cursor(self):
+        """Get an unbuffered server-side cursor (SSDictCursor)
+
+        Rows are read from the socket as they are fetched instead of being
+        loaded into memory first. The result must be fully read (or the
+        cursor closed) before the connection runs another query.
+        """
+        import pymysql
+        return MySQLCursorWrapper(self.connection.cursor(pymysql.cursors.SSDictCursor))
+    
     def commit(self):
         """Commit transaction"""
         self.connection.commit()
@@ -137,6 +155,11 @@ def get_db():
     return DatabaseConnection()
 
 
+def get_background_db():
+    """MySQL connection for background threads: raises instead of exiting"""
+    return DatabaseConnection(exit_on_error=False)
+
+
 def convert_placeholder(query):
     """
     Convert ? placeholders to %s for MySQL
@@ -392,6 +415,32 @@ def reset_database():
         return False
 
 
+def ensure_database_indexes():
+    """Create the indexes declared in db_indexes that are missing"""
+    from db_indexes import ensure_indexes
+    
+    print("="*60)
+    print("ENSURE INDEXES")
+    print("="*60 + "\n")
+    conn = DatabaseConnection()
+    try:
+        report = ensure_indexes(conn.cursor())
+        conn.commit()
+    finally:
+        conn.close()
+    print(f"\n✅ {len(report['created'])} created, {len(report['present'])} already present, "
+          f"{len(report['failed'])} failed")
+    for name, error in report['failed']:
+        print(f"  ❌ {name}: {error}")
+    return not report['failed']
+
+
+def explain_queries():
+    """EXPLAIN the route queries and flag full table scans"""
+    from db_indexes import print_explain_report
+    return print_explain_report(DatabaseConnection)
+
+
 # ============================================================
 # COMMAND LINE INTERFACE
 # ============================================================
@@ -424,6 +473,12 @@ if __name__ == '__main__':
                 count = info.get('table_counts', {}).get(table, 0)
                 print(f"  - {table}: {count} rows")
             
+        elif command == '--indexes':
+            sys.exit(0 if ensure_database_indexes() else 1)
+            
+        elif command == '--explain' or command == '-e':
+            sys.exit(1 if explain_queries() else 0)
+            
         elif command == '--help' or command == '-h':
             print("="*60)
             print("DATABASE MANAGER - HELP")
@@ -434,11 +489,14 @@ if __name__ == '__main__':
             print("  --setup, -s    Setup MySQL database")
             print("  --reset, -r    Reset MySQL database (drops and recreates)")
             print("  --info,  -i    Show database information")
+            print("  --indexes      Create missing indexes (online, see db_indexes.py)")
+            print("  --explain, -e  EXPLAIN route queries, flag full table scans")
             print("  --help,  -h    Show this help message")
             print("\nExamples:")
             print("  python db_manager.py --test")
             print("  python db_manager.py --setup")
             print("  python db_manager.py --info")
+            print("  python db_manager.py --explain")
             
         else:
             print(f"Unknown command: {command}")
@@ -0,0 +1,203 @@
+"""
+Entitlements - Effective subscription tier per user, cached in memory
+The tier is computed from the user's active, unexpired subscriptions (plus a
+tier granted on the users row without an end date, e.g. seeded accounts) and
+kept until the TTL or the earliest end date passes, so premium checks are a
+dict lookup. A background job marks lapsed subscriptions expired in one
+UPDATE over the (status, end_date) index and resets users.subscription_tier.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+TIER_RANK = {'free': 0, 'vip': 1, 'premium': 2}
+
+# One row per active subscription (or one row of NULLs); db_now keeps the
+# end-date arithmetic on the database clock
+EFFECTIVE_TIER_SQL = '''
+    SELECT u.subscription_tier, u.subscription_expires, s.plan_name, s.end_date, NOW() AS db_now
+    FROM users u
+    LEFT JOIN subscriptions s
+      ON s.user_id = u.id AND s.status = 'active' AND s.end_date > NOW()
+    WHERE u.id = ?
+'''
+
+
+def _tier(name):
+    tier = (name or 'free').strip().lower()
+    return tier if tier in TIER_RANK else 'free'
+
+
+def effective_tier(rows):
+    """(tier, expires_at, valid_seconds) from EFFECTIVE_TIER_SQL rows
+
+    valid_seconds is how long the answer holds on its own: until the first
+    of the contributing end dates passes (None when nothing ends).
+    """
+    tier, expires_at, ends = 'free', None, []
+    for row in rows:
+        db_now = row['db_now']
+        granted = _tier(row['subscription_tier'])
+        if granted != 'free' and (row['subscription_expires'] is None or row['subscription_expires'] > db_now):
+            if TIER_RANK[granted] > TIER_RANK[tier]:
+                tier, expires_at = granted, row['subscription_expires']
+            if row['subscription_expires'] is not None:
+                ends.append((row['subscription_expires'] - db_now).total_seconds())
+        if row['plan_name'] is not None:
+            plan = _tier(row['plan_name'])
+            if TIER_RANK[plan] > TIER_RANK[tier] or (
+                    plan == tier and expires_at is not None and row['end_date'] > expires_at):
+                tier, expires_at = plan, row['end_date']
+            ends.append((row['end_date'] - db_now).total_seconds())
+    return tier, expires_at, (min(ends) if ends else None)
+
+
+class EntitlementService:
+    """LRU of user_id -> {'tier', 'expires_at'}
+
+    Entries expire after ``ttl`` seconds or when a subscription they rely on
+    ends, whichever is first; subscribe and the expiry job invalidate them.
+    """
+
+    def __init__(self, connect, ttl=300, max_users=10000):
+        """
+        Args:
+            connect: Callable returning a DatabaseConnection
+            ttl: Seconds an entitlement is served before it is read again
+            max_users: Users kept in memory (least recently used evicted)
+        """
+        self.connect = connect
+        self.ttl = ttl
+        self.max_users = max_users
+        self._entries = OrderedDict()  # user_id -> (valid_until, entitlement)
+        self._lock = threading.Lock()
+        self.stats = {'hits': 0, 'loads': 0}
+
+    def _load(self, user_id):
+        conn = self.connect()
+        try:
+            cursor = conn.cursor()
+            cursor.execute(EFFECTIVE_TIER_SQL, (user_id,))
+            rows = cursor.fetchall()
+        finally:
+            conn.close()
+        return effective_tier(rows)
+
+    def get(self, user_id):
+        """{'tier', 'expires_at'} of a user ('free' for anonymous / unknown users)"""
+        if user_id is None:
+            return {'tier': 'free', 'expires_at': None}
+        user_id = int(user_id)
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry and now < entry[0]:
+                self._entries.move_to_end(user_id)
+                self.stats['hits'] += 1
+                return entry[1]
+
+        tier, expires_at, valid_seconds = self._load(user_id)
+        entitlement = {'tier': tier, 'expires_at': expires_at}
+        lifetime = self.ttl if valid_seconds is None else max(0.0, min(self.ttl, valid_seconds))
+        with self._lock:
+            self._entries[user_id] = (now + lifetime, entitlement)
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.max_users:
+                self._entries.popitem(last=False)
+            self.stats['loads'] += 1
+        return entitlement
+
+    def tier(self, user_id):
+        return self.get(user_id)['tier']
+
+    def can_watch(self, user_id, is_premium):
+        """Free content for everyone, premium content for any paid tier"""
+        return not is_premium or self.tier(user_id) != 'free'
+
+    def invalidate(self, user_id):
+        with self._lock:
+            self._entries.pop(int(user_id), None)
+
+
+def expire_lapsed(cursor):
+    """Expire every active subscription past its end date; returns the affected user ids
+
+    Both statements are range reads on indexes: (status, end_date) for
+    subscriptions, (subscription_expires) for users. Callers commit.
+    """
+    cursor.execute('SELECT NOW() AS now')
+    now = cursor.fetchone()['now']
+    cursor.execute('''
+        SELECT DISTINCT user_id FROM subscriptions
+        WHERE status = 'active' AND end_date <= ?
+    ''', (now,))
+    user_ids = {row['user_id'] for row in cursor.fetchall()}
+    cursor.execute('''
+        UPDATE subscriptions SET status = 'expired'
+        WHERE status = 'active' AND end_date <= ?
+    ''', (now,))
+    cursor.execute('''
+        SELECT id FROM users
+        WHERE subscription_expires <= ? AND subscription_tier <> 'free'
+    ''', (now,))
+    user_ids.update(row['id'] for row in cursor.fetchall())
+    cursor.execute('''
+        UPDATE users SET subscription_tier = 'free'
+        WHERE subscription_expires <= ? AND subscription_tier <> 'free'
+    ''', (now,))
+    return sorted(user_ids)
+
+
+class SubscriptionExpiryJob:
+    """Background thread running expire_lapsed every ``interval`` seconds"""
+
+    def __init__(self, connect, on_expired, interval=300.0):
+        """
+        Args:
+            connect: Callable returning a DatabaseConnection
+            on_expired: Called with the user ids whose subscriptions lapsed
+            interval: Seconds between runs
+        """
+        self.connect = connect
+        self.on_expired = on_expired
+        self.interval = interval
+        self.stats = {'runs': 0, 'expired_users': 0, 'errors': 0}
+        self._stop = threading.Event()
+        self._thread = None
+
+    def run_once(self):
+        """Expire lapsed subscriptions now; returns the affected user ids"""
+        conn = self.connect()
+        try:
+            cursor = conn.cursor()
+            user_ids = expire_lapsed(cursor)
+            conn.commit()
+        finally:
+            conn.close()
+
+        self.stats['runs'] += 1
+        if user_ids:
+            self.stats['expired_users'] += len(user_ids)
+            self.on_expired(user_ids)
+        return user_ids
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.run_once()
+            except Exception as e:
+                self.stats['errors'] += 1
+                print(f"⚠️ [Subscriptions] Expiry run failed: {e}")
+            self._stop.wait(self.interval)
+
+    def start(self):
+        """Start the job in a daemon thread (no-op if already running)"""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
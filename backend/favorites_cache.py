@@ -0,0 +1,86 @@
+"""
+Favorites Cache - Per-user favorite movie ids in memory
+Each user's favorites are one sorted array('i') (4 bytes per id), loaded
+from the (user_id, movie_id) unique index and patched in place on writes;
+membership checks for a whole grid are binary searches
+"""
+
+import threading
+import time
+from array import array
+from bisect import bisect_left
+from collections import OrderedDict
+
+
+class FavoriteIdCache:
+    """LRU of user_id -> sorted array('i') of favorite movie ids
+
+    Entries also expire after ``ttl`` seconds so writes made by another app
+    process show up eventually; this process's writes are applied at once.
+    """
+
+    def __init__(self, load, max_users=10000, ttl=300):
+        """
+        Args:
+            load: Callable(user_id) returning the user's favorite movie ids
+            max_users: Users kept in memory (least recently used evicted)
+            ttl: Seconds before an entry is reloaded
+        """
+        self.load = load
+        self.max_users = max_users
+        self.ttl = ttl
+        self._entries = OrderedDict()  # user_id -> (loaded_at, array('i'))
+        self._lock = threading.Lock()
+        self.stats = {'hits': 0, 'loads': 0}
+
+    def ids(self, user_id):
+        """Sorted array('i') of the user's favorite movie ids"""
+        user_id = int(user_id)
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry and time.time() - entry[0] < self.ttl:
+                self._entries.move_to_end(user_id)
+                self.stats['hits'] += 1
+                return entry[1]
+
+        ids = array('i', sorted(set(int(movie_id) for movie_id in self.load(user_id))))
+        with self._lock:
+            self._entries[user_id] = (time.time(), ids)
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.max_users:
+                self._entries.popitem(last=False)
+            self.stats['loads'] += 1
+        return ids
+
+    def contains(self, user_id, movie_ids):
+        """{movie_id: bool} for each requested id"""
+        ids = self.ids(user_id)
+        result = {}
+        for movie_id in movie_ids:
+            position = bisect_left(ids, movie_id)
+            result[movie_id] = position < len(ids) and ids[position] == movie_id
+        return result
+
+    def add(self, user_id, movie_id):
+        """Apply a committed insert to the cached entry (if any)"""
+        with self._lock:
+            entry = self._entries.get(int(user_id))
+            if entry:
+                ids = entry[1]
+                position = bisect_left(ids, int(movie_id))
+                if position == len(ids) or ids[position] != int(movie_id):
+                    ids.insert(position, int(movie_id))
+
+    def remove(self, user_id, movie_id):
+        """Apply a committed delete to the cached entry (if any)"""
+        with self._lock:
+            entry = self._entries.get(int(user_id))
+            if entry:
+                ids = entry[1]
+                position = bisect_left(ids, int(movie_id))
+                if position < len(ids) and ids[position] == int(movie_id):
+                    del ids[position]
+
+    def invalidate(self, user_id):
+        with self._lock:
+            self._entries.pop(int(user_id), None)
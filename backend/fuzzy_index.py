@@ -0,0 +1,253 @@
+"""
+Fuzzy Title Index - Typo-tolerant movie title lookup
+Character-trigram index over accent-free title / original_title tokens,
+candidates verified with a bounded (Damerau) edit distance
+"""
+import re
+import threading
+import time
+from array import array
+from collections import defaultdict
+
+from search_helper import SmartSearchHelper
+
+TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+
+def fold_tokens(text):
+    """Lowercase, accent-free word tokens of a title (đ -> d)"""
+    if not text:
+        return []
+    return TOKEN_RE.findall(SmartSearchHelper.remove_diacritics(text.lower()))
+
+
+def max_edits_for(word):
+    """Edit budget by word length: exact for short words, up to 2 for long ones"""
+    length = len(word)
+    if length <= 3:
+        return 0
+    if length <= 6:
+        return 1
+    return 2
+
+
+def bounded_edit_distance(query, token, max_dist, prefix=False):
+    """Optimal-string-alignment distance, capped at max_dist + 1
+
+    With prefix=True the distance is measured against the best prefix of
+    token, so partially typed words ("avat" -> "avatar") still match.
+    Stops as soon as every cell of a row exceeds max_dist.
+    """
+    too_far = max_dist + 1
+    if not prefix and abs(len(query) - len(token)) > max_dist:
+        return too_far
+    if prefix and len(token) < len(query) - max_dist:
+        return too_far
+    if query == token or (prefix and token.startswith(query)):
+        return 0
+
+    prev2 = None
+    prev = list(range(len(token) + 1))
+    for i in range(1, len(query) + 1):
+        cur = [i] + [0] * len(token)
+        q_char = query[i - 1]
+        for j in range(1, len(token) + 1):
+            cost = 0 if q_char == token[j - 1] else 1
+            best = min(prev[j] + 1, cur[j - 1] + 1, prev[j - 1] + cost)
+            if (prev2 is not None and j > 1 and q_char == token[j - 2]
+                    and query[i - 2] == token[j - 1]):
+                best = min(best, prev2[j - 2] + 1)
+            cur[j] = best
+        if min(cur) > max_dist:
+            return too_far
+        prev2, prev = prev, cur
+
+    distance = min(prev) if prefix else prev[-1]
+    return distance if distance <= max_dist else too_far
+
+
+class FuzzyTitleIndex:
+    """In-memory trigram index mapping misspelled words to movie ids
+
+    The vocabulary is shared across movies: each distinct folded token is
+    stored once, with a posting list per trigram (array of token ids) and
+    the set of movies containing it.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._tokens = []          # token id -> token
+        self._token_ids = {}       # token -> token id
+        self._token_movies = []    # token id -> set of movie ids
+        self._postings = defaultdict(lambda: array('i'))  # trigram -> token ids
+        self._movie_tokens = {}    # movie id -> tuple of token ids
+
+    def __len__(self):
+        return len(self._movie_tokens)
+
+    @staticmethod
+    def _trigrams(token, closed=True):
+        """Padded trigrams; open-ended (no end marker) for prefix queries"""
+        padded = f'$${token}$' if closed else f'$${token}'
+        return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+    @classmethod
+    def build(cls, rows):
+        """Build an index from rows with id, title and original_title"""
+        index = cls()
+        for row in rows:
+            index.add_movie(row['id'], row.get('title'), row.get('original_title'))
+        return index
+
+    def add_movie(self, movie_id, *texts):
+        """Index (or re-index) a movie under the tokens of its titles"""
+        tokens = set()
+        for text in texts:
+            tokens.update(fold_tokens(text))
+
+        with self._lock:
+            self._remove_locked(movie_id)
+            token_ids = []
+            for token in tokens:
+                token_id = self._token_ids.get(token)
+                if token_id is None:
+                    token_id = len(self._tokens)
+                    self._tokens.append(token)
+                    self._token_ids[token] = token_id
+                    self._token_movies.append(set())
+                    for gram in self._trigrams(token):
+                        self._postings[gram].append(token_id)
+                self._token_movies[token_id].add(movie_id)
+                token_ids.append(token_id)
+            self._movie_tokens[movie_id] = tuple(token_ids)
+
+    def remove_movie(self, movie_id):
+        """Drop a movie from the index (its tokens stay in the vocabulary)"""
+        with self._lock:
+            self._remove_locked(movie_id)
+
+    def _remove_locked(self, movie_id):
+        for token_id in self._movie_tokens.pop(movie_id, ()):
+            self._token_movies[token_id].discard(movie_id)
+
+    def _match_word(self, word):
+        """Yield (token_id, distance) for vocabulary tokens close to word"""
+        max_dist = max_edits_for(word)
+        grams = self._trigrams(word, closed=False)
+
+        if max_dist == 0:
+            # Short words must match exactly (as a prefix): intersect the
+            # posting lists smallest-first instead of counting all of them
+            postings = sorted((self._postings.get(gram, ()) for gram in grams), key=len)
+            if not postings or not postings[0]:
+                return
+            candidates = set(postings[0])
+            for posting in postings[1:]:
+                candidates.intersection_update(posting)
+                if not candidates:
+                    return
+            for token_id in candidates:
+                if self._tokens[token_id].startswith(word):
+                    yield token_id, 0
+            return
+
+        # Each edit destroys at most 4 trigrams of the query (3, or 4 for a
+        # transposition), so a match shares at least `required` grams and
+        # therefore (pigeonhole) at least one of the `len(grams) - required + 1`
+        # rarest ones: only those posting lists are scanned
+        required = max(1, len(grams) - 4 * max_dist)
+        postings = sorted((self._postings.get(gram, ()) for gram in grams), key=len)
+        candidates = set()
+        for posting in postings[:len(grams) - required + 1]:
+            candidates.update(posting)
+
+        min_length = len(word) - max_dist
+        for token_id in candidates:
+            token = self._tokens[token_id]
+            # Cheap filters before the quadratic edit-distance check
+            if len(token) < min_length or len(grams & self._trigrams(token)) < required:
+                continue
+            distance = bounded_edit_distance(word, token, max_dist, prefix=True)
+            if distance <= max_dist:
+                yield token_id, distance
+
+    def search(self, query, limit=50):
+        """Return [(movie_id, score)] for movies matching the query words
+
+        Movies must match at least half of the query words (within each
+        word's edit budget); they are ranked by words matched, then by the
+        summed similarity of the matches.
+        """
+        words = fold_tokens(query)
+        if not words:
+            return []
+
+        hits = defaultdict(int)
+        scores = defaultdict(float)
+        with self._lock:
+            for word in words:
+                best = {}
+                for token_id, distance in self._match_word(word):
+                    similarity = 1.0 - distance / (len(word) + 1.0)
+                    for movie_id in self._token_movies[token_id]:
+                        if similarity > best.get(movie_id, 0.0):
+                            best[movie_id] = similarity
+                for movie_id, similarity in best.items():
+                    hits[movie_id] += 1
+                    scores[movie_id] += similarity
+
+        required = max(1, (len(words) + 1) // 2)
+        ranked = sorted(
+            (movie_id for movie_id, count in hits.items() if count >= required),
+            key=lambda movie_id: (hits[movie_id], scores[movie_id], -movie_id),
+            reverse=True
+        )
+        return [(movie_id, round(scores[movie_id], 4)) for movie_id in ranked[:limit]]
+
+
+class RefreshingTitleIndex:
+    """Holds a FuzzyTitleIndex, rebuilding it in the background when stale"""
+
+    def __init__(self, loader, ttl=600):
+        """
+        Args:
+            loader: Callable returning rows with id, title, original_title
+            ttl: Seconds before the index is rebuilt in the background
+        """
+        self.loader = loader
+        self.ttl = ttl
+        self.index = None
+        self.built_at = 0.0
+        self._lock = threading.Lock()
+        self._refreshing = False
+
+    def _rebuild(self):
+        started = time.time()
+        index = FuzzyTitleIndex.build(self.loader())
+        self.index, self.built_at = index, time.time()
+        print(f"🔤 [FuzzyIndex] Indexed {len(index)} movies in {(self.built_at - started) * 1000:.0f} ms")
+        return index
+
+    def get(self):
+        """Return the index, building it on first use and refreshing when stale"""
+        if self.index is None:
+            with self._lock:
+                if self.index is None:
+                    return self._rebuild()
+
+        if time.time() - self.built_at > self.ttl:
+            with self._lock:
+                if self._refreshing:
+                    return self.index
+                self._refreshing = True
+
+            def refresh():
+                try:
+                    self._rebuild()
+                except Exception as e:
+                    print(f"⚠️ [FuzzyIndex] Refresh failed: {e}")
+                finally:
+                    self._refreshing = False
+
+            threading.Thread(target=refresh, daemon=True).start()
+        return self.index
@@ -0,0 +1,326 @@
+"""
+Resilient HTTP Client - JSON fetching for the OPhim importer
+Sized connection pool, exponential backoff with full jitter on retryable
+errors, a per-host circuit breaker and conditional requests (ETag /
+Last-Modified) backed by a local response cache
+"""
+
+import hashlib
+import json
+import os
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlencode, urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+RETRYABLE_STATUS = {408, 425, 429, 500, 502, 503, 504}
+
+
+class HTTPFetchError(Exception):
+    """Request failed for good (retries exhausted or non-retryable status)"""
+
+    def __init__(self, message, status=None):
+        super().__init__(message)
+        self.status = status
+
+
+class CircuitOpenError(HTTPFetchError):
+    """Host is failing; requests are refused until the cool-down ends"""
+
+
+class CircuitBreaker:
+    """Consecutive-failure breaker: closed -> open -> half-open -> closed"""
+
+    def __init__(self, threshold=5, cooldown=60.0):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.failures = 0
+        self.opened_at = None
+        self._trial_running = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        if self.opened_at is None:
+            return 'closed'
+        if time.time() - self.opened_at >= self.cooldown:
+            return 'half-open'
+        return 'open'
+
+    def allow(self):
+        """May a request go out? Half-open lets exactly one trial through"""
+        with self._lock:
+            state = self.state
+            if state == 'closed':
+                return True
+            if state == 'half-open' and not self._trial_running:
+                self._trial_running = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self._trial_running = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            self._trial_running = False
+            if self.failures >= self.threshold or self.opened_at is not None:
+                self.opened_at = time.time()
+
+
+class ResponseCache:
+    """On-disk cache of validators + JSON bodies for conditional requests
+
+    Entries not read or written for ``max_age_days`` are pruned on startup and
+    every ``prune_every`` writes, then the least recently used ones until the
+    directory fits ``max_bytes``.
+    """
+
+    # Temp files younger than this may be another worker's write in progress
+    TMP_MAX_AGE = 300
+
+    def __init__(self, directory, max_age_days=14, max_bytes=512 * 1024 * 1024, prune_every=1000):
+        self.directory = directory
+        self.max_age_days = max_age_days
+        self.max_bytes = max_bytes
+        self.prune_every = prune_every
+        self._writes = 0
+        self._lock = threading.Lock()
+        self._pruning = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+        self.prune()
+
+    def prune(self):
+        """Drop stale / excess entries (and abandoned temp files); returns files removed"""
+        if not self._pruning.acquire(blocking=False):
+            return 0  # another thread is already pruning
+        try:
+            return self._prune()
+        finally:
+            self._pruning.release()
+
+    def _prune(self):
+        now = time.time()
+        cutoff = now - self.max_age_days * 86400
+        entries = []
+        removed = 0
+        for entry in os.scandir(self.directory):
+            if not entry.is_file():
+                continue
+            try:
+                stat = entry.stat()
+                if entry.name.endswith('.tmp'):
+                    if stat.st_mtime < now - self.TMP_MAX_AGE:
+                        os.remove(entry.path)
+                        removed += 1
+                elif stat.st_mtime < cutoff:
+                    os.remove(entry.path)
+                    removed += 1
+                else:
+                    entries.append((stat.st_mtime, stat.st_size, entry.path))
+            except OSError:
+                continue
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+                removed += 1
+                total -= size
+            except OSError:
+                continue
+        if removed:
+            print(f"🧹 [HTTP] Pruned {removed} cached responses")
+        return removed
+
+    def _path(self, key):
+        return os.path.join(self.directory, hashlib.sha1(key.encode('utf-8')).hexdigest() + '.json')
+
+    def get(self, key):
+        path = self._path(key)
+        try:
+            with open(path, 'r', encoding='utf-8') as fh:
+                entry = json.load(fh)
+            os.utime(path)  # mtime = last use, for prune()
+            return entry
+        except (OSError, ValueError):
+            return None
+
+    def set(self, key, etag, last_modified, data):
+        path = self._path(key)
+        tmp_path = f'{path}.{threading.get_ident()}.tmp'
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as fh:
+                json.dump({'etag': etag, 'last_modified': last_modified, 'data': data}, fh, ensure_ascii=False)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"⚠️ [HTTP] Could not cache {key}: {e}")
+            return
+
+        # Long --continuous runs keep writing: bound the directory as they go
+        with self._lock:
+            self._writes += 1
+            due = self.prune_every and self._writes % self.prune_every == 0
+        if due:
+            self.prune()
+
+
+class FetchResult:
+    """Parsed JSON body plus how it was obtained"""
+
+    def __init__(self, data, status, not_modified=False, attempts=1):
+        self.data = data
+        self.status = status
+        self.not_modified = not_modified  # 304: data came from the local cache
+        self.attempts = attempts
+
+
+class ResilientHTTPClient:
+    """GET JSON with retries, backoff, circuit breaking and conditional requests"""
+
+    def __init__(self, pool_size=4, max_retries=4, backoff_base=0.5, backoff_max=30.0,
+                 timeout=(5, 30), breaker_threshold=5, breaker_cooldown=60.0,
+                 cache_dir=None, cache_max_age_days=14, cache_max_bytes=512 * 1024 * 1024, headers=None):
+        """
+        Args:
+            pool_size: Connections kept per host (match importer concurrency)
+            max_retries: Retries after the first attempt on retryable errors
+            backoff_base: First backoff ceiling in seconds (doubles per retry)
+            backoff_max: Upper bound of a single backoff sleep
+            timeout: (connect, read) timeout in seconds
+            breaker_threshold: Consecutive failures that open a host's circuit
+            breaker_cooldown: Seconds before an open circuit lets a trial through
+            cache_dir: Directory of the conditional-request cache (None = off)
+            cache_max_age_days: Cached responses unused this long are pruned
+            cache_max_bytes: Size the cache directory is pruned down to
+            headers: Default request headers
+        """
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.timeout = timeout
+        self.breaker_threshold = breaker_threshold
+        self.breaker_cooldown = breaker_cooldown
+        self.cache = ResponseCache(cache_dir, cache_max_age_days, cache_max_bytes) if cache_dir else None
+        self.stats = {'requests': 0, 'retries': 0, 'not_modified': 0, 'failures': 0, 'circuit_rejections': 0,
+                      'seconds': 0.0}
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        if headers:
+            self.session.headers.update(headers)
+
+        self._breakers = {}
+        self._lock = threading.Lock()
+
+    def breaker_for(self, url):
+        host = urlparse(url).netloc
+        with self._lock:
+            breaker = self._breakers.get(host)
+            if breaker is None:
+                breaker = self._breakers[host] = CircuitBreaker(self.breaker_threshold, self.breaker_cooldown)
+            return breaker
+
+    def _backoff(self, attempt, retry_after=None):
+        """Full-jitter exponential backoff, or the server's Retry-After"""
+        if retry_after is not None:
+            return min(retry_after, self.backoff_max)
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+    @staticmethod
+    def _retry_after(response):
+        value = response.headers.get('Retry-After')
+        if not value:
+            return None
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            try:
+                return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+            except (TypeError, ValueError):
+                return None
+
+    def get_json(self, url, params=None, conditional=True):
+        """GET a JSON document
+
+        Returns a FetchResult. Raises CircuitOpenError when the host's
+        circuit is open and HTTPFetchError when all attempts failed.
+        """
+        started = time.time()
+        try:
+            return self._get_json(url, params, conditional)
+        finally:
+            self.stats['seconds'] += time.time() - started
+
+    def _get_json(self, url, params, conditional):
+        cache_key = f'{url}?{urlencode(sorted((params or {}).items()))}'
+        cached = self.cache.get(cache_key) if (self.cache and conditional) else None
+        breaker = self.breaker_for(url)
+        last_error = None
+
+        for attempt in range(self.max_retries + 1):
+            if not breaker.allow():
+                self.stats['circuit_rejections'] += 1
+                raise CircuitOpenError(f"circuit open for {urlparse(url).netloc}")
+
+            headers = {}
+            if cached:
+                if cached.get('etag'):
+                    headers['If-None-Match'] = cached['etag']
+                if cached.get('last_modified'):
+                    headers['If-Modified-Since'] = cached['last_modified']
+
+            self.stats['requests'] += 1
+            retry_after = None
+            try:
+                response = self.session.get(url, params=params, headers=headers, timeout=self.timeout)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                last_error = HTTPFetchError(f"{type(e).__name__}: {e}")
+            else:
+                if response.status_code == 304 and cached:
+                    breaker.record_success()
+                    self.stats['not_modified'] += 1
+                    return FetchResult(cached['data'], 304, not_modified=True, attempts=attempt + 1)
+
+                if response.status_code == 200:
+                    try:
+                        data = response.json()
+                    except ValueError as e:
+                        last_error = HTTPFetchError(f"invalid JSON: {e}", 200)
+                    else:
+                        breaker.record_success()
+                        etag = response.headers.get('ETag')
+                        last_modified = response.headers.get('Last-Modified')
+                        if self.cache and conditional and (etag or last_modified):
+                            self.cache.set(cache_key, etag, last_modified, data)
+                        return FetchResult(data, 200, attempts=attempt + 1)
+                elif response.status_code in RETRYABLE_STATUS:
+                    last_error = HTTPFetchError(f"HTTP {response.status_code}", response.status_code)
+                    retry_after = self._retry_after(response)
+                else:
+                    # 4xx: the request itself is wrong, retrying will not help
+                    breaker.record_success()
+                    self.stats['failures'] += 1
+                    raise HTTPFetchError(f"HTTP {response.status_code}", response.status_code)
+
+            breaker.record_failure()
+            if attempt < self.max_retries:
+                self.stats['retries'] += 1
+                delay = self._backoff(attempt, retry_after)
+                print(f"  ↻ [HTTP] {last_error} on {url}, retry {attempt + 1}/{self.max_retries} in {delay:.1f}s")
+                time.sleep(delay)
+
+        self.stats['failures'] += 1
+        raise last_error
@@ -0,0 +1,133 @@
+"""
+Import State - Persisted checkpoints for the OPhim importer
+A small key/value table so sync runs resume exactly where the last one
+stopped instead of re-checking movies that are already up to date, and a
+per-page table so a parallel full-catalog backfill resumes after a crash
+"""
+
+import json
+
+IMPORT_STATE_TABLE_SQL = '''
+    CREATE TABLE IF NOT EXISTS import_state (
+        name VARCHAR(100) PRIMARY KEY,
+        last_modified DATETIME NULL,
+        last_slug VARCHAR(500),
+        stats TEXT,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+    )
+'''
+
+IMPORT_BACKFILL_TABLE_SQL = '''
+    CREATE TABLE IF NOT EXISTS import_backfill_pages (
+        run_name VARCHAR(100) NOT NULL,
+        page INT NOT NULL,
+        completed BOOLEAN DEFAULT FALSE,
+        done_slugs MEDIUMTEXT,
+        stats TEXT,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+        PRIMARY KEY (run_name, page)
+    )
+'''
+
+
+class ImportStateStore:
+    """Read/write named checkpoints in the import_state table"""
+
+    def __init__(self, connect):
+        """
+        Args:
+            connect: Callable returning a DatabaseConnection
+        """
+        self.connect = connect
+        self._table_ready = False
+
+    def ensure_table(self, cursor):
+        """Create the tables on first use (the importer may run before the app)"""
+        if not self._table_ready:
+            cursor.execute(IMPORT_STATE_TABLE_SQL)
+            cursor.execute(IMPORT_BACKFILL_TABLE_SQL)
+            self._table_ready = True
+
+    def load(self, name):
+        """Return {'last_modified', 'last_slug', 'stats'} or None if never saved"""
+        conn = self.connect()
+        try:
+            cursor = conn.cursor()
+            self.ensure_table(cursor)
+            cursor.execute('SELECT last_modified, last_slug, stats FROM import_state WHERE name = ?', (name,))
+            row = cursor.fetchone()
+            if not row:
+                return None
+            return {
+                'last_modified': row['last_modified'],
+                'last_slug': row['last_slug'],
+                'stats': json.loads(row['stats']) if row['stats'] else None,
+            }
+        finally:
+            conn.close()
+
+    def save(self, name, last_modified, last_slug, stats=None):
+        """Upsert a checkpoint (stats: JSON-serializable report of the run)"""
+        conn = self.connect()
+        try:
+            cursor = conn.cursor()
+            self.ensure_table(cursor)
+            cursor.execute('''
+                INSERT INTO import_state (name, last_modified, last_slug, stats)
+                VALUES (?, ?, ?, ?)
+                ON DUPLICATE KEY UPDATE
+                    last_modified = VALUES(last_modified),
+                    last_slug = VALUES(last_slug),
+                    stats = VALUES(stats)
+            ''', (name, last_modified, last_slug, json.dumps(stats, default=str) if stats is not None else None))
+            conn.commit()
+        finally:
+            conn.close()
+
+    def load_backfill(self, run_name):
+        """Return {page: {'completed': bool, 'slugs': set}} of a backfill run"""
+        conn = self.connect()
+        try:
+            cursor = conn.cursor()
+            self.ensure_table(cursor)
+            cursor.execute('SELECT page, completed, done_slugs FROM import_backfill_pages WHERE run_name = ?',
+                           (run_name,))
+            return {
+                row['page']: {
+                    'completed': bool(row['completed']),
+                    'slugs': set(json.loads(row['done_slugs'])) if row['done_slugs'] else set(),
+                }
+                for row in cursor.fetchall()
+            }
+        finally:
+            conn.close()
+
+    def save_backfill_page(self, run_name, page, slugs, completed=False, stats=None):
+        """Upsert the progress of one page (slugs: the ones imported so far)"""
+        conn = self.connect()
+        try:
+            cursor = conn.cursor()
+            self.ensure_table(cursor)
+            cursor.execute('''
+                INSERT INTO import_backfill_pages (run_name, page, completed, done_slugs, stats)
+                VALUES (?, ?, ?, ?, ?)
+                ON DUPLICATE KEY UPDATE
+                    completed = VALUES(completed),
+                    done_slugs = VALUES(done_slugs),
+                    stats = VALUES(stats)
+            ''', (run_name, page, completed, json.dumps(sorted(slugs)),
+                  json.dumps(stats, default=str) if stats is not None else None))
+            conn.commit()
+        finally:
+            conn.close()
+
+    def reset_backfill(self, run_name):
+        """Forget every page of a backfill run (start over)"""
+        conn = self.connect()
+        try:
+            cursor = conn.cursor()
+            self.ensure_table(cursor)
+            cursor.execute('DELETE FROM import_backfill_pages WHERE run_name = ?', (run_name,))
+            conn.commit()
+        finally:
+            conn.close()
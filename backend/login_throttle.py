@@ -0,0 +1,88 @@
+"""
+Login Throttle - Sliding-window rate limits for auth endpoints
+Each key (client IP, account email) costs one small tuple: the start of the
+current fixed window and the counts of it and the previous window. The
+sliding count is the current count plus the previous one weighted by how
+much of it still overlaps the sliding window.
+"""
+
+import math
+import threading
+import time
+
+
+class SlidingWindowLimiter:
+    """At most ``limit`` hits per ``window`` seconds per key"""
+
+    def __init__(self, limit, window, max_keys=100000):
+        """
+        Args:
+            limit: Hits allowed inside any window-long interval
+            window: Window length in seconds
+            max_keys: Keys tracked before idle ones are swept
+        """
+        self.limit = limit
+        self.window = window
+        self.max_keys = max_keys
+        self._keys = {}  # key -> (window_start, previous_count, current_count)
+        self._lock = threading.Lock()
+        self.stats = {'allowed': 0, 'limited': 0}
+
+    def _state(self, key, now):
+        start = now - now % self.window
+        entry = self._keys.get(key)
+        if entry is None or entry[0] <= start - 2 * self.window:
+            return start, 0, 0
+        if entry[0] == start:
+            return entry
+        # Window rolled over once: current becomes previous
+        return start, entry[2], 0
+
+    def _estimate(self, state, now):
+        start, previous, current = state
+        overlap = 1.0 - (now - start) / self.window
+        return previous * overlap + current
+
+    def _retry_after(self, state, now):
+        """Seconds until one more hit fits under the limit"""
+        start, previous, current = state
+        if current + 1 > self.limit:
+            # Not before the next window, once this one's count has faded
+            start, previous, current = start + self.window, current, 0
+        # previous * (1 - (t - start) / window) + current + 1 <= limit
+        needed = 1.0 - (self.limit - current - 1) / previous
+        return max(1, math.ceil(start + needed * self.window - now))
+
+    def hit(self, key, now=None):
+        """Count one hit if allowed; returns (allowed, retry_after_seconds)"""
+        now = time.time() if now is None else now
+        with self._lock:
+            state = self._state(key, now)
+            if self._estimate(state, now) + 1 > self.limit:
+                self._keys[key] = state
+                self.stats['limited'] += 1
+                return False, self._retry_after(state, now)
+            self._keys[key] = (state[0], state[1], state[2] + 1)
+            self.stats['allowed'] += 1
+            if len(self._keys) > self.max_keys:
+                self._sweep(now)
+        return True, 0
+
+    def check(self, key, now=None):
+        """(allowed, retry_after_seconds) without counting a hit"""
+        now = time.time() if now is None else now
+        with self._lock:
+            state = self._state(key, now)
+            if self._estimate(state, now) + 1 > self.limit:
+                return False, self._retry_after(state, now)
+        return True, 0
+
+    def reset(self, key):
+        with self._lock:
+            self._keys.pop(key, None)
+
+    def _sweep(self, now):
+        """Drop keys with nothing inside the sliding window"""
+        horizon = now - now % self.window - self.window
+        for key in [key for key, entry in self._keys.items() if entry[0] < horizon]:
+            del self._keys[key]
@@ -0,0 +1,158 @@
+"""
+Movie Changes - Change feed from the importer (and admin) to the web app
+Writers append (seq, movie_id, action) rows in the same transaction as the
+movie write; the app polls the table by primary key and evicts exactly the
+cache entries and index entries that depend on the changed movies
+"""
+
+import threading
+import time
+
+MOVIE_CHANGES_TABLE_SQL = '''
+    CREATE TABLE IF NOT EXISTS movie_changes (
+        seq BIGINT AUTO_INCREMENT PRIMARY KEY,
+        movie_id INT NOT NULL,
+        action VARCHAR(20) NOT NULL,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        INDEX idx_movie_changes_created (created_at)
+    )
+'''
+
+
+def record_movie_change(cursor, movie_id, action):
+    """Append a change row; call before the commit of the movie write
+
+    Args:
+        cursor: Cursor of the transaction that wrote the movie
+        movie_id: Changed movie
+        action: 'inserted', 'updated' or 'deleted'
+    """
+    cursor.execute('INSERT INTO movie_changes (movie_id, action) VALUES (?, ?)', (movie_id, action))
+
+
+class MovieChangeListener:
+    """Background poller of movie_changes delivering new rows to a callback
+
+    Sequence numbers are handed out at INSERT time but become visible at
+    COMMIT time, so concurrent writers (backfill workers) can make a lower
+    seq appear after a higher one. Skipped numbers are remembered as gaps
+    and re-checked for ``gap_timeout`` seconds (a rolled-back insert leaves
+    a gap forever).
+    """
+
+    def __init__(self, connect, on_changes, interval=2.0, batch_size=500,
+                 gap_timeout=60.0, retention_hours=24):
+        """
+        Args:
+            connect: Callable returning a DatabaseConnection
+            on_changes: Called with [{'seq', 'movie_id', 'action'}] per batch
+            interval: Seconds between polls
+            batch_size: Max rows read per query
+            gap_timeout: Seconds a missing seq is still waited for
+            retention_hours: Rows older than this are pruned (hourly)
+        """
+        self.connect = connect
+        self.on_changes = on_changes
+        self.interval = interval
+        self.batch_size = batch_size
+        self.gap_timeout = gap_timeout
+        self.retention_hours = retention_hours
+        self.last_seq = None
+        self.gaps = {}  # seq -> time first noticed
+        self.stats = {'polls': 0, 'changes': 0, 'errors': 0}
+        self._last_prune = 0.0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _fetch(self, cursor):
+        """Read new changes: (rows, last_seq, gaps) after them
+
+        Works on copies; poll() adopts last_seq / gaps only once the rows
+        were delivered, so a failed delivery re-reads the same batch.
+        """
+        if self.last_seq is None:
+            # Caches start empty: only what changes from now on matters
+            cursor.execute('SELECT COALESCE(MAX(seq), 0) AS seq FROM movie_changes')
+            return [], cursor.fetchone()['seq'], {}
+
+        last_seq = self.last_seq
+        gaps = dict(self.gaps)
+        rows = []
+        if gaps:
+            placeholders = ','.join(['?'] * len(gaps))
+            cursor.execute(f'SELECT seq, movie_id, action FROM movie_changes WHERE seq IN ({placeholders})',
+                           tuple(gaps))
+            rows.extend(cursor.fetchall())
+
+        while True:
+            cursor.execute('SELECT seq, movie_id, action FROM movie_changes WHERE seq > ? ORDER BY seq LIMIT ?',
+                           (last_seq, self.batch_size))
+            batch = cursor.fetchall()
+            for row in batch:
+                for missing in range(last_seq + 1, row['seq']):
+                    gaps[missing] = time.time()
+                last_seq = row['seq']
+            rows.extend(batch)
+            if len(batch) < self.batch_size:
+                break
+        return rows, last_seq, gaps
+
+    def prune(self):
+        """Delete rows older than retention_hours; failures only log"""
+        self._last_prune = time.time()
+        try:
+            conn = self.connect()
+            try:
+                cursor = conn.cursor()
+                cursor.execute('DELETE FROM movie_changes WHERE created_at < DATE_SUB(NOW(), INTERVAL ? HOUR)',
+                               (self.retention_hours,))
+                conn.commit()
+            finally:
+                conn.close()
+        except Exception as e:
+            print(f"⚠️ [Changes] Prune failed: {e}")
+
+    def poll(self):
+        """Read and deliver new changes once; returns how many were delivered"""
+        conn = self.connect()
+        try:
+            rows, last_seq, gaps = self._fetch(conn.cursor())
+        finally:
+            conn.close()
+
+        now = time.time()
+        for row in rows:
+            gaps.pop(row['seq'], None)
+        for seq in [seq for seq, seen in gaps.items() if now - seen > self.gap_timeout]:
+            del gaps[seq]
+
+        if rows:
+            # Raises before the position moves: the batch is delivered again
+            self.on_changes([dict(row) for row in rows])
+            self.stats['changes'] += len(rows)
+        self.last_seq, self.gaps = last_seq, gaps
+        self.stats['polls'] += 1
+
+        if now - self._last_prune > 3600:
+            self.prune()
+        return len(rows)
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.poll()
+            except Exception as e:
+                self.stats['errors'] += 1
+                print(f"⚠️ [Changes] Poll failed: {e}")
+            self._stop.wait(self.interval)
+
+    def start(self):
+        """Start polling in a daemon thread (no-op if already running)"""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
@@ -0,0 +1,70 @@
+"""
+Password Hasher - Bounded executor for password hashing
+generate_password_hash / check_password_hash are slow on purpose (scrypt);
+running them on a small fixed pool caps how many cores a burst of logins
+can take from the catalog routes, and a bounded wait queue turns overload
+into a quick "busy" answer instead of a pile-up of blocked workers
+"""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from werkzeug.security import check_password_hash, generate_password_hash
+
+
+class HasherBusyError(Exception):
+    """Too many hashes are already queued; retry later"""
+
+
+class PasswordHasher:
+    """Hash / verify passwords on at most ``max_workers`` threads
+
+    hashlib's scrypt releases the GIL, so the pool threads run on other
+    cores while request threads wait. ``max_workers=0`` hashes inline in
+    the calling thread (scripts, benchmarks).
+    """
+
+    def __init__(self, max_workers=2, max_waiting=32, timeout=10.0):
+        """
+        Args:
+            max_workers: Hashes running at once
+            max_waiting: Hashes running or queued before HasherBusyError
+            timeout: Seconds a caller waits for its result
+        """
+        self.max_workers = max_workers
+        self.max_waiting = max_waiting
+        self.timeout = timeout
+        self._executor = ThreadPoolExecutor(max_workers, thread_name_prefix='pwhash') if max_workers else None
+        self._slots = threading.BoundedSemaphore(max_waiting)
+        self.stats = {'hashed': 0, 'verified': 0, 'rejected': 0}
+
+    def _run(self, fn, *args):
+        if self._executor is None:
+            return fn(*args)
+        if not self._slots.acquire(blocking=False):
+            self.stats['rejected'] += 1
+            raise HasherBusyError('Password hashing is busy, try again shortly')
+        try:
+            return self._executor.submit(fn, *args).result(timeout=self.timeout)
+        finally:
+            self._slots.release()
+
+    def hash(self, password):
+        """generate_password_hash on the pool"""
+        result = self._run(generate_password_hash, password)
+        self.stats['hashed'] += 1
+        return result
+
+    def hash_many(self, passwords):
+        """Hash several passwords concurrently (seeding); ignores max_waiting"""
+        if self._executor is None:
+            return [generate_password_hash(password) for password in passwords]
+        futures = [self._executor.submit(generate_password_hash, password) for password in passwords]
+        self.stats['hashed'] += len(futures)
+        return [future.result() for future in futures]
+
+    def verify(self, password_hash, password):
+        """check_password_hash on the pool"""
+        result = self._run(check_password_hash, password_hash, password)
+        self.stats['verified'] += 1
+        return result
@@ -0,0 +1,266 @@
+"""
+Progress Buffer - Coalesced watch-history writes
+Player heartbeats only update an in-memory map holding the latest progress
+per (user, movie) - or per (user, movie, episode) for resume positions; a
+background thread flushes it every few seconds as one multi-row
+INSERT ... ON DUPLICATE KEY UPDATE
+"""
+
+import atexit
+import math
+import threading
+from datetime import datetime
+
+try:
+    from pymysql.err import InterfaceError, OperationalError
+    # Lost / refused connections: rows are kept and retried on the next flush
+    CONNECTION_ERRORS = (InterfaceError, OperationalError)
+except ImportError:
+    CONNECTION_ERRORS = ()
+
+COMPLETED_PERCENT = 95
+MAX_POSITION_SECONDS = 24 * 3600  # episode position / duration (INT columns)
+
+
+def _bounded(value, high, label):
+    number = float(value)
+    if not math.isfinite(number) or not 0 <= number <= high:
+        raise ValueError(f'{label} must be between 0 and {high}')
+    return int(number)
+
+# Keyed on the unique (user_id, movie_id). An older event (e.g. flushed late
+# by another app process) never overwrites a newer one; progress/completed
+# are assigned before last_watched because MySQL applies them left to right.
+UPSERT_PROGRESS_SQL = '''
+    INSERT INTO watch_history (user_id, movie_id, progress, completed, last_watched)
+    VALUES (?, ?, ?, ?, ?)
+    ON DUPLICATE KEY UPDATE
+        progress = IF(VALUES(last_watched) >= last_watched, VALUES(progress), progress),
+        completed = IF(VALUES(last_watched) >= last_watched, VALUES(completed), completed),
+        last_watched = GREATEST(last_watched, VALUES(last_watched))
+'''
+
+# Resume position per episode. The primary key is the lookup key (clustered,
+# no surrogate id); the two secondary indexes serve "where was I in this
+# series" and the continue-watching rail. No foreign keys: heartbeats stay
+# a single-row write, and readers join episodes to drop stale ids.
+EPISODE_PROGRESS_TABLE_SQL = '''
+    CREATE TABLE IF NOT EXISTS episode_progress (
+        user_id INT NOT NULL,
+        movie_id INT NOT NULL,
+        episode_id INT NOT NULL,
+        position_seconds INT NOT NULL DEFAULT 0,
+        duration_seconds INT NOT NULL DEFAULT 0,
+        updated_at DATETIME NOT NULL,
+        PRIMARY KEY (user_id, movie_id, episode_id),
+        INDEX idx_episode_progress_user_movie_recent (user_id, movie_id, updated_at),
+        INDEX idx_episode_progress_user_recent (user_id, updated_at)
+    )
+'''
+
+UPSERT_EPISODE_PROGRESS_SQL = '''
+    INSERT INTO episode_progress (user_id, movie_id, episode_id, position_seconds, duration_seconds, updated_at)
+    VALUES (?, ?, ?, ?, ?, ?)
+    ON DUPLICATE KEY UPDATE
+        position_seconds = IF(VALUES(updated_at) >= updated_at, VALUES(position_seconds), position_seconds),
+        duration_seconds = IF(VALUES(updated_at) >= updated_at, VALUES(duration_seconds), duration_seconds),
+        updated_at = GREATEST(updated_at, VALUES(updated_at))
+'''
+
+
+class CoalescingBuffer:
+    """Latest entry per key, written in bulk with one upsert statement
+
+    Keys start with the user id and entries end with their timestamp; a
+    flushed row is key + entry, in the column order of ``upsert_sql``.
+    """
+
+    def __init__(self, connect, upsert_sql, flush_interval=2.0, max_pending=5000, name='Progress'):
+        """
+        Args:
+            connect: Callable returning a DatabaseConnection
+            upsert_sql: INSERT ... ON DUPLICATE KEY UPDATE taking key + entry
+            flush_interval: Seconds between background flushes
+            max_pending: Flush early once this many keys are waiting
+            name: Label used in log lines
+        """
+        self.connect = connect
+        self.upsert_sql = upsert_sql
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.name = name
+        self._pending = {}  # key -> entry
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread = None
+        self.stats = {'events': 0, 'flushes': 0, 'rows': 0, 'errors': 0, 'dropped': 0}
+        atexit.register(self.flush)
+
+    def _put(self, entries):
+        """Merge [(key, entry)], keeping the newest entry per key"""
+        with self._lock:
+            for key, entry in entries:
+                current = self._pending.get(key)
+                if current is None or entry[-1] >= current[-1]:
+                    self._pending[key] = entry
+            self.stats['events'] += len(entries)
+            full = len(self._pending) >= self.max_pending
+        self._ensure_thread()
+        if full:
+            self._wake.set()
+
+    def _take(self, user_id=None):
+        with self._lock:
+            if user_id is None:
+                rows, self._pending = self._pending, {}
+            else:
+                user_id = int(user_id)
+                rows = {key: entry for key, entry in self._pending.items() if key[0] == user_id}
+                for key in rows:
+                    del self._pending[key]
+        return rows
+
+    def _restore(self, rows):
+        """Put rows back after a failed flush, unless a newer event arrived"""
+        with self._lock:
+            for key, entry in rows.items():
+                current = self._pending.get(key)
+                if current is None or entry[-1] > current[-1]:
+                    self._pending[key] = entry
+
+    def _write_each(self, rows):
+        """Upsert rows one at a time, dropping the ones the database rejects
+
+        Returns rows written. On a connection error the rows not yet tried
+        are put back and the error is re-raised.
+        """
+        items = list(rows.items())
+        written = 0
+        done = 0
+        conn = None
+        try:
+            conn = self.connect()
+            cursor = conn.cursor()
+            for key, entry in items:
+                try:
+                    cursor.execute(self.upsert_sql, key + entry)
+                    conn.commit()
+                    written += 1
+                except CONNECTION_ERRORS:
+                    raise
+                except Exception as e:
+                    conn.rollback()
+                    self.stats['dropped'] += 1
+                    print(f"⚠️ [{self.name}] Dropped row {key}: {e}")
+                done += 1
+        except BaseException:
+            self._restore(dict(items[done:]))
+            raise
+        finally:
+            if conn is not None:
+                conn.close()
+        return written
+
+    def _write_batch(self, rows):
+        conn = self.connect()
+        try:
+            cursor = conn.cursor()
+            cursor.executemany(self.upsert_sql, [key + entry for key, entry in rows.items()])
+            conn.commit()
+        finally:
+            conn.close()
+        return len(rows)
+
+    def flush(self, user_id=None):
+        """Write pending rows (all, or one user's) now; returns rows written"""
+        rows = self._take(user_id)
+        if not rows:
+            return 0
+        with self._flush_lock:
+            try:
+                written = self._write_batch(rows)
+            except BaseException as e:
+                self.stats['errors'] += 1
+                if isinstance(e, CONNECTION_ERRORS) or not isinstance(e, Exception):
+                    # Nothing committed (connect failed, connection lost, or the
+                    # connect callable exited): keep every row for the next flush
+                    self._restore(rows)
+                    raise
+                # One rejected row (unknown movie, out-of-range value) fails the
+                # whole statement: retry row by row so it cannot block the rest
+                written = self._write_each(rows)
+        self.stats['flushes'] += 1
+        self.stats['rows'] += written
+        return written
+
+    def discard(self, user_id):
+        """Drop a user's pending events (their history is being cleared)"""
+        self._take(user_id)
+
+    def pending_count(self):
+        with self._lock:
+            return len(self._pending)
+
+    def _run(self):
+        while True:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"⚠️ [{self.name}] Flush failed, will retry: {e}")
+
+    def _ensure_thread(self):
+        if self._thread is None or not self._thread.is_alive():
+            with self._lock:
+                if self._thread is None or not self._thread.is_alive():
+                    self._thread = threading.Thread(target=self._run, daemon=True)
+                    self._thread.start()
+
+
+class ProgressBuffer(CoalescingBuffer):
+    """Latest progress percent per (user_id, movie_id) for watch_history"""
+
+    def __init__(self, connect, flush_interval=2.0, max_pending=5000):
+        super().__init__(connect, UPSERT_PROGRESS_SQL, flush_interval, max_pending, name='Progress')
+
+    def add(self, user_id, movie_id, progress, watched_at=None):
+        """Record a progress event (replaces any pending one for the same key)"""
+        self.add_many(user_id, [(movie_id, progress, watched_at)])
+
+    def add_many(self, user_id, events):
+        """Record a user's [(movie_id, progress, watched_at or None)] at once"""
+        now = datetime.now()
+        entries = []
+        for movie_id, progress, watched_at in events:
+            progress = _bounded(progress, 100, 'progress')
+            entries.append(((int(user_id), int(movie_id)),
+                            (progress, 1 if progress >= COMPLETED_PERCENT else 0, watched_at or now)))
+        self._put(entries)
+
+
+class EpisodeProgressBuffer(CoalescingBuffer):
+    """Latest resume position per (user_id, movie_id, episode_id) for episode_progress"""
+
+    def __init__(self, connect, flush_interval=2.0, max_pending=5000):
+        super().__init__(connect, UPSERT_EPISODE_PROGRESS_SQL, flush_interval, max_pending,
+                         name='Episode progress')
+
+    def add(self, user_id, movie_id, episode_id, position, duration=0, watched_at=None):
+        """Record a resume position (seconds into the episode)"""
+        self.add_many(user_id, [(movie_id, episode_id, position, duration, watched_at)])
+
+    def add_many(self, user_id, events):
+        """Record a user's [(movie_id, episode_id, position, duration, watched_at or None)]
+
+        Raises ValueError (nothing recorded) for a non-finite or out-of-range
+        position / duration.
+        """
+        now = datetime.now()
+        self._put([
+            ((int(user_id), int(movie_id), int(episode_id)),
+             (_bounded(position, MAX_POSITION_SECONDS, 'position'),
+              _bounded(duration or 0, MAX_POSITION_SECONDS, 'duration'), watched_at or now))
+            for movie_id, episode_id, position, duration, watched_at in events
+        ])
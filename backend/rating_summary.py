@@ -0,0 +1,120 @@
+"""
+Rating Summary - Per-movie review aggregates
+Count, sum and a 1-5 star histogram per movie, kept in movie_rating_summary
+and bumped in the same transaction as each review write, so the detail page
+reads its score from one primary-key row instead of scanning reviews
+"""
+
+MOVIE_RATING_SUMMARY_TABLE_SQL = '''
+    CREATE TABLE IF NOT EXISTS movie_rating_summary (
+        movie_id INT PRIMARY KEY,
+        review_count INT NOT NULL DEFAULT 0,
+        rating_sum INT NOT NULL DEFAULT 0,
+        stars_1 INT NOT NULL DEFAULT 0,
+        stars_2 INT NOT NULL DEFAULT 0,
+        stars_3 INT NOT NULL DEFAULT 0,
+        stars_4 INT NOT NULL DEFAULT 0,
+        stars_5 INT NOT NULL DEFAULT 0,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+        FOREIGN KEY (movie_id) REFERENCES movies (id) ON DELETE CASCADE
+    )
+'''
+
+STAR_COLUMNS = ['stars_1', 'stars_2', 'stars_3', 'stars_4', 'stars_5']
+
+# Relative update: concurrent reviews of one movie only serialize on its row
+_APPLY_REVIEW_SQL = f'''
+    INSERT INTO movie_rating_summary (movie_id, review_count, rating_sum, {', '.join(STAR_COLUMNS)})
+    VALUES (?, ?, ?, {', '.join(['?'] * len(STAR_COLUMNS))})
+    ON DUPLICATE KEY UPDATE
+        review_count = review_count + VALUES(review_count),
+        rating_sum = rating_sum + VALUES(rating_sum),
+        {', '.join(f'{column} = {column} + VALUES({column})' for column in STAR_COLUMNS)}
+'''
+
+# Full recount from reviews (backfill / repair); absolute values
+_REBUILD_SQL = f'''
+    INSERT INTO movie_rating_summary (movie_id, review_count, rating_sum, {', '.join(STAR_COLUMNS)})
+    SELECT movie_id, COUNT(*), COALESCE(SUM(rating), 0),
+           {', '.join(f'SUM(rating = {stars})' for stars in range(1, 6))}
+    FROM reviews
+    {{where}}
+    GROUP BY movie_id
+    ON DUPLICATE KEY UPDATE
+        review_count = VALUES(review_count),
+        rating_sum = VALUES(rating_sum),
+        {', '.join(f'{column} = VALUES({column})' for column in STAR_COLUMNS)}
+'''
+
+
+def apply_review(cursor, movie_id, rating, delta=1):
+    """Add (delta=1) or remove (delta=-1) one rating; call before the commit
+    of the review write
+
+    Args:
+        cursor: Cursor of the transaction that wrote the review
+        movie_id: Reviewed movie
+        rating: Stars, 1-5
+        delta: +1 for a new review, -1 for a deleted one (-n for n reviews
+            with the same rating)
+    """
+    rating = int(rating)
+    stars = [delta if rating == value else 0 for value in range(1, 6)]
+    cursor.execute(_APPLY_REVIEW_SQL, (movie_id, delta, delta * rating, *stars))
+
+
+def remove_user_reviews(cursor, user_id):
+    """Subtract a user's reviews from the summaries before the user row is
+    deleted (reviews go with it through ON DELETE CASCADE)
+
+    Returns the ids of the affected movies.
+    """
+    cursor.execute('''
+        SELECT movie_id, rating, COUNT(*) AS reviews
+        FROM reviews
+        WHERE user_id = ?
+        GROUP BY movie_id, rating
+    ''', (user_id,))
+    rows = cursor.fetchall()
+    for row in rows:
+        apply_review(cursor, row['movie_id'], row['rating'], delta=-int(row['reviews']))
+    return sorted({row['movie_id'] for row in rows})
+
+
+def rebuild_summaries(cursor, movie_id=None):
+    """Recount summaries from reviews (all movies, or one)"""
+    if movie_id is None:
+        cursor.execute(_REBUILD_SQL.format(where=''))
+    else:
+        cursor.execute(_REBUILD_SQL.format(where='WHERE movie_id = ?'), (movie_id,))
+
+
+def ensure_summaries(cursor):
+    """Backfill the table once, when it is still empty but reviews exist"""
+    cursor.execute('SELECT 1 AS found FROM movie_rating_summary LIMIT 1')
+    if cursor.fetchone():
+        return False
+    rebuild_summaries(cursor)
+    return True
+
+
+def summary_dict(row):
+    """Row of movie_rating_summary (or None) -> API shape"""
+    row = row or {}
+    count = int(row.get('review_count') or 0)
+    total = int(row.get('rating_sum') or 0)
+    return {
+        'count': count,
+        'average': round(total / count, 1) if count else 0.0,
+        'histogram': {str(stars): int(row.get(f'stars_{stars}') or 0) for stars in range(1, 6)},
+    }
+
+
+def get_summary(cursor, movie_id):
+    """Summary of one movie (primary-key lookup)"""
+    cursor.execute(f'''
+        SELECT review_count, rating_sum, {', '.join(STAR_COLUMNS)}
+        FROM movie_rating_summary
+        WHERE movie_id = ?
+    ''', (movie_id,))
+    return summary_dict(cursor.fetchone())
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Backfill Accent-free Search Columns
+Fills movies.title_search / original_title_search for rows written before
+the columns existed, in small keyset batches (id > last_id) so it can be
+stopped and re-run at any time without redoing finished work
+
+Usage:
+    python backfill_search_columns.py                  # only rows still NULL
+    python backfill_search_columns.py --batch-size 200 --sleep 0.2
+    python backfill_search_columns.py --rebuild        # recompute every row
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from db_manager import DatabaseConnection  # noqa: E402
+from search_helper import SmartSearchHelper  # noqa: E402
+
+# --rebuild progress survives interruptions here (NULL-only runs need no file:
+# finished rows are simply no longer NULL)
+CHECKPOINT_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'config',
+                               'backfill_search_columns.json')
+
+
+def load_checkpoint():
+    if not os.path.exists(CHECKPOINT_FILE):
+        return 0
+    try:
+        with open(CHECKPOINT_FILE, 'r', encoding='utf-8') as fh:
+            return int(json.load(fh).get('last_id', 0))
+    except Exception as e:
+        print(f"⚠️ Could not read checkpoint, starting over: {e}")
+        return 0
+
+
+def save_checkpoint(last_id):
+    tmp_file = f'{CHECKPOINT_FILE}.tmp'
+    with open(tmp_file, 'w', encoding='utf-8') as fh:
+        json.dump({'last_id': last_id, 'saved_at': time.strftime('%Y-%m-%d %H:%M:%S')}, fh)
+    os.replace(tmp_file, CHECKPOINT_FILE)
+
+
+def backfill(batch_size=500, sleep=0.0, rebuild=False):
+    """Update search columns batch by batch, committing after each batch"""
+    conn = DatabaseConnection()
+    cursor = conn.cursor()
+
+    last_id = load_checkpoint() if rebuild else 0
+    pending_filter = '' if rebuild else 'AND title_search IS NULL'
+    updated = 0
+    started = time.time()
+
+    print("=" * 60)
+    print(f"🔤 Backfilling search columns ({'rebuild' if rebuild else 'missing only'}), from id > {last_id}")
+    print("=" * 60)
+
+    try:
+        while True:
+            cursor.execute(f'''
+                SELECT id, title, original_title
+                FROM movies
+                WHERE id > ? {pending_filter}
+                ORDER BY id
+                LIMIT ?
+            ''', (last_id, batch_size))
+            rows = cursor.fetchall()
+            if not rows:
+                break
+
+            cursor.executemany(
+                'UPDATE movies SET title_search = ?, original_title_search = ? WHERE id = ?',
+                [(SmartSearchHelper.to_search_form(row['title']),
+                  SmartSearchHelper.to_search_form(row['original_title']),
+                  row['id']) for row in rows]
+            )
+            conn.commit()
+
+            last_id = rows[-1]['id']
+            updated += len(rows)
+            if rebuild:
+                save_checkpoint(last_id)
+            rate = updated / max(time.time() - started, 1e-6)
+            print(f"  ✅ {updated} rows (last id {last_id}, {rate:.0f} rows/s)")
+
+            if sleep:
+                time.sleep(sleep)  # Leave room for live traffic
+    finally:
+        conn.close()
+
+    if rebuild and os.path.exists(CHECKPOINT_FILE):
+        os.remove(CHECKPOINT_FILE)
+    print(f"\n🎉 Done: {updated} rows in {time.time() - started:.1f}s")
+    return updated
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Backfill movies.title_search / original_title_search')
+    parser.add_argument('--batch-size', type=int, default=500, help='Rows per UPDATE batch')
+    parser.add_argument('--sleep', type=float, default=0.0, help='Pause between batches (seconds)')
+    parser.add_argument('--rebuild', action='store_true',
+                        help='Recompute every row (e.g. after changing to_search_form), resumable')
+    args = parser.parse_args()
+    backfill(args.batch_size, args.sleep, args.rebuild)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""
+Auth Mixed-Load Benchmark
+Runs login threads (scrypt password checks) next to catalog threads and
+reports login throughput against catalog latency, hashing inline in every
+request thread vs on the bounded PasswordHasher pool
+
+Usage:
+    python benchmark_auth_load.py                               # local simulation
+    python benchmark_auth_load.py --login-threads 32 --catalog-threads 8 --duration 10
+    python benchmark_auth_load.py --url http://localhost:5000 --email user@test.com --password user123
+"""
+import argparse
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from benchmark_cache_stampede import percentile
+
+
+def run_mixed(login, catalog, login_threads, catalog_threads, duration, backoff=0.05):
+    """Run login() and catalog() loops side by side; a 429 / 503 waits ``backoff`` seconds
+
+    Returns (login status counts, catalog latencies in ms)
+    """
+    statuses = {}
+    catalog_ms = []
+    lock = threading.Lock()
+    deadline = time.time() + duration
+
+    def login_worker():
+        local = {}
+        while time.time() < deadline:
+            status = login()
+            local[status] = local.get(status, 0) + 1
+            if status in (429, 503):
+                time.sleep(backoff)
+        with lock:
+            for status, count in local.items():
+                statuses[status] = statuses.get(status, 0) + count
+
+    def catalog_worker():
+        local = []
+        while time.time() < deadline:
+            started = time.time()
+            catalog()
+            local.append((time.time() - started) * 1000.0)
+        with lock:
+            catalog_ms.extend(local)
+
+    workers = ([threading.Thread(target=login_worker) for _ in range(login_threads)] +
+               [threading.Thread(target=catalog_worker) for _ in range(catalog_threads)])
+    for w in workers:
+        w.start()
+    for w in workers:
+        w.join()
+    return statuses, catalog_ms
+
+
+def report(name, statuses, catalog_ms, duration):
+    print(f"\n📊 {name}")
+    print(f"   Logins OK:       {statuses.get(200, 0)} ({statuses.get(200, 0) / duration:.1f}/s)")
+    print(f"   Busy (503):      {statuses.get(503, 0)}")
+    print(f"   Throttled (429): {statuses.get(429, 0)}")
+    other = {status: count for status, count in statuses.items() if status not in (200, 429, 503)}
+    if other:
+        print(f"   Other:           {other}")
+    print(f"   Catalog reqs:    {len(catalog_ms)} ({len(catalog_ms) / duration:.1f}/s)")
+    print(f"   Catalog p50:     {percentile(catalog_ms, 50):8.2f} ms")
+    print(f"   Catalog p99:     {percentile(catalog_ms, 99):8.2f} ms")
+
+
+def build_app(hasher, password_hash, catalog_rows):
+    """Login + catalog routes shaped like app.py's, without the database"""
+    from flask import Flask, jsonify, request
+    from password_hasher import HasherBusyError
+
+    app = Flask(__name__)
+
+    @app.route('/api/login', methods=['POST'])
+    def login():
+        data = request.get_json()
+        try:
+            if not hasher.verify(password_hash, data.get('password')):
+                return jsonify({'success': False}), 401
+        except HasherBusyError:
+            return jsonify({'success': False}), 503
+        return jsonify({'success': True})
+
+    @app.route('/api/movies')
+    def movies():
+        return jsonify({'success': True, 'data': catalog_rows})
+
+    return app
+
+
+def run_local(args):
+    from password_hasher import PasswordHasher
+    from werkzeug.security import generate_password_hash
+
+    password = 'user123'
+    password_hash = generate_password_hash(password)
+    catalog_rows = [{'id': i, 'title': f'Movie {i}', 'year': 2000 + i % 25, 'rating': i % 10}
+                    for i in range(args.rows)]
+
+    started = time.time()
+    PasswordHasher(max_workers=0).verify(password_hash, password)
+    print(f"🔐 One password check: {(time.time() - started) * 1000:.0f} ms, CPUs: {os.cpu_count()}")
+
+    modes = [
+        ('Inline hashing (every request thread)', PasswordHasher(max_workers=0)),
+        (f'Bounded pool ({args.workers} workers, {args.queue} waiting)',
+         PasswordHasher(max_workers=args.workers, max_waiting=args.queue)),
+    ]
+    for name, hasher in modes:
+        app = build_app(hasher, password_hash, catalog_rows)
+        local = threading.local()
+
+        def client():
+            if not hasattr(local, 'client'):
+                local.client = app.test_client()
+            return local.client
+
+        def login():
+            return client().post('/api/login', json={'email': 'user@test.com', 'password': password}).status_code
+
+        def catalog():
+            client().get('/api/movies')
+
+        statuses, catalog_ms = run_mixed(login, catalog, args.login_threads, args.catalog_threads, args.duration,
+                                      args.backoff_ms / 1000.0)
+        report(name, statuses, catalog_ms, args.duration)
+
+
+def run_remote(args):
+    import requests
+
+    local = threading.local()
+
+    def http():
+        if not hasattr(local, 'session'):
+            local.session = requests.Session()
+        return local.session
+
+    def login():
+        return http().post(f'{args.url}/api/login',
+                           json={'email': args.email, 'password': args.password}).status_code
+
+    def catalog():
+        http().get(f'{args.url}{args.catalog_path}')
+
+    statuses, catalog_ms = run_mixed(login, catalog, args.login_threads, args.catalog_threads, args.duration,
+                                      args.backoff_ms / 1000.0)
+    report(f'{args.url} (raise LOGIN_IP_LIMIT / LOGIN_FAILURE_LIMIT for the run)', statuses, catalog_ms, args.duration)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Login throughput vs catalog latency under mixed load')
+    parser.add_argument('--login-threads', type=int, default=16)
+    parser.add_argument('--catalog-threads', type=int, default=4)
+    parser.add_argument('--duration', type=float, default=5.0, help='Seconds per mode')
+    parser.add_argument('--workers', type=int, default=2, help='PasswordHasher max_workers')
+    parser.add_argument('--queue', type=int, default=8, help='PasswordHasher max_waiting')
+    parser.add_argument('--backoff-ms', type=float, default=50, help='Client wait after a 429 / 503')
+    parser.add_argument('--rows', type=int, default=200, help='Rows in the simulated catalog page')
+    parser.add_argument('--url', help='Benchmark a running server instead')
+    parser.add_argument('--email', default='user@test.com')
+    parser.add_argument('--password', default='user123')
+    parser.add_argument('--catalog-path', default='/api/genres')
+    args = parser.parse_args()
+
+    print("=" * 70)
+    print("🔐 AUTH MIXED-LOAD BENCHMARK")
+    print("=" * 70)
+    print(f"Login threads: {args.login_threads}, catalog threads: {args.catalog_threads}, "
+          f"duration: {args.duration}s per mode")
+
+    if args.url:
+        run_remote(args)
+    else:
+        run_local(args)
+    print("\n" + "=" * 70)
+
+
+if __name__ == '__main__':
+    main()
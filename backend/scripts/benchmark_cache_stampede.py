@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Cache Stampede Load Test
+Compares plain @cache.cached against the stale-while-revalidate cache
+across several expiry boundaries and reports latency percentiles
+
+Usage:
+    python benchmark_cache_stampede.py                      # local simulation
+    python benchmark_cache_stampede.py --ttl 2 --query-ms 300 --threads 32
+    python benchmark_cache_stampede.py --url http://localhost:5000/api/genres
+"""
+import argparse
+import os
+import sys
+import threading
+import time
+from collections import defaultdict
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of a list of numbers"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    idx = max(0, min(len(ordered) - 1, int(round(pct / 100.0 * len(ordered))) - 1))
+    return ordered[idx]
+
+
+def run_load(fetch, threads, duration):
+    """Hammer fetch() from N threads; returns [(started_at, latency_ms)]"""
+    samples = []
+    lock = threading.Lock()
+    deadline = time.time() + duration
+
+    def worker():
+        local = []
+        while time.time() < deadline:
+            started = time.time()
+            fetch()
+            local.append((started, (time.time() - started) * 1000.0))
+        with lock:
+            samples.extend(local)
+
+    workers = [threading.Thread(target=worker) for _ in range(threads)]
+    for w in workers:
+        w.start()
+    for w in workers:
+        w.join()
+    return samples
+
+
+def report(name, samples, backend_calls=None):
+    """Print overall percentiles and the worst per-second p99"""
+    latencies = [lat for _, lat in samples]
+    start = min(ts for ts, _ in samples) if samples else 0
+    buckets = defaultdict(list)
+    for ts, lat in samples:
+        buckets[int(ts - start)].append(lat)
+    worst_p99 = max((percentile(b, 99) for b in buckets.values()), default=0.0)
+
+    print(f"\n📊 {name}")
+    print(f"   Requests:        {len(samples)}")
+    if backend_calls is not None:
+        print(f"   Backend queries: {backend_calls}")
+    print(f"   p50:             {percentile(latencies, 50):8.2f} ms")
+    print(f"   p99:             {percentile(latencies, 99):8.2f} ms")
+    print(f"   max:             {max(latencies, default=0.0):8.2f} ms")
+    print(f"   worst 1s p99:    {worst_p99:8.2f} ms")
+    print("   p99 per second:  " + ' '.join(f"{percentile(buckets[s], 99):.0f}" for s in sorted(buckets)))
+
+
+def run_local(args):
+    """Simulate a slow MySQL query behind both cache flavours"""
+    from flask import Flask, jsonify
+    from flask_caching import Cache
+    from cache_manager import StaleWhileRevalidateCache
+
+    app = Flask(__name__)
+    app.config['CACHE_TYPE'] = 'SimpleCache'
+    cache = Cache(app)
+    swr_cache = StaleWhileRevalidateCache(cache, app, jitter=0.1)
+    calls = {'legacy': 0, 'swr': 0}
+    calls_lock = threading.Lock()
+
+    def slow_query(name):
+        with calls_lock:
+            calls[name] += 1
+        time.sleep(args.query_ms / 1000.0)
+        return jsonify({'success': True, 'data': list(range(50))})
+
+    @app.route('/legacy')
+    @cache.cached(timeout=args.ttl)
+    def legacy():
+        return slow_query('legacy')
+
+    @app.route('/swr')
+    @swr_cache.cached(timeout=args.ttl)
+    def swr():
+        return slow_query('swr')
+
+    print("=" * 70)
+    print("🧪 CACHE STAMPEDE LOAD TEST (local simulation)")
+    print(f"   TTL={args.ttl}s, query={args.query_ms}ms, threads={args.threads}, duration={args.duration}s")
+    print("=" * 70)
+
+    for name in ('legacy', 'swr'):
+        local = threading.local()
+
+        def fetch(path=f'/{name}'):
+            client = getattr(local, 'client', None)
+            if client is None:
+                client = local.client = app.test_client()
+            client.get(path)
+
+        samples = run_load(fetch, args.threads, args.duration)
+        report(f"{name} (@{'cache' if name == 'legacy' else 'swr_cache'}.cached)", samples, calls[name])
+
+
+def run_remote(args):
+    """Load a running server endpoint and print its latency timeline"""
+    import requests
+
+    local = threading.local()
+
+    def fetch():
+        session = getattr(local, 'session', None)
+        if session is None:
+            session = local.session = requests.Session()
+        session.get(args.url, timeout=30)
+
+    print("=" * 70)
+    print(f"🌐 CACHE STAMPEDE LOAD TEST against {args.url}")
+    print(f"   threads={args.threads}, duration={args.duration}s")
+    print("=" * 70)
+    report(args.url, run_load(fetch, args.threads, args.duration))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Cache stampede load test')
+    parser.add_argument('--url', type=str, help='Endpoint of a running server (default: local simulation)')
+    parser.add_argument('--ttl', type=int, default=2, help='Cache TTL for the local simulation (seconds)')
+    parser.add_argument('--query-ms', type=int, default=200, help='Simulated query time (ms)')
+    parser.add_argument('--threads', type=int, default=16, help='Concurrent clients')
+    parser.add_argument('--duration', type=int, default=10, help='Test duration per variant (seconds)')
+    args = parser.parse_args()
+
+    if args.url:
+        run_remote(args)
+    else:
+        run_local(args)
+
+
+if __name__ == '__main__':
+    main()
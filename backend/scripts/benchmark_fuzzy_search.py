@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+"""
+Fuzzy Title Search Benchmark
+Measures recall and latency of FuzzyTitleIndex on a seeded misspelling
+corpus (deletions, insertions, substitutions, transpositions, missing
+accents) and compares with exact prefix matching (what FULLTEXT 'word*'
+can find)
+
+Usage:
+    python benchmark_fuzzy_search.py
+    python benchmark_fuzzy_search.py --catalog movies.json --queries 2000
+    python benchmark_fuzzy_search.py --synthetic 20000
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+import unicodedata
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from fuzzy_index import FuzzyTitleIndex, fold_tokens  # noqa: E402
+from search_helper import SmartSearchHelper  # noqa: E402
+
+SAMPLE_TITLES = [
+    ('Người Nhện: Không Còn Nhà', 'Spider-Man: No Way Home'),
+    ('Avatar: Dòng Chảy Của Nước', 'Avatar: The Way of Water'),
+    ('Vệ Binh Dải Ngân Hà 3', 'Guardians of the Galaxy Vol. 3'),
+    ('Người Nhện: Du Hành Vũ Trụ Nhện', 'Spider-Man: Across the Spider-Verse'),
+    ('Cậu Bé Mất Tích', 'Stranger Things'),
+    ('Những Người Sống Sót', 'The Last of Us'),
+    ('Kẻ Trộm Mặt Trăng', 'Despicable Me'),
+    ('Thế Giới Khủng Long', 'Jurassic World'),
+    ('Bố Già', 'The Godfather'),
+    ('Hai Phượng', 'Furie'),
+    ('Mắt Biếc', 'Dreamy Eyes'),
+    ('Tiệc Trăng Máu', 'Blood Moon Party'),
+    ('Nhà Bà Nữ', 'The House of No Man'),
+    ('Lật Mặt: Một Điều Ước', 'Face Off: One Wish'),
+    ('Đất Rừng Phương Nam', 'Song of the South'),
+    ('Cô Gái Đến Từ Hôm Qua', 'The Girl from Yesterday'),
+    ('Em Chưa 18', 'Jailbait'),
+    ('Hoa Hậu Giang Hồ', 'Miss Gangster'),
+    ('Siêu Lừa Gặp Siêu Lầy', 'Chasing the Con'),
+    ('Quỷ Cẩu', 'Dog Demon'),
+    ('Trò Chơi Con Mực', 'Squid Game'),
+    ('Hạ Cánh Nơi Anh', 'Crash Landing on You'),
+    ('Yêu Tinh', 'Goblin'),
+    ('Hậu Duệ Mặt Trời', 'Descendants of the Sun'),
+    ('Vua Sư Tử', 'The Lion King'),
+    ('Nữ Hoàng Băng Giá', 'Frozen'),
+    ('Biệt Đội Siêu Anh Hùng', 'The Avengers'),
+    ('Hiệp Sĩ Bóng Đêm', 'The Dark Knight'),
+    ('Kỳ Án Ánh Trăng', 'The Moonlight Case'),
+    ('Chiến Binh Báo Đen', 'Black Panther'),
+]
+
+VN_LETTERS = 'aăâbcdđeêghiklmnoôơpqrstuưvxyàáảãạằắẳẵặầấẩẫậèéẻẽẹềếểễệìíỉĩịòóỏõọồốổỗộờớởỡợùúủũụừứửữựỳýỷỹỵ'
+
+
+def load_catalog(path):
+    """Load [{id, title, original_title}] from our rows or OPhim items"""
+    with open(path, 'r', encoding='utf-8') as fh:
+        data = json.load(fh)
+    if isinstance(data, dict):
+        data = data.get('movies') or data.get('items') or data.get('data', {}).get('items', [])
+    catalog = []
+    for idx, item in enumerate(data, 1):
+        catalog.append({
+            'id': item.get('id', idx) if isinstance(item.get('id'), int) else idx,
+            'title': item.get('title') or item.get('name', ''),
+            'original_title': item.get('original_title') or item.get('origin_name', ''),
+        })
+    return catalog
+
+
+def random_syllable(rng):
+    """Vietnamese-looking syllable: onset + toned vowel + coda"""
+    onset = rng.choice(['', 'b', 'c', 'ch', 'd', 'đ', 'g', 'gi', 'h', 'kh', 'l', 'm', 'n', 'ng',
+                        'nh', 'ph', 'qu', 's', 't', 'th', 'tr', 'v', 'x'])
+    vowel = rng.choice(['a', 'ă', 'â', 'e', 'ê', 'i', 'o', 'ô', 'ơ', 'u', 'ư', 'y', 'ai', 'oa', 'uô', 'ươ', 'iê'])
+    tone = rng.choice(['', '\u0301', '\u0300', '\u0309', '\u0303', '\u0323'])
+    coda = rng.choice(['', '', 'c', 'ch', 'm', 'n', 'ng', 'nh', 'p', 't', 'i', 'o', 'u'])
+    return unicodedata.normalize('NFC', onset + vowel[0] + tone + vowel[1:] + coda)
+
+
+def synthetic_catalog(size, rng):
+    """Sample titles plus generated titles from a random syllable vocabulary"""
+    vocab_vn = sorted({random_syllable(rng) + random_syllable(rng) for _ in range(max(size // 2, 500))})
+    vocab_en = sorted({''.join(rng.choice('abcdefghijklmnopqrstuvwxyz') for _ in range(rng.randint(4, 9)))
+                       for _ in range(max(size // 2, 500))})
+    catalog = [{'id': i, 'title': vn, 'original_title': en} for i, (vn, en) in enumerate(SAMPLE_TITLES, 1)]
+    while len(catalog) < size:
+        catalog.append({
+            'id': len(catalog) + 1,
+            'title': ' '.join(rng.sample(vocab_vn, rng.randint(2, 4))).capitalize(),
+            'original_title': ' '.join(rng.sample(vocab_en, rng.randint(1, 3))).title(),
+        })
+    return catalog
+
+
+def misspell(word, rng):
+    """Apply one random typo to a word"""
+    op = rng.choice(['delete', 'insert', 'substitute', 'transpose', 'accents'])
+    pos = rng.randrange(len(word))
+    if op == 'delete':
+        return word[:pos] + word[pos + 1:]
+    if op == 'insert':
+        return word[:pos] + rng.choice(VN_LETTERS) + word[pos:]
+    if op == 'substitute':
+        return word[:pos] + rng.choice(VN_LETTERS) + word[pos + 1:]
+    if op == 'transpose' and pos < len(word) - 1:
+        return word[:pos] + word[pos + 1] + word[pos] + word[pos + 2:]
+    return SmartSearchHelper.remove_diacritics(word)
+
+
+def build_queries(catalog, count, rng):
+    """[(query, target_id)]: one or two misspelled words from a real title"""
+    queries = []
+    candidates = [m for m in catalog if any(len(w) >= 4 for w in (m['title'] + ' ' + m['original_title']).split())]
+    while len(queries) < count and candidates:
+        movie = rng.choice(candidates)
+        title = rng.choice([t for t in (movie['title'], movie['original_title']) if t])
+        words = [w for w in title.replace(':', ' ').split() if w]
+        if not words:
+            continue
+        start = rng.randrange(len(words))
+        picked = words[start:start + rng.randint(1, 2)]
+        typo_idx = max(range(len(picked)), key=lambda i: len(picked[i]))
+        if len(picked[typo_idx]) >= 4:
+            picked[typo_idx] = misspell(picked[typo_idx], rng)
+        queries.append((' '.join(picked).lower(), movie['id']))
+    return queries
+
+
+def prefix_baseline(catalog):
+    """Exact-token prefix matcher: roughly what MATCH AGAINST('w*') finds"""
+    folded = [(m['id'], set(fold_tokens(m['title'])) | set(fold_tokens(m['original_title']))) for m in catalog]
+
+    def search(query, limit=10):
+        words = fold_tokens(query)
+        hits = []
+        for movie_id, tokens in folded:
+            if all(any(t.startswith(w) for t in tokens) for w in words):
+                hits.append(movie_id)
+                if len(hits) >= limit:
+                    break
+        return hits
+    return search
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    return ordered[max(0, min(len(ordered) - 1, int(round(pct / 100.0 * len(ordered))) - 1))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Fuzzy title search benchmark')
+    parser.add_argument('--catalog', type=str, help='JSON catalog (our rows or OPhim items)')
+    parser.add_argument('--synthetic', type=int, default=5000, help='Synthetic catalog size if no --catalog')
+    parser.add_argument('--queries', type=int, default=1000, help='Number of misspelled queries')
+    parser.add_argument('--top-k', type=int, default=10, help='Recall cut-off')
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    catalog = load_catalog(args.catalog) if args.catalog else synthetic_catalog(args.synthetic, rng)
+    queries = build_queries(catalog, args.queries, rng)
+
+    print("=" * 70)
+    print("🔤 FUZZY TITLE SEARCH BENCHMARK")
+    print(f"   Catalog: {len(catalog)} movies, queries: {len(queries)}, recall@{args.top_k}")
+    print("=" * 70)
+
+    started = time.perf_counter()
+    index = FuzzyTitleIndex.build(catalog)
+    print(f"\n⏱️  Index build: {(time.perf_counter() - started) * 1000:.1f} ms")
+
+    baseline = prefix_baseline(catalog)
+    results = {}
+    for name, search in (('prefix (FULLTEXT-like)', lambda q: baseline(q, args.top_k)),
+                         ('fuzzy trigram index', lambda q: [m for m, _ in index.search(q, args.top_k)])):
+        found = 0
+        latencies = []
+        for query, target in queries:
+            t0 = time.perf_counter()
+            hits = search(query)
+            latencies.append((time.perf_counter() - t0) * 1000.0)
+            found += 1 if target in hits else 0
+        results[name] = (found / max(len(queries), 1), latencies)
+
+    for name, (recall, latencies) in results.items():
+        print(f"\n📊 {name}")
+        print(f"   recall@{args.top_k}: {recall * 100:6.2f}%")
+        print(f"   p50: {percentile(latencies, 50):7.3f} ms   p95: {percentile(latencies, 95):7.3f} ms   "
+              f"p99: {percentile(latencies, 99):7.3f} ms")
+
+    print("\n" + "=" * 70)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,389 @@
+#!/usr/bin/env python3
+"""
+Importer Benchmark
+Runs OphimImporter against a local stand-in of the OPhim API and a
+disposable database, and reports movies/sec, DB round trips per movie,
+HTTP requests and peak Python memory (tracemalloc)
+
+The stand-in serves danh-sach/phim-moi-cap-nhat and phim/<slug> built from
+fixtures/ophim_details.json (detail payloads in the shape OPhim returns),
+cloned to the requested catalog size, with configurable latency and error
+rate, and ETag / 304 support.
+
+Passes:
+    cold    import_batch into an empty database (every movie inserted)
+    rerun   import_batch again (existing movies skipped before any request)
+    forced  every movie re-imported with force_update (the backfill /
+            incremental path: conditional detail GET + content-hash check)
+
+Usage:
+    python benchmark_importer.py
+    python benchmark_importer.py --pages 10 --latency-ms 40 --error-rate 0.05
+    MYSQL_DATABASE=cgv_bench python benchmark_importer.py --db mysql
+"""
+import argparse
+import contextlib
+import hashlib
+import io
+import json
+import os
+import random
+import shutil
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+import ophim_import_v3  # noqa: E402
+from ophim_import_v3 import OphimImporter  # noqa: E402
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'ophim_details.json')
+LIST_FIELDS = ('_id', 'name', 'origin_name', 'slug', 'year', 'thumb_url', 'poster_url', 'modified', 'tmdb')
+SLUG_MARK = '-bench'
+
+
+# ---------------------------------------------------------------------------
+# OPhim stand-in server
+# ---------------------------------------------------------------------------
+
+def build_catalog(size):
+    """Clone the fixture details into `size` distinct movies, newest first"""
+    with open(FIXTURES, encoding='utf-8') as fh:
+        templates = list(json.load(fh)['details'].values())
+    details, items = {}, []
+    for i in range(size):
+        payload = json.loads(json.dumps(templates[i % len(templates)]))
+        item = payload['data']['item']
+        item['slug'] = f"{item['slug']}{SLUG_MARK}{i}"
+        item['name'] = f"{item['name']} #{i}"
+        item['_id'] = f"{item['_id']}-{i}"
+        item['modified'] = {'time': time.strftime('%Y-%m-%dT%H:%M:%S.000Z', time.gmtime(1730000000 - i * 60))}
+        details[item['slug']] = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        items.append({key: item[key] for key in LIST_FIELDS})
+    return details, items
+
+
+class StandInState:
+    def __init__(self, details, items, per_page, latency_ms, jitter_ms, error_rate, seed):
+        self.details = details
+        self.items = items
+        self.per_page = per_page
+        self.latency = latency_ms / 1000.0
+        self.jitter = jitter_ms / 1000.0
+        self.error_rate = error_rate
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self.counts = {'list': 0, 'detail': 0, 'not_modified': 0, 'errors': 0}
+
+    def list_page(self, page):
+        start = (page - 1) * self.per_page
+        body = {
+            'status': True,
+            'data': {
+                'items': self.items[start:start + self.per_page],
+                'params': {'pagination': {
+                    'totalItems': len(self.items), 'totalItemsPerPage': self.per_page, 'currentPage': page,
+                }},
+            },
+        }
+        return json.dumps(body, ensure_ascii=False).encode('utf-8')
+
+
+def make_handler(state):
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+        def send_body(self, body, etag=None):
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
+            if etag:
+                self.send_header('ETag', etag)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            with state.lock:
+                delay = state.latency + state.rng.uniform(0, state.jitter)
+                fail = state.rng.random() < state.error_rate
+            time.sleep(delay)
+            if fail:
+                state.counts['errors'] += 1
+                self.send_response(503)
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+                return
+
+            url = urlparse(self.path)
+            if url.path == '/danh-sach/phim-moi-cap-nhat':
+                state.counts['list'] += 1
+                page = int(parse_qs(url.query).get('page', ['1'])[0])
+                self.send_body(state.list_page(page))
+            elif url.path.startswith('/phim/') and url.path[6:] in state.details:
+                body = state.details[url.path[6:]]
+                etag = '"' + hashlib.sha1(body).hexdigest() + '"'
+                if self.headers.get('If-None-Match') == etag:
+                    state.counts['not_modified'] += 1
+                    self.send_response(304)
+                    self.send_header('ETag', etag)
+                    self.end_headers()
+                    return
+                state.counts['detail'] += 1
+                self.send_body(body, etag)
+            else:
+                self.send_response(404)
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+    return Handler
+
+
+# ---------------------------------------------------------------------------
+# Disposable database + round-trip counting
+# ---------------------------------------------------------------------------
+
+SQLITE_SCHEMA = '''
+    CREATE TABLE movies (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        title TEXT NOT NULL, original_title TEXT, slug TEXT, description TEXT,
+        release_year INTEGER, duration INTEGER, country TEXT, language TEXT,
+        director TEXT, cast TEXT, genres TEXT, imdb_rating REAL,
+        poster_url TEXT, backdrop_url TEXT, trailer_url TEXT, video_url TEXT,
+        type TEXT, is_premium INTEGER DEFAULT 0, status TEXT DEFAULT 'active',
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        title_search TEXT, original_title_search TEXT, content_hash TEXT
+    );
+    CREATE INDEX idx_movies_title ON movies(title);
+    CREATE UNIQUE INDEX idx_movies_slug ON movies(slug);
+    CREATE TABLE genres (id INTEGER PRIMARY KEY AUTOINCREMENT, name TEXT UNIQUE, slug TEXT UNIQUE);
+    CREATE TABLE movie_genres (movie_id INTEGER, genre_id INTEGER, PRIMARY KEY (movie_id, genre_id));
+    CREATE TABLE episodes (
+        id INTEGER PRIMARY KEY AUTOINCREMENT, movie_id INTEGER, episode_number INTEGER,
+        episode_name TEXT, video_url TEXT, server_name TEXT,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    );
+    CREATE INDEX idx_episodes_movie ON episodes(movie_id);
+    CREATE TABLE movie_changes (
+        seq INTEGER PRIMARY KEY AUTOINCREMENT, movie_id INTEGER NOT NULL, action TEXT NOT NULL,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    );
+'''
+
+
+class SQLiteCursor:
+    """MySQLCursorWrapper look-alike over sqlite3 (%s and ? placeholders)"""
+
+    def __init__(self, cursor):
+        self.cursor = cursor
+
+    def execute(self, query, params=None):
+        return self.cursor.execute(query.replace('%s', '?'), params or ())
+
+    def executemany(self, query, params_list):
+        return self.cursor.executemany(query.replace('%s', '?'), params_list)
+
+    def fetchone(self):
+        return self.cursor.fetchone()
+
+    def fetchall(self):
+        return self.cursor.fetchall()
+
+    @property
+    def lastrowid(self):
+        return self.cursor.lastrowid
+
+    @property
+    def rowcount(self):
+        return self.cursor.rowcount
+
+
+class SQLiteStandIn:
+    """DatabaseConnection look-alike over a throw-away SQLite file"""
+
+    def __init__(self, path):
+        self.connection = sqlite3.connect(path, timeout=30)
+        self.connection.row_factory = lambda cur, row: {col[0]: row[i] for i, col in enumerate(cur.description)}
+
+    def cursor(self):
+        return SQLiteCursor(self.connection.cursor())
+
+    def commit(self):
+        self.connection.commit()
+
+    def rollback(self):
+        self.connection.rollback()
+
+    def close(self):
+        self.connection.close()
+
+
+def create_sqlite_db(path, genre_names):
+    conn = sqlite3.connect(path)
+    conn.executescript(SQLITE_SCHEMA)
+    conn.executemany('INSERT INTO genres (name, slug) VALUES (?, ?)',
+                     [(name, f'g{i}') for i, name in enumerate(genre_names)])
+    conn.commit()
+    conn.close()
+
+
+def prepare_mysql_db():
+    """Create the schema (app.init_db) and drop earlier benchmark rows"""
+    import app
+    from db_manager import DatabaseConnection
+    with contextlib.redirect_stdout(io.StringIO()):
+        app.init_db()
+    conn = DatabaseConnection()
+    cursor = conn.cursor()
+    cursor.execute('DELETE FROM movies WHERE slug LIKE ?', (f'%{SLUG_MARK}%',))
+    conn.commit()
+    conn.close()
+    return DatabaseConnection
+
+
+class CountingCursor:
+    def __init__(self, cursor, counts):
+        self._cursor = cursor
+        self._counts = counts
+
+    def execute(self, query, params=None):
+        self._counts['queries'] += 1
+        return self._cursor.execute(query, params)
+
+    def executemany(self, query, params_list):
+        self._counts['queries'] += 1
+        return self._cursor.executemany(query, params_list)
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+
+def counting_factory(connect, counts):
+    """Wrap a connection factory so every query / commit / connect is counted"""
+    class CountingConnection:
+        def __init__(self):
+            counts['connections'] += 1
+            self._conn = connect()
+
+        def cursor(self):
+            return CountingCursor(self._conn.cursor(), counts)
+
+        def commit(self):
+            counts['commits'] += 1
+            self._conn.commit()
+
+        def rollback(self):
+            self._conn.rollback()
+
+        def close(self):
+            self._conn.close()
+    return CountingConnection
+
+
+# ---------------------------------------------------------------------------
+# Passes
+# ---------------------------------------------------------------------------
+
+def forced_pass(importer, pages):
+    """Every movie through import_movie(force_update=True)"""
+    for page in range(1, pages + 1):
+        for movie in importer.get_movie_list(page=page) or []:
+            importer.import_movie(movie, force_update=True)
+
+
+def run_pass(name, func, importer, state, counts, movies, measure_memory, verbose):
+    for key in counts:
+        counts[key] = 0
+    http_before = dict(importer.http.stats)
+    server_before = dict(state.counts)
+    if measure_memory:
+        tracemalloc.start()
+    started = time.perf_counter()
+    with contextlib.redirect_stdout(sys.stdout if verbose else io.StringIO()):
+        func()
+    elapsed = time.perf_counter() - started
+    peak = tracemalloc.get_traced_memory()[1] if measure_memory else None
+    if measure_memory:
+        tracemalloc.stop()
+
+    round_trips = counts['queries'] + counts['commits']
+    http = {key: importer.http.stats[key] - http_before[key] for key in http_before}
+    server = {key: state.counts[key] - server_before[key] for key in server_before}
+    print(f"\n📊 {name}: {movies} movies in {elapsed:.2f}s → {movies / elapsed:.1f} movies/s")
+    print(f"   🗄️  {round_trips / movies:.1f} DB round trips/movie "
+          f"({counts['queries']} queries, {counts['commits']} commits, {counts['connections']} connections)")
+    print(f"   🌐 {http['requests']} requests ({server['detail']} full details, {server['not_modified']} x 304, "
+          f"{server['errors']} injected errors, {http['retries']} retries, {http['failures']} failures) "
+          f"| HTTP {http['seconds'] / elapsed * 100:.0f}% of wall time")
+    if peak is not None:
+        print(f"   🧠 peak Python memory: {peak / 1024 / 1024:.1f} MB")
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description='OPhim importer benchmark (local stand-in server)')
+    parser.add_argument('--pages', type=int, default=5, help='List pages to import')
+    parser.add_argument('--per-page', type=int, default=24, help='Movies per list page (OPhim uses 24)')
+    parser.add_argument('--latency-ms', type=float, default=20.0, help='Base stand-in response latency')
+    parser.add_argument('--jitter-ms', type=float, default=10.0, help='Extra random latency (uniform)')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Share of requests answered with 503')
+    parser.add_argument('--db', choices=['sqlite', 'mysql'], default='sqlite',
+                        help='sqlite: throw-away stand-in file; mysql: MYSQL_DATABASE from config/.env (disposable!)')
+    parser.add_argument('--no-memory', action='store_true', help='Skip tracemalloc (it slows Python down)')
+    parser.add_argument('--keep-delays', action='store_true', help='Keep the importer rate-limit sleeps')
+    parser.add_argument('--verbose', action='store_true', help='Show importer output')
+    parser.add_argument('--seed', type=int, default=3)
+    args = parser.parse_args()
+
+    movies = args.pages * args.per_page
+    details, items = build_catalog(movies)
+    state = StandInState(details, items, args.per_page, args.latency_ms, args.jitter_ms, args.error_rate, args.seed)
+    server = ThreadingHTTPServer(('127.0.0.1', 0), make_handler(state))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    workdir = tempfile.mkdtemp(prefix='ophim_bench_')
+    ophim_import_v3.OPHIM_API_BASE = f'http://127.0.0.1:{server.server_port}'
+    ophim_import_v3.HTTP_CACHE_DIR = os.path.join(workdir, 'http_cache')
+    if not args.keep_delays:
+        ophim_import_v3.REQUEST_DELAY = 0
+        ophim_import_v3.PAGE_DELAY = 0
+
+    importer = OphimImporter()
+    importer.http.backoff_base = 0.05
+    if args.db == 'sqlite':
+        db_path = os.path.join(workdir, 'bench.sqlite3')
+        create_sqlite_db(db_path, sorted(set(importer.genre_mapping.values())))
+        connect = lambda: SQLiteStandIn(db_path)  # noqa: E731
+        importer.changes_table_ready = True  # created above in SQLite syntax
+    else:
+        connect = prepare_mysql_db()
+    counts = {'queries': 0, 'commits': 0, 'connections': 0}
+    ophim_import_v3.DatabaseConnection = counting_factory(connect, counts)
+
+    print("=" * 70)
+    print("🚚 OPHIM IMPORTER BENCHMARK")
+    print(f"   {movies} movies ({args.pages} pages x {args.per_page}) | DB: {args.db} | "
+          f"latency {args.latency_ms:.0f}±{args.jitter_ms:.0f} ms | errors {args.error_rate * 100:.0f}%")
+    print("=" * 70)
+
+    passes = [
+        ('cold', lambda: importer.import_batch(num_pages=args.pages)),
+        ('rerun', lambda: importer.import_batch(num_pages=args.pages)),
+        ('forced', lambda: forced_pass(importer, args.pages)),
+    ]
+    for name, func in passes:
+        run_pass(name, func, importer, state, counts, movies, not args.no_memory, args.verbose)
+
+    server.shutdown()
+    shutil.rmtree(workdir, ignore_errors=True)
+    print(f"\n   (tracemalloc {'off' if args.no_memory else 'on'})")
+    print("\n" + "=" * 70)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Query Normalization Check & Benchmark
+1. Property check: the translation-table remove_diacritics must return
+   exactly what the NFD reference returns - for every code point up to
+   U+2FFF and for random strings over the full Vietnamese alphabet
+   (precomposed and decomposed, upper and lower case) mixed with ASCII,
+   other Latin letters, other scripts and stray combining marks
+2. Timing: reference vs fast path, and the memoized query forms under a
+   replayed autocomplete keystroke stream, with cache hit rates
+
+Usage:
+    python benchmark_normalization.py
+    python benchmark_normalization.py --cases 200000 --seed 3
+"""
+import argparse
+import os
+import random
+import sys
+import time
+import unicodedata
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+import search_helper  # noqa: E402
+from search_helper import SmartSearchHelper  # noqa: E402
+from benchmark_fuzzy_search import SAMPLE_TITLES  # noqa: E402
+
+VN_BASES = 'aăâeêioôơuưy'
+VN_TONES = ['', '́', '̀', '̉', '̃', '̣']
+VN_CONSONANTS = 'bcdđghklmnpqrstvx'
+
+
+def vietnamese_alphabet():
+    """Every Vietnamese letter, lower and upper case, precomposed (NFC)"""
+    letters = set(VN_CONSONANTS)
+    for base in VN_BASES:
+        for tone in VN_TONES:
+            letters.add(unicodedata.normalize('NFC', base + tone))
+    letters |= {letter.upper() for letter in letters}
+    return sorted(letters)
+
+
+def random_text(rng, alphabet):
+    """A random string mostly made of Vietnamese letters, with noise"""
+    pieces = []
+    for _ in range(rng.randint(0, 24)):
+        roll = rng.random()
+        if roll < 0.60:
+            pieces.append(rng.choice(alphabet))
+        elif roll < 0.70:
+            # Decomposed letter (NFD input from some clients / copy-paste)
+            pieces.append(unicodedata.normalize('NFD', rng.choice(alphabet)))
+        elif roll < 0.82:
+            pieces.append(rng.choice(' -:.,!?0123456789'))
+        elif roll < 0.88:
+            pieces.append(chr(rng.randint(0x00C0, 0x024F)))  # other Latin letters
+        elif roll < 0.93:
+            pieces.append(rng.choice(VN_TONES[1:] + ['̂', '̆', '̛']))  # stray marks
+        else:
+            pieces.append(rng.choice(['ß', 'ø', 'Æ', 'ı', '電', '影', 'ф', 'λ', '한', '🎬', ' ', '™']))
+    return ''.join(pieces)
+
+
+def property_check(cases, seed):
+    """Return the number of inputs where fast path and reference differ"""
+    reference = search_helper._remove_diacritics_nfd
+    fast = SmartSearchHelper.remove_diacritics
+    failures = []
+
+    for code in range(1, 0x3000):
+        char = chr(code)
+        if fast(char) != reference(char):
+            failures.append(char)
+
+    rng = random.Random(seed)
+    alphabet = vietnamese_alphabet()
+    for _ in range(cases):
+        text = random_text(rng, alphabet)
+        expected = reference(text) if text else ''
+        if fast(text) != expected:
+            failures.append(text)
+
+    return len(alphabet), failures
+
+
+def keystroke_stream(rng, count):
+    """Autocomplete traffic: growing prefixes of popular titles, repeated"""
+    titles = [title for pair in SAMPLE_TITLES for title in pair]
+    weights = [1.0 / (rank + 1) for rank in range(len(titles))]  # Zipf-like popularity
+    stream = []
+    while len(stream) < count:
+        title = rng.choices(titles, weights)[0].lower()
+        for end in range(2, len(title) + 1):
+            stream.append(title[:end])
+    return stream[:count]
+
+
+def time_calls(func, inputs):
+    started = time.perf_counter()
+    for value in inputs:
+        func(value)
+    return (time.perf_counter() - started) * 1e6 / max(len(inputs), 1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Query normalization check and benchmark')
+    parser.add_argument('--cases', type=int, default=100000, help='Random strings for the property check')
+    parser.add_argument('--keystrokes', type=int, default=50000, help='Autocomplete queries replayed')
+    parser.add_argument('--seed', type=int, default=11)
+    args = parser.parse_args()
+
+    print("=" * 70)
+    print("🔤 QUERY NORMALIZATION CHECK & BENCHMARK")
+    print("=" * 70)
+
+    alphabet_size, failures = property_check(args.cases, args.seed)
+    print(f"\n🧪 Property check: {alphabet_size} Vietnamese letters, all code points < U+3000, "
+          f"{args.cases} random strings")
+    if failures:
+        print(f"   ❌ {len(failures)} mismatches, e.g. {[f.encode('unicode_escape') for f in failures[:5]]}")
+    else:
+        print("   ✅ Fast path identical to the NFD reference")
+
+    rng = random.Random(args.seed)
+    titles = [title for pair in SAMPLE_TITLES for title in pair] * 200
+    print("\n⏱️  remove_diacritics on titles (µs per call)")
+    print(f"   NFD reference:     {time_calls(search_helper._remove_diacritics_nfd, titles):7.2f}")
+    print(f"   translation table: {time_calls(SmartSearchHelper.remove_diacritics, titles):7.2f}")
+
+    stream = keystroke_stream(rng, args.keystrokes)
+
+    def uncached_forms(query):
+        normalized = SmartSearchHelper.normalize_vietnamese(query)
+        words = normalized.split()
+        return normalized, words, [search_helper._remove_diacritics_nfd(w) for w in words]
+
+    SmartSearchHelper.query_forms.cache_clear()
+    SmartSearchHelper.fold_query_word.cache_clear()
+    print(f"\n⏱️  Query forms over {len(stream)} autocomplete keystrokes (µs per query)")
+    print(f"   uncached (NFD):    {time_calls(uncached_forms, stream):7.2f}")
+    print(f"   memoized LRU:      {time_calls(SmartSearchHelper.query_forms, stream):7.2f}")
+    for name, stats in SmartSearchHelper.cache_stats().items():
+        print(f"   {name:12s} hit rate {stats['hit_rate'] * 100:5.1f}%  "
+              f"({stats['hits']} hits, {stats['misses']} misses, {stats['size']}/{stats['maxsize']} entries)")
+
+    print("\n" + "=" * 70)
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Search Ranking Benchmark
+Times per-query candidate ranking with the per-row sort (sort_key for
+every row) against the batch SmartSearchHelper.rank_positions, and
+checks that both produce exactly the same order and boosts
+
+Usage:
+    python benchmark_search_ranking.py
+    python benchmark_search_ranking.py --sizes 200 2000 20000 --queries 50
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from search_helper import SmartSearchHelper  # noqa: E402
+from benchmark_fuzzy_search import synthetic_catalog, percentile  # noqa: E402
+
+
+def make_candidates(size, rng):
+    """Synthetic candidate rows with the columns ranking reads"""
+    rows = synthetic_catalog(size, rng)
+    for row in rows:
+        row['imdb_rating'] = rng.choice([None, 0, 5.4, 6.9, 7.0, 7.8, 8.6])
+        row['views'] = rng.choice([None, 0, rng.randint(0, 200000)])
+        row['release_year'] = rng.choice([None, rng.randint(1995, 2025)])
+        if rng.random() < 0.5:
+            row['title_search'] = SmartSearchHelper.to_search_form(row['title'])
+    return rows
+
+
+def make_queries(rows, count, rng):
+    """Title prefixes, inner words and accent-free variants"""
+    queries = []
+    for _ in range(count):
+        words = rng.choice(rows)['title'].split()
+        start = rng.randrange(len(words)) if rng.random() < 0.5 else 0
+        query = ' '.join(words[start:start + rng.randint(1, 3)])
+        if rng.random() < 0.3:
+            query = SmartSearchHelper.remove_diacritics(query)
+        queries.append(query)
+    return queries
+
+
+def per_row_rank(rows, query):
+    """Reference: the previous per-row loop + tuple sort"""
+    query_words = SmartSearchHelper.normalize_vietnamese(query).split()
+    keys = [SmartSearchHelper.sort_key(row, query_words) for row in rows]
+    order = sorted(range(len(rows)), key=keys.__getitem__, reverse=True)
+    return order, [key[4] for key in keys]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Search ranking benchmark')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[200, 2000, 20000], help='Candidate counts')
+    parser.add_argument('--queries', type=int, default=30, help='Queries per size')
+    parser.add_argument('--seed', type=int, default=7)
+    args = parser.parse_args()
+
+    print("=" * 70)
+    print("📈 SEARCH RANKING BENCHMARK (per-row sort vs batch rank)")
+    print("=" * 70)
+
+    rng = random.Random(args.seed)
+    for size in args.sizes:
+        rows = make_candidates(size, rng)
+        queries = make_queries(rows, args.queries, rng)
+        timings = {'per-row': [], 'batch': []}
+        mismatches = 0
+
+        for query in queries:
+            t0 = time.perf_counter()
+            expected = per_row_rank(rows, query)
+            timings['per-row'].append((time.perf_counter() - t0) * 1000.0)
+
+            t0 = time.perf_counter()
+            actual = SmartSearchHelper.rank_positions(rows, query)
+            timings['batch'].append((time.perf_counter() - t0) * 1000.0)
+
+            if list(actual[0]) != list(expected[0]) or list(actual[1]) != list(expected[1]):
+                mismatches += 1
+
+        print(f"\n📊 {size} candidates, {len(queries)} queries")
+        for name, values in timings.items():
+            print(f"   {name:8s} p50: {percentile(values, 50):9.3f} ms   p95: {percentile(values, 95):9.3f} ms")
+        speedup = percentile(timings['per-row'], 50) / max(percentile(timings['batch'], 50), 1e-9)
+        print(f"   speedup (p50): {speedup:.1f}x")
+        print(f"   {'✅ identical order and boosts' if not mismatches else f'❌ {mismatches} queries differ'}")
+
+    print("\n" + "=" * 70)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,298 @@
+#!/usr/bin/env python3
+"""
+Search Relevance Benchmark & Regression Check
+Runs a labelled query set against a fixture catalog (OPhim-like JSON
+snapshot) through the same stages as get_ranked_search_ids - boolean
+FULLTEXT on title, FULLTEXT on the accent-free search columns, the fuzzy
+title index, the title_search prefix LIKE, then rank_positions - and
+reports NDCG@k / MRR / recall@k with latency percentiles
+
+Fully offline: MySQL is replaced by an in-memory stand-in that emulates
+boolean-mode MATCH ... AGAINST (InnoDB min token size and stopwords,
+'+word' required terms, 'word*' prefixes, accent-insensitive collation)
+
+Usage:
+    python benchmark_search_relevance.py
+    python benchmark_search_relevance.py --save-baseline   # after an intended ranking change
+    python benchmark_search_relevance.py --check           # exit 1 on a quality regression
+    python benchmark_search_relevance.py --catalog snapshot.json --queries labels.json
+"""
+import argparse
+import json
+import math
+import os
+import re
+import sys
+import time
+from collections import defaultdict
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from fuzzy_index import FuzzyTitleIndex  # noqa: E402
+from search_helper import SmartSearchHelper  # noqa: E402
+from benchmark_fuzzy_search import percentile  # noqa: E402
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+DEFAULT_CATALOG = os.path.join(FIXTURES_DIR, 'search_catalog.json')
+DEFAULT_QUERIES = os.path.join(FIXTURES_DIR, 'search_queries.json')
+DEFAULT_BASELINE = os.path.join(FIXTURES_DIR, 'search_relevance_baseline.json')
+
+SEARCH_MAX_CANDIDATES = 500  # same cap as app.SEARCH_MAX_CANDIDATES
+
+# InnoDB FULLTEXT defaults (innodb_ft_min_token_size, default stopword list)
+FT_MIN_TOKEN_SIZE = 3
+FT_STOPWORDS = {
+    'a', 'about', 'an', 'are', 'as', 'at', 'be', 'by', 'com', 'de', 'en', 'for', 'from', 'how',
+    'i', 'in', 'is', 'it', 'la', 'of', 'on', 'or', 'that', 'the', 'this', 'to', 'was', 'what',
+    'when', 'where', 'who', 'will', 'with', 'und', 'www',
+}
+FT_TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+
+def load_catalog(path):
+    """OPhim items (or our own movie rows) -> movie rows as stored in MySQL"""
+    with open(path, 'r', encoding='utf-8') as fh:
+        data = json.load(fh)
+    if isinstance(data, dict):
+        data = data.get('items') or data.get('movies') or data.get('data', {}).get('items', [])
+
+    rows = []
+    for idx, item in enumerate(data, 1):
+        title = item.get('title') or item.get('name', '')
+        original_title = item.get('original_title') or item.get('origin_name', '')
+        rows.append({
+            'id': idx,
+            'slug': item.get('slug', str(idx)),
+            'title': title,
+            'original_title': original_title,
+            'title_search': SmartSearchHelper.to_search_form(title),
+            'original_title_search': SmartSearchHelper.to_search_form(original_title),
+            'imdb_rating': item.get('imdb_rating', (item.get('tmdb') or {}).get('vote_average', 0)),
+            'views': item.get('views', item.get('view', 0)),
+            'release_year': item.get('release_year', item.get('year', 0)),
+        })
+    return rows
+
+
+class InMemorySearchDB:
+    """Stand-in for the movies table and its FULLTEXT / prefix indexes"""
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.title_index = FuzzyTitleIndex.build(rows)
+        # Collation-folded token lists per FULLTEXT index
+        self._ft_title = [self._ft_tokens(row['title']) for row in rows]
+        self._ft_search = [self._ft_tokens(row['title_search']) + self._ft_tokens(row['original_title_search'])
+                           for row in rows]
+
+    @staticmethod
+    def _ft_tokens(text):
+        # utf8mb4_unicode_ci compares case- and accent-insensitively
+        return [token for token in FT_TOKEN_RE.findall(SmartSearchHelper.to_search_form(text))
+                if len(token) >= FT_MIN_TOKEN_SIZE and token not in FT_STOPWORDS]
+
+    @staticmethod
+    def _parse_boolean(search_query):
+        """'+word word*' -> [(term, required, prefix)], dropping unindexable terms"""
+        terms = []
+        for raw in search_query.split():
+            required = raw.startswith('+')
+            prefix = raw.endswith('*')
+            for term in FT_TOKEN_RE.findall(SmartSearchHelper.to_search_form(raw)):
+                if len(term) >= FT_MIN_TOKEN_SIZE and term not in FT_STOPWORDS:
+                    terms.append((term, required, prefix))
+        return terms
+
+    def match(self, search_query, use_search_columns=False):
+        """MATCH(...) AGAINST(? IN BOOLEAN MODE) ordered like the app's query"""
+        terms = self._parse_boolean(search_query)
+        if not terms:
+            return []
+        token_lists = self._ft_search if use_search_columns else self._ft_title
+        hits = []
+        for row, tokens in zip(self.rows, token_lists):
+            score = 0
+            missing_required = False
+            for term, required, prefix in terms:
+                found = sum(1 for token in tokens if (token.startswith(term) if prefix else token == term))
+                if required and not found:
+                    missing_required = True
+                    break
+                score += found
+            if not missing_required and score:
+                hits.append((score, row))
+        # ORDER BY relevance DESC, imdb_rating DESC, views DESC LIMIT 500
+        hits.sort(key=lambda hit: (hit[0], float(hit[1]['imdb_rating'] or 0), int(hit[1]['views'] or 0)),
+                  reverse=True)
+        return [row for _, row in hits[:SEARCH_MAX_CANDIDATES]]
+
+    def prefix(self, folded):
+        """title_search LIKE 'folded%' ORDER BY imdb_rating DESC, views DESC"""
+        hits = [row for row in self.rows if row['title_search'].startswith(folded)]
+        hits.sort(key=lambda row: (float(row['imdb_rating'] or 0), int(row['views'] or 0)), reverse=True)
+        return hits[:SEARCH_MAX_CANDIDATES]
+
+    def by_ids(self, ids):
+        wanted = set(ids)
+        return [row for row in self.rows if row['id'] in wanted]
+
+
+def ranked_ids(db, query):
+    """Mirror of get_ranked_search_ids over the in-memory stand-in"""
+    normalized = SmartSearchHelper.normalize_vietnamese(query)
+    search_query, search_mode = SmartSearchHelper.build_smart_search_query(query)
+    if not search_query or not search_mode:
+        return []
+    folded = SmartSearchHelper.to_search_form(normalized)
+
+    candidates = db.match(search_query)
+    if not candidates and folded:
+        folded_query, _ = SmartSearchHelper.build_smart_search_query(folded)
+        candidates = db.match(folded_query, use_search_columns=True)
+    if not candidates and normalized:
+        fuzzy_hits = db.title_index.search(query, limit=SEARCH_MAX_CANDIDATES)
+        if fuzzy_hits:
+            return [movie_id for movie_id, _ in fuzzy_hits]
+    if not candidates and folded:
+        candidates = db.prefix(folded)
+
+    order, _ = SmartSearchHelper.rank_positions(candidates, normalized)
+    return [candidates[pos]['id'] for pos in order]
+
+
+def ndcg_at(ranked_grades, ideal_grades, k):
+    """NDCG@k with exponential gain (2^rel - 1)"""
+    def dcg(grades):
+        return sum((2 ** grade - 1) / math.log2(rank + 2) for rank, grade in enumerate(grades[:k]))
+    ideal = dcg(sorted(ideal_grades, reverse=True))
+    return dcg(ranked_grades) / ideal if ideal else 0.0
+
+
+def evaluate(db, queries, k, repeat):
+    """Per-query metrics and latencies for the labelled query set"""
+    slug_by_id = {row['id']: row['slug'] for row in db.rows}
+    results = []
+    latencies = []
+    for entry in queries:
+        relevance = entry['relevance']
+        for _ in range(repeat):
+            started = time.perf_counter()
+            ids = ranked_ids(db, entry['q'])
+            latencies.append((time.perf_counter() - started) * 1000.0)
+
+        grades = [relevance.get(slug_by_id[movie_id], 0) for movie_id in ids]
+        first_hit = next((rank for rank, grade in enumerate(grades, 1) if grade > 0), None)
+        relevant_total = sum(1 for grade in relevance.values() if grade > 0)
+        results.append({
+            'q': entry['q'],
+            'kind': entry.get('kind', 'other'),
+            'ndcg': ndcg_at(grades, list(relevance.values()), k),
+            'rr': 1.0 / first_hit if first_hit else 0.0,
+            'recall': sum(1 for grade in grades[:k] if grade > 0) / relevant_total if relevant_total else 0.0,
+            'top': [slug_by_id[movie_id] for movie_id in ids[:3]],
+        })
+    return results, latencies
+
+
+def summarize(results):
+    count = max(len(results), 1)
+    return {
+        'ndcg': sum(r['ndcg'] for r in results) / count,
+        'mrr': sum(r['rr'] for r in results) / count,
+        'recall': sum(r['recall'] for r in results) / count,
+    }
+
+
+def check_baseline(path, summary, results, tolerance, query_tolerance):
+    """Compare against a saved baseline; returns a list of regressions"""
+    with open(path, 'r', encoding='utf-8') as fh:
+        baseline = json.load(fh)
+    regressions = []
+    for metric in ('ndcg', 'mrr'):
+        if summary[metric] < baseline['summary'][metric] - tolerance:
+            regressions.append(f"mean {metric}: {baseline['summary'][metric]:.4f} -> {summary[metric]:.4f}")
+    for result in results:
+        before = baseline['queries'].get(result['q'])
+        if before is not None and result['ndcg'] < before - query_tolerance:
+            regressions.append(f"'{result['q']}' ndcg: {before:.3f} -> {result['ndcg']:.3f} (top: {result['top']})")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Search relevance benchmark and regression check')
+    parser.add_argument('--catalog', default=DEFAULT_CATALOG, help='Catalog snapshot (OPhim items or movie rows)')
+    parser.add_argument('--queries', default=DEFAULT_QUERIES, help='Labelled query set')
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE, help='Baseline metrics file')
+    parser.add_argument('--k', type=int, default=10, help='Cut-off for NDCG and recall')
+    parser.add_argument('--repeat', type=int, default=20, help='Timed runs per query')
+    parser.add_argument('--save-baseline', action='store_true', help='Write current metrics as the baseline')
+    parser.add_argument('--check', action='store_true', help='Exit 1 if quality regressed vs the baseline')
+    parser.add_argument('--tolerance', type=float, default=0.005, help='Allowed drop of mean NDCG / MRR')
+    parser.add_argument('--query-tolerance', type=float, default=0.05, help='Allowed NDCG drop per query')
+    parser.add_argument('--verbose', action='store_true', help='Print every query')
+    args = parser.parse_args()
+
+    with open(args.queries, 'r', encoding='utf-8') as fh:
+        queries = json.load(fh)['queries']
+    db = InMemorySearchDB(load_catalog(args.catalog))
+
+    print("=" * 70)
+    print("🎯 SEARCH RELEVANCE BENCHMARK")
+    print(f"   Catalog: {len(db.rows)} movies, queries: {len(queries)}, k={args.k}")
+    print("=" * 70)
+
+    results, latencies = evaluate(db, queries, args.k, args.repeat)
+    summary = summarize(results)
+
+    by_kind = defaultdict(list)
+    for result in results:
+        by_kind[result['kind']].append(result)
+
+    print(f"\n📊 Quality")
+    print(f"   NDCG@{args.k}:   {summary['ndcg']:.4f}")
+    print(f"   MRR:       {summary['mrr']:.4f}")
+    print(f"   recall@{args.k}: {summary['recall']:.4f}")
+    for kind, kind_results in sorted(by_kind.items()):
+        kind_summary = summarize(kind_results)
+        print(f"   - {kind:11s} ({len(kind_results):2d}): NDCG {kind_summary['ndcg']:.3f}  MRR {kind_summary['mrr']:.3f}")
+
+    print(f"\n⏱️  Latency per query ({args.repeat} runs each)")
+    print(f"   p50: {percentile(latencies, 50):.3f} ms   p95: {percentile(latencies, 95):.3f} ms   "
+          f"p99: {percentile(latencies, 99):.3f} ms")
+
+    weakest = sorted(results, key=lambda r: r['ndcg'])
+    shown = results if args.verbose else [r for r in weakest[:5] if r['ndcg'] < 1.0]
+    if shown:
+        print("\n🔎 " + ("All queries" if args.verbose else "Weakest queries"))
+        for result in shown:
+            print(f"   {result['ndcg']:.3f}  {result['q']!r:32s} -> {', '.join(result['top'])}")
+
+    if args.save_baseline:
+        with open(args.baseline, 'w', encoding='utf-8') as fh:
+            json.dump({
+                'k': args.k,
+                'summary': {metric: round(value, 6) for metric, value in summary.items()},
+                'queries': {r['q']: round(r['ndcg'], 6) for r in results},
+            }, fh, ensure_ascii=False, indent=1)
+        print(f"\n💾 Baseline saved to {args.baseline}")
+
+    exit_code = 0
+    if args.check:
+        if not os.path.exists(args.baseline):
+            print(f"\n❌ No baseline at {args.baseline} (run with --save-baseline first)")
+            exit_code = 1
+        else:
+            regressions = check_baseline(args.baseline, summary, results, args.tolerance, args.query_tolerance)
+            if regressions:
+                print(f"\n❌ {len(regressions)} relevance regression(s):")
+                for line in regressions:
+                    print(f"   - {line}")
+                exit_code = 1
+            else:
+                print("\n✅ No relevance regression against the baseline")
+
+    print("\n" + "=" * 70)
+    sys.exit(exit_code)
+
+
+if __name__ == '__main__':
+    main()
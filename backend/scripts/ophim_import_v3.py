@@ -5,9 +5,12 @@ Auto-import: Tự động import phim mới 2 lần mỗi ngày (12:00 và 00:00
 Smart Update: Chỉ import/update phim mới dựa trên thời gian cập nhật
 """
 import requests
+import hashlib
+import json
 import time
 import schedule
 import threading
+import multiprocessing
 from datetime import datetime
 import sys
 import os
@@ -15,18 +18,62 @@ import os
 # Add parent directory to path to import db_manager
 sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
 from db_manager import DatabaseConnection
+from search_helper import SmartSearchHelper
+from import_state import ImportStateStore
+from movie_changes import MOVIE_CHANGES_TABLE_SQL, record_movie_change
+from http_client import ResilientHTTPClient, HTTPFetchError
 
 # OPhim API Configuration
 OPHIM_BASE_URL = "https://ophim1.com"
-OPHIM_API_BASE = "https://ophim1.com"
+OPHIM_API_BASE = os.getenv('OPHIM_API_BASE', "https://ophim1.com")
+
+# Rate limiting between detail requests / list pages (seconds)
+REQUEST_DELAY = float(os.getenv('OPHIM_REQUEST_DELAY', '0.2'))
+PAGE_DELAY = float(os.getenv('OPHIM_PAGE_DELAY', '0.5'))
+
+# Flask app whose in-process cache is re-warmed after each import run
+APP_BASE_URL = os.getenv('APP_BASE_URL', 'http://localhost:5000')
+
+# import_state row holding the incremental sync checkpoint of the
+# "phim-moi-cap-nhat" list (newest modified first)
+SYNC_STATE_NAME = 'ophim:phim-moi-cap-nhat'
+
+# HTTP layer: one pooled connection per concurrent request, retries with
+# backoff, and a local cache of validators so unchanged detail pages cost
+# a 304 instead of a full JSON download
+HTTP_POOL_SIZE = int(os.getenv('OPHIM_HTTP_POOL_SIZE', '4'))
+HTTP_MAX_RETRIES = int(os.getenv('OPHIM_HTTP_MAX_RETRIES', '4'))
+HTTP_CACHE_DIR = os.getenv('OPHIM_HTTP_CACHE_DIR', os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), '..', 'config', 'http_cache'))
+HTTP_CACHE_MAX_DAYS = int(os.getenv('OPHIM_HTTP_CACHE_MAX_DAYS', '14'))
+HTTP_CACHE_MAX_MB = int(os.getenv('OPHIM_HTTP_CACHE_MAX_MB', '512'))
+
+
+def parse_modified_time(value):
+    """Parse OPhim modified.time (2025-10-21T12:57:09.000Z) into a naive datetime"""
+    if not value:
+        return None
+    try:
+        clean_time = value.replace('.000Z', '').replace('Z', '').replace('T', ' ')
+        return datetime.strptime(clean_time[:19], '%Y-%m-%d %H:%M:%S')
+    except (ValueError, TypeError):
+        return None
 
 class OphimImporter:
-    def __init__(self):
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
-            'Accept': 'application/json'
-        })
+    def __init__(self, pool_size=HTTP_POOL_SIZE):
+        self.http = ResilientHTTPClient(
+            pool_size=pool_size,
+            max_retries=HTTP_MAX_RETRIES,
+            cache_dir=HTTP_CACHE_DIR,
+            cache_max_age_days=HTTP_CACHE_MAX_DAYS,
+            cache_max_bytes=HTTP_CACHE_MAX_MB * 1024 * 1024,
+            headers={
+                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
+                'Accept': 'application/json'
+            },
+        )
+        # movie_changes is created on first write (the importer may run before the app)
+        self.changes_table_ready = False
         # Genre mapping: OPhim name -> DB name
         self.genre_mapping = {
             'Hành Động': 'Hành động',
@@ -51,7 +98,11 @@ class OphimImporter:
         }
         
     def get_movie_list(self, page=1, limit=20, genre=None, year=None):
-        """Lấy danh sách phim mới cập nhật"""
+        """Lấy danh sách phim mới cập nhật
+        
+        Returns the items ([] at the end of the list), or None when the
+        page could not be fetched after retries.
+        """
         try:
             if genre:
                 url = f"{OPHIM_API_BASE}/danh-sach/{genre}"
@@ -63,49 +114,65 @@ class OphimImporter:
                 params['year'] = year
             
             print(f"📡 Fetching movie list (page {page}, genre={genre}, year={year})...")
-            response = self.session.get(url, params=params, timeout=30)
-            
-            if response.status_code == 200:
-                data = response.json()
-                # NEW API structure: data.data.items
-                items = data.get('data', {}).get('items', [])
-                if not items:
-                    # Fallback to old structure
-                    items = data.get('items', [])
-                
-                print(f"✅ Found {len(items)} movies")
-                return items
-            else:
-                print(f"❌ HTTP Error: {response.status_code}")
-                return []
+            # The list changes constantly; a conditional request rarely pays off
+            data = self.http.get_json(url, params=params, conditional=False).data
+            
+            # NEW API structure: data.data.items
+            items = data.get('data', {}).get('items', [])
+            if not items:
+                # Fallback to old structure
+                items = data.get('items', [])
+            
+            print(f"✅ Found {len(items)} movies")
+            return items
                 
+        except HTTPFetchError as e:
+            print(f"❌ Error fetching movie list: {e}")
+            return None
         except Exception as e:
             print(f"❌ Error fetching movie list: {e}")
             import traceback
             traceback.print_exc()
-            return []
+            return None
+    
+    def get_total_pages(self):
+        """Number of pages of the phim-moi-cap-nhat list (None if unknown)"""
+        try:
+            url = f"{OPHIM_API_BASE}/danh-sach/phim-moi-cap-nhat"
+            data = self.http.get_json(url, params={'page': 1}, conditional=False).data
+            pagination = data.get('data', {}).get('params', {}).get('pagination') or data.get('pagination') or {}
+            if pagination.get('totalPages'):
+                return int(pagination['totalPages'])
+            total_items = int(pagination.get('totalItems') or 0)
+            per_page = int(pagination.get('totalItemsPerPage') or 0)
+            if total_items and per_page:
+                return -(-total_items // per_page)
+            return None
+        except Exception as e:
+            print(f"❌ Error fetching pagination: {e}")
+            return None
     
     def get_movie_detail(self, slug):
-        """Lấy chi tiết phim bao gồm episodes"""
+        """Lấy chi tiết phim bao gồm episodes
+        
+        Conditional GET: if OPhim answers 304 the cached JSON is reused.
+        """
         try:
             url = f"{OPHIM_API_BASE}/phim/{slug}"
             
             print(f"  📡 Fetching detail for: {slug}")
-            response = self.session.get(url, timeout=30)
+            result = self.http.get_json(url)
+            data = result.data
+            if result.not_modified:
+                print("  ♻️ Not modified (304), using cached detail")
             
-            if response.status_code == 200:
-                data = response.json()
-                
-                # API có thể trả về status là 'success' hoặc True
-                status = data.get('status')
-                if status == 'success' or status:
-                    # Return full data including episodes
-                    return data
-                else:
-                    print(f"  ⚠️ API returned status: {status}")
-                    return None
+            # API có thể trả về status là 'success' hoặc True
+            status = data.get('status')
+            if status == 'success' or status:
+                # Return full data including episodes
+                return data
             else:
-                print(f"  ❌ HTTP Error: {response.status_code}")
+                print(f"  ⚠️ API returned status: {status}")
                 return None
                 
         except Exception as e:
@@ -129,7 +196,7 @@ class OphimImporter:
                 print(f"  📅 Modified: {modified_time}")
             
             # Check if movie exists
-            cursor.execute('SELECT id, updated_at FROM movies WHERE title = ? OR slug = ?', (title, slug))
+            cursor.execute('SELECT id, updated_at, content_hash FROM movies WHERE title = ? OR slug = ?', (title, slug))
             existing = cursor.fetchone()
             
             if existing and not force_update:
@@ -171,7 +238,7 @@ class OphimImporter:
             if not api_data:
                 print("  ❌ Could not fetch full details")
                 conn.close()
-                return None
+                return {'movie_id': existing['id'] if existing else None, 'action': 'failed'}
             
             # Extract movie and episodes from API response
             # NEW API structure: data.item contains the movie data
@@ -285,6 +352,22 @@ class OphimImporter:
             # Premium status (random for demo)
             is_premium = 0 
             
+            # Accent-free search columns (title itself is never changed on update)
+            title_search = SmartSearchHelper.to_search_form(title)
+            original_title_search = SmartSearchHelper.to_search_form(original_title)
+            
+            # Same content as what we stored last time: skip every write so
+            # updated_at (and anything cached on it) only moves on real changes
+            content_hash = self.compute_content_hash(
+                (title, original_title, content, year, duration, country, director, cast, genres,
+                 imdb_rating, poster_url, thumb_url, trailer_url, video_url, content_type, is_premium),
+                category_list, episodes_data
+            )
+            if existing and existing.get('content_hash') == content_hash:
+                print(f"  ✅ Content unchanged (hash {content_hash[:12]}), no write")
+                conn.close()
+                return {'movie_id': existing['id'], 'action': 'unchanged'}
+            
             # Check if this is an update or new insert
             if existing:
                 # UPDATE existing movie
@@ -306,13 +389,15 @@ class OphimImporter:
                             original_title = ?, description = ?, release_year = ?, duration = ?,
                             country = ?, language = ?, director = ?, cast = ?, genres = ?, imdb_rating = ?,
                             poster_url = ?, backdrop_url = ?, trailer_url = ?, video_url = ?,
-                            type = ?, is_premium = ?, status = ?, updated_at = ?
+                            type = ?, is_premium = ?, status = ?, original_title_search = ?, content_hash = ?,
+                            updated_at = ?
                         WHERE id = ?
                     ''', (
                         original_title, content, year, duration,
                         country, 'Vietsub', director, cast, genres, imdb_rating,
                         poster_url, thumb_url, trailer_url, video_url,
-                        content_type, is_premium, 'active', updated_at_value, existing['id']
+                        content_type, is_premium, 'active', original_title_search, content_hash,
+                        updated_at_value, existing['id']
                     ))
                 else:
                     cursor.execute('''
@@ -320,13 +405,14 @@ class OphimImporter:
                             original_title = ?, description = ?, release_year = ?, duration = ?,
                             country = ?, language = ?, director = ?, cast = ?, genres = ?, imdb_rating = ?,
                             poster_url = ?, backdrop_url = ?, trailer_url = ?, video_url = ?,
-                            type = ?, is_premium = ?, status = ?, updated_at = CURRENT_TIMESTAMP
+                            type = ?, is_premium = ?, status = ?, original_title_search = ?, content_hash = ?,
+                            updated_at = CURRENT_TIMESTAMP
                         WHERE id = ?
                     ''', (
                         original_title, content, year, duration,
                         country, 'Vietsub', director, cast, genres, imdb_rating,
                         poster_url, thumb_url, trailer_url, video_url,
-                        content_type, is_premium, 'active', existing['id']
+                        content_type, is_premium, 'active', original_title_search, content_hash, existing['id']
                     ))
                 movie_id = existing['id']
                 action = 'updated'
@@ -351,13 +437,15 @@ class OphimImporter:
                             title, original_title, slug, description, release_year, duration,
                             country, language, director, cast, genres, imdb_rating,
                             poster_url, backdrop_url, trailer_url, video_url, 
-                            type, is_premium, status, created_at, updated_at
-                        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                            type, is_premium, status, created_at, updated_at,
+                            title_search, original_title_search, content_hash
+                        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
                     ''', (
                         title, original_title, slug, content, year, duration,
                         country, 'Vietsub', director, cast, genres, imdb_rating,
                         poster_url, thumb_url, trailer_url, video_url,
-                        content_type, is_premium, 'active', timestamp_value, timestamp_value
+                        content_type, is_premium, 'active', timestamp_value, timestamp_value,
+                        title_search, original_title_search, content_hash
                     ))
                 else:
                     cursor.execute('''
@@ -365,13 +453,13 @@ class OphimImporter:
                             title, original_title, slug, description, release_year, duration,
                             country, language, director, cast, genres, imdb_rating,
                             poster_url, backdrop_url, trailer_url, video_url, 
-                            type, is_premium, status
-                        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                            type, is_premium, status, title_search, original_title_search, content_hash
+                        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
                     ''', (
                         title, original_title, slug, content, year, duration,
                         country, 'Vietsub', director, cast, genres, imdb_rating,
                         poster_url, thumb_url, trailer_url, video_url,
-                        content_type, is_premium, 'active'
+                        content_type, is_premium, 'active', title_search, original_title_search, content_hash
                     ))
                 
                 movie_id = cursor.lastrowid
@@ -417,9 +505,14 @@ class OphimImporter:
                 else:
                     print(f"  📺 Processing episodes for series (type: {content_type})")
             
+            new_episodes = 0
             if content_type == 'series' and episodes_data:
                 episode_count = 0
-                new_episodes = 0
+                new_rows = []
+                
+                # Existing episodes in one query instead of one SELECT per episode
+                cursor.execute('SELECT episode_name, server_name FROM episodes WHERE movie_id = %s', (movie_id,))
+                existing_episodes = {(row['episode_name'], row['server_name']) for row in cursor.fetchall()}
                 
                 for server_group in episodes_data:
                     server_name = server_group.get('server_name', 'Server 1')
@@ -448,32 +541,34 @@ class OphimImporter:
                         if episode_url:
                             episode_count += 1
                             
-                            # Check if episode already exists (by name and server)
-                            cursor.execute('''
-                                SELECT id FROM episodes 
-                                WHERE movie_id = %s AND episode_name = %s AND server_name = %s
-                            ''', (movie_id, ep_name, server_name))
-                            
-                            existing_episode = cursor.fetchone()
-                            
-                            if not existing_episode:
-                                # Insert new episode only
-                                cursor.execute('''
-                                    INSERT INTO episodes (
-                                        movie_id, episode_number, episode_name, video_url, server_name
-                                    ) VALUES (%s, %s, %s, %s, %s)
-                                ''', (movie_id, episode_count, ep_name, episode_url, server_name))
-                                new_episodes += 1
+                            # Insert new episodes only (by name and server)
+                            if (ep_name, server_name) not in existing_episodes:
+                                existing_episodes.add((ep_name, server_name))
+                                new_rows.append((movie_id, episode_count, ep_name, episode_url, server_name))
+                
+                if new_rows:
+                    cursor.executemany('''
+                        INSERT INTO episodes (
+                            movie_id, episode_number, episode_name, video_url, server_name
+                        ) VALUES (%s, %s, %s, %s, %s)
+                    ''', new_rows)
+                new_episodes = len(new_rows)
                 
                 if new_episodes > 0:
                     print(f"  ✅ Added {new_episodes} new episodes (Total: {episode_count} episodes)")
                 elif episode_count > 0:
                     print(f"  ℹ️ All {episode_count} episodes already exist")
             
+            # Tell the web app which movie to evict from its caches
+            if not self.changes_table_ready:
+                cursor.execute(MOVIE_CHANGES_TABLE_SQL)
+                self.changes_table_ready = True
+            record_movie_change(cursor, movie_id, action)
+            
             conn.commit()
             conn.close()
             
-            return {'movie_id': movie_id, 'action': action}
+            return {'movie_id': movie_id, 'action': action, 'episodes': new_episodes}
             
         except Exception as e:
             print(f"  ❌ Error importing movie: {e}")
@@ -481,6 +576,159 @@ class OphimImporter:
             traceback.print_exc()
             return None
 
+    @staticmethod
+    def compute_content_hash(fields, category_list, episodes_data):
+        """Stable SHA-256 of the values we store for a movie
+        
+        Covers the movie columns, the genre names and every episode link,
+        so any change OPhim makes to what we import changes the hash,
+        while a bare modified.time bump does not.
+        """
+        payload = {
+            'fields': [str(value).strip() if value is not None else None for value in fields],
+            'genres': sorted(cat.get('name', '') for cat in category_list or []),
+            'episodes': [
+                [group.get('server_name', ''),
+                 [[ep.get('name', ''), ep.get('link_m3u8', ''), ep.get('link_embed', '')]
+                  for ep in group.get('server_data', [])]]
+                for group in episodes_data or []
+            ],
+        }
+        encoded = json.dumps(payload, ensure_ascii=False, sort_keys=True, separators=(',', ':'))
+        return hashlib.sha256(encoded.encode('utf-8')).hexdigest()
+    
+    def load_updated_map(self, slugs):
+        """{slug: updated_at} of the movies we already have, in one query"""
+        if not slugs:
+            return {}
+        conn = DatabaseConnection()
+        try:
+            cursor = conn.cursor()
+            placeholders = ','.join(['?'] * len(slugs))
+            cursor.execute(f'SELECT slug, updated_at FROM movies WHERE slug IN ({placeholders})', tuple(slugs))
+            updated = {}
+            for row in cursor.fetchall():
+                db_time = row['updated_at']
+                if isinstance(db_time, str):
+                    db_time = datetime.strptime(db_time, '%Y-%m-%d %H:%M:%S')
+                updated[row['slug']] = db_time
+            return updated
+        finally:
+            conn.close()
+    
+    def import_incremental(self, max_pages=10, state_name=SYNC_STATE_NAME):
+        """Import only what changed since the saved sync checkpoint
+        
+        Walks the newest-first list until it crosses the checkpoint
+        (modified time older than the last one applied). Up-to-date entries
+        are skipped in memory against a per-page {slug: updated_at} map, so
+        they cost neither a DB connection nor a detail request. Without a
+        checkpoint (first run) it stops after SKIP_THRESHOLD up-to-date
+        movies in a row, like import_batch.
+        
+        Returns a report dict with the exact delta applied.
+        """
+        SKIP_THRESHOLD = 3
+        store = ImportStateStore(DatabaseConnection)
+        checkpoint = store.load(state_name)
+        since = checkpoint['last_modified'] if checkpoint else None
+        
+        print("=" * 70)
+        print("🔄 OPHIM INCREMENTAL SYNC")
+        print(f"   Checkpoint: {since or 'none (first run)'}"
+              f"{' / ' + checkpoint['last_slug'] if checkpoint and checkpoint['last_slug'] else ''}")
+        print("=" * 70)
+        
+        started = time.time()
+        report = {
+            'pages': 0, 'inserted': [], 'updated': [], 'unchanged': 0, 'failed': [],
+            'checkpoint_before': since, 'checkpoint_after': since,
+        }
+        processed = []  # (modified, slug, ok) in list order (newest first)
+        consecutive_unchanged = 0
+        crossed = False
+        
+        for page in range(1, max_pages + 1):
+            movies = self.get_movie_list(page=page)
+            report['pages'] = page
+            if movies is None:
+                print(f"⚠️ Could not fetch page {page}; stopping without crossing the checkpoint")
+                break
+            if not movies:
+                crossed = True  # End of the list
+                break
+            
+            known = self.load_updated_map([m.get('slug') for m in movies if m.get('slug')])
+            for movie in movies:
+                slug = movie.get('slug', '')
+                modified = parse_modified_time(movie.get('modified', {}).get('time', ''))
+                
+                if since and modified and modified < since:
+                    crossed = True
+                    break
+                
+                db_time = known.get(slug)
+                if modified and db_time and db_time >= modified:
+                    report['unchanged'] += 1
+                    consecutive_unchanged += 1
+                    processed.append((modified, slug, True))
+                    if not since and consecutive_unchanged >= SKIP_THRESHOLD:
+                        crossed = True
+                        break
+                    continue
+                
+                consecutive_unchanged = 0
+                if modified:
+                    result = self.import_movie(movie, force_update=True)
+                else:
+                    # No usable modified time: let import_movie compare itself
+                    result = self.import_movie(movie, check_update_time=True)
+                action = result.get('action') if isinstance(result, dict) else None
+                if action == 'inserted':
+                    report['inserted'].append(slug)
+                elif action == 'updated':
+                    report['updated'].append(slug)
+                elif action in ('skipped', 'unchanged'):
+                    report['unchanged'] += 1
+                else:
+                    report['failed'].append(slug)
+                processed.append((modified, slug, action not in (None, 'failed')))
+                time.sleep(REQUEST_DELAY)  # Rate limiting (only after real detail requests)
+            
+            if crossed:
+                break
+        
+        # Advance the checkpoint to the newest entry below which everything
+        # succeeded, so a failed movie is retried on the next run. If the page
+        # limit stopped us before reaching the old checkpoint, keep it: the
+        # entries in between have not been looked at yet.
+        new_mark = None
+        if since and not crossed:
+            print(f"⚠️ Page limit ({max_pages}) reached before the checkpoint; keeping it")
+            processed = []
+        for modified, slug, ok in reversed(processed):
+            if not ok:
+                break
+            if modified and (since is None or modified >= since):
+                new_mark = (modified, slug)
+        if new_mark:
+            report['checkpoint_after'] = new_mark[0]
+        report['duration_s'] = round(time.time() - started, 1)
+        if new_mark:
+            store.save(state_name, new_mark[0], new_mark[1], report)
+        
+        print("\n" + "=" * 70)
+        print("📊 Sync Delta:")
+        print(f"   ✅ New movies: {len(report['inserted'])} {report['inserted'][:10]}")
+        print(f"   🔄 Updated: {len(report['updated'])} {report['updated'][:10]}")
+        print(f"   ⏩ Unchanged: {report['unchanged']}")
+        print(f"   ❌ Failed: {len(report['failed'])} {report['failed'][:10]}")
+        print(f"   📄 Pages: {report['pages']}, {'crossed checkpoint' if crossed else 'page limit reached'}")
+        print(f"   📌 Checkpoint: {report['checkpoint_before']} -> {report['checkpoint_after']}")
+        print("=" * 70)
+        
+        return report
+    
     def import_batch(self, num_pages=5, genre=None, year=None, check_update_time=False):
         """Import nhiều trang phim với smart update
         
@@ -499,6 +747,7 @@ class OphimImporter:
         total_imported = 0
         total_updated = 0
         total_skipped = 0
+        total_failed = 0
         consecutive_skipped = 0
         SKIP_THRESHOLD = 3  # Dừng khi 3 phim liên tiếp đã up-to-date
         
@@ -508,6 +757,9 @@ class OphimImporter:
             
             movies = self.get_movie_list(page=page, genre=genre, year=year)
             
+            if movies is None:
+                print(f"⚠️ Could not fetch page {page}, stopping...")
+                break
             if not movies:
                 print(f"⚠️ No movies found on page {page}, stopping...")
                 break
@@ -526,13 +778,15 @@ class OphimImporter:
                     elif action == 'updated':
                         total_updated += 1
                         consecutive_skipped = 0
-                    elif action == 'skipped':
+                    elif action in ('skipped', 'unchanged'):
                         total_skipped += 1
                         consecutive_skipped += 1
+                    else:
+                        # Fetch failure: not evidence that older movies are up-to-date
+                        total_failed += 1
                 else:
                     # Null result = error
-                    total_skipped += 1
-                    consecutive_skipped += 1
+                    total_failed += 1
                 
                 # Early stop logic - chỉ khi check_update_time = True
                 if check_update_time and consecutive_skipped >= SKIP_THRESHOLD:
@@ -541,14 +795,14 @@ class OphimImporter:
                     break
                 
                 # Rate limiting - giảm xuống để import nhanh hơn
-                time.sleep(0.2)
+                time.sleep(REQUEST_DELAY)
             
             # Break outer loop if early stop triggered
             if check_update_time and consecutive_skipped >= SKIP_THRESHOLD:
                 break
             
             print(f"\n✅ Page {page} completed")
-            time.sleep(0.5)
+            time.sleep(PAGE_DELAY)
         
         # Summary
         print("\n" + "=" * 70)
@@ -556,11 +810,144 @@ class OphimImporter:
         print(f"   ✅ New movies: {total_imported}")
         print(f"   🔄 Updated: {total_updated}")
         print(f"   ⏩ Skipped: {total_skipped}")
+        print(f"   ❌ Failed: {total_failed}")
+        print(f"   🌐 HTTP: {self.http.stats}")
         print("=" * 70)
         
         return total_imported + total_updated
 
 
+# Per-process state of the backfill workers (set by _backfill_worker_init)
+_backfill_importer = None
+_backfill_store = None
+_backfill_run = None
+
+
+def _backfill_worker_init(run_name, pool_size):
+    global _backfill_importer, _backfill_store, _backfill_run
+    _backfill_importer = OphimImporter(pool_size=pool_size)
+    _backfill_store = ImportStateStore(DatabaseConnection)
+    _backfill_run = run_name
+
+
+def _backfill_page(job):
+    """Import one list page in a worker process; returns the page stats
+    
+    Slugs already imported by an interrupted earlier attempt are skipped;
+    progress is saved after every movie so a crash loses at most one.
+    """
+    page, done_slugs = job
+    importer, store = _backfill_importer, _backfill_store
+    started = time.time()
+    http_before = importer.http.stats['seconds']
+    stats = {'page': page, 'movies': 0, 'inserted': 0, 'updated': 0, 'unchanged': 0,
+             'failed': 0, 'resumed': 0, 'episodes': 0, 'http_s': 0.0, 'db_s': 0.0, 'error': None}
+    
+    movies = importer.get_movie_list(page=page)
+    if movies is None:
+        stats['error'] = 'list fetch failed'
+    else:
+        for movie in movies:
+            slug = movie.get('slug', '')
+            if slug in done_slugs:
+                stats['resumed'] += 1
+                continue
+            result = importer.import_movie(movie, force_update=True)
+            action = result.get('action') if isinstance(result, dict) else None
+            stats['movies'] += 1
+            if action in ('inserted', 'updated'):
+                stats[action] += 1
+                stats['episodes'] += result.get('episodes', 0)
+            elif action in ('skipped', 'unchanged'):
+                stats['unchanged'] += 1
+            else:
+                stats['failed'] += 1
+                continue
+            done_slugs.add(slug)
+            store.save_backfill_page(_backfill_run, page, done_slugs)
+    
+    elapsed = time.time() - started
+    stats['http_s'] = importer.http.stats['seconds'] - http_before
+    stats['db_s'] = max(elapsed - stats['http_s'], 0.0)
+    completed = movies is not None and stats['failed'] == 0
+    store.save_backfill_page(_backfill_run, page, done_slugs, completed=completed, stats=stats)
+    return stats
+
+
+def run_backfill(max_pages=None, workers=4, run_name='full', reset=False):
+    """Re-import the whole upstream catalog with pages sharded across processes
+    
+    Each worker process has its own importer (HTTP pool + DB connections)
+    and pulls the next unfinished page, so slow pages do not hold up the
+    others. Completed pages and slugs are checkpointed in
+    import_backfill_pages; running the same run_name again resumes.
+    Movies are imported with force_update, so unchanged ones cost a
+    (usually 304) detail request and a hash compare, not a write.
+    
+    The list is ordered by modification time and can shift while the
+    backfill runs; the incremental sync picks up anything that moved.
+    
+    Returns the aggregated stats dict.
+    """
+    store = ImportStateStore(DatabaseConnection)
+    if reset:
+        store.reset_backfill(run_name)
+    
+    total_pages = OphimImporter(pool_size=1).get_total_pages()
+    if max_pages:
+        total_pages = min(total_pages, max_pages) if total_pages else max_pages
+    if not total_pages:
+        print("❌ Could not determine the number of pages, pass --pages")
+        return None
+    
+    progress = store.load_backfill(run_name)
+    jobs = [(page, progress.get(page, {}).get('slugs', set()))
+            for page in range(1, total_pages + 1)
+            if not progress.get(page, {}).get('completed')]
+    
+    print("=" * 70)
+    print("🚚 OPHIM FULL-CATALOG BACKFILL")
+    print(f"   Run: {run_name} | Pages: {total_pages} | Remaining: {len(jobs)} | Workers: {workers}")
+    print("=" * 70)
+    
+    totals = {'pages': 0, 'movies': 0, 'inserted': 0, 'updated': 0, 'unchanged': 0,
+              'failed': 0, 'resumed': 0, 'episodes': 0, 'http_s': 0.0, 'db_s': 0.0, 'failed_pages': []}
+    started = time.time()
+    # A worker imports one movie at a time: one pooled connection is enough
+    with multiprocessing.Pool(workers, initializer=_backfill_worker_init,
+                              initargs=(run_name, 1)) as pool:
+        for stats in pool.imap_unordered(_backfill_page, jobs):
+            totals['pages'] += 1
+            for key in ('movies', 'inserted', 'updated', 'unchanged', 'failed', 'resumed',
+                        'episodes', 'http_s', 'db_s'):
+                totals[key] += stats[key]
+            if stats['error'] or stats['failed']:
+                totals['failed_pages'].append(stats['page'])
+            elapsed = max(time.time() - started, 1e-6)
+            print(f"📄 [{totals['pages']}/{len(jobs)}] page {stats['page']}: "
+                  f"{stats['movies']} movies, {stats['failed']} failed"
+                  f"{' (' + stats['error'] + ')' if stats['error'] else ''} | "
+                  f"{totals['movies'] / elapsed:.1f} movies/s")
+    
+    elapsed = max(time.time() - started, 1e-6)
+    busy = max(totals['http_s'] + totals['db_s'], 1e-6)
+    totals['duration_s'] = round(elapsed, 1)
+    
+    print("\n" + "=" * 70)
+    print("📊 Backfill Summary:")
+    print(f"   ✅ New movies: {totals['inserted']}")
+    print(f"   🔄 Updated: {totals['updated']}")
+    print(f"   ⏩ Unchanged: {totals['unchanged']} (+{totals['resumed']} done before restart)")
+    print(f"   ❌ Failed: {totals['failed']} (pages to retry: {sorted(totals['failed_pages'])[:20]})")
+    print(f"   ⏱️  {elapsed:.1f}s | {totals['movies'] / elapsed:.1f} movies/s | "
+          f"{totals['episodes'] / elapsed:.1f} episodes/s")
+    print(f"   🌐 HTTP {totals['http_s']:.1f}s ({totals['http_s'] / busy * 100:.0f}%) | "
+          f"🗄️ DB {totals['db_s']:.1f}s ({totals['db_s'] / busy * 100:.0f}%) across workers")
+    print("=" * 70)
+    
+    return totals
+
+
 class AutoImporter:
     """Tự động import phim theo lịch"""
     
@@ -595,17 +982,34 @@ class AutoImporter:
             print(f"🔄 Continuous Import at {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
             print("=" * 70)
             
-            # Import 1 page (20 phim mới nhất) với smart update
-            # Chỉ update phim có thời gian modified mới hơn DB
-            total = self.importer.import_batch(num_pages=1, year=None, check_update_time=True)
+            # Chỉ import phần thay đổi kể từ checkpoint lần trước
+            report = self.importer.import_incremental()
+            total = len(report['inserted']) + len(report['updated'])
+            
+            print(f"✅ Continuous Import Done: {total} movies imported/updated")
             
-            print(f"✅ Continuous Import Done: {total} movies checked")
+            # Re-warm hot cache keys only when something actually changed
+            if total > 0:
+                self.warm_app_cache('import')
             
         except Exception as e:
             print(f"❌ Continuous import error: {e}")
             import traceback
             traceback.print_exc()
     
+    def warm_app_cache(self, reason='import'):
+        """Ask the Flask app to re-warm its hot cache keys"""
+        try:
+            response = requests.post(f"{APP_BASE_URL}/api/cache/warm", json={'reason': reason}, timeout=120)
+            data = response.json()
+            report = data.get('data') or {}
+            if response.status_code == 200 and data.get('success'):
+                print(f"🔥 Cache warmed: {report.get('warmed', 0)} keys in {report.get('duration_ms', 0)} ms")
+            else:
+                print(f"⚠️ Cache warm-up failed: {data.get('error', response.status_code)}")
+        except Exception as e:
+            print(f"⚠️ Could not reach app for cache warm-up: {e}")
+    
     def start_scheduler(self, continuous=False, interval_minutes=10):
         """Bắt đầu scheduler (chạy trong background thread)
         
@@ -659,12 +1063,16 @@ def main():
     parser.add_argument('--slug', type=str, help='Import phim theo slug')
     parser.add_argument('--genre', type=str, help='Import theo thể loại (genre)')
     parser.add_argument('--year', type=int, help='Chỉ import phim mới theo năm')
-    parser.add_argument('--pages', type=int, default=3, help='Số trang import')
+    parser.add_argument('--pages', type=int, default=None, help='Số trang import (mặc định 3; với --backfill: toàn bộ)')
     parser.add_argument('--auto', action='store_true', help='Bật chế độ tự động import hằng ngày lúc 12:00 và 00:00')
     parser.add_argument('--continuous', action='store_true', help='Chế độ liên tục - import mỗi X phút (real-time)')
     parser.add_argument('--interval', type=int, default=10, help='Khoảng thời gian giữa các lần import (phút) - dùng với --continuous')
     parser.add_argument('--run-now', action='store_true', help='Chạy auto-import ngay lập tức')
     parser.add_argument('--check-update', action='store_true', help='Chỉ import phim mới/cập nhật (so sánh thời gian)')
+    parser.add_argument('--backfill', action='store_true', help='Import lại toàn bộ catalog song song, có resume (--pages giới hạn số trang)')
+    parser.add_argument('--workers', type=int, default=4, help='Số process dùng với --backfill')
+    parser.add_argument('--run-name', type=str, default='full', help='Tên checkpoint của --backfill')
+    parser.add_argument('--reset', action='store_true', help='Bỏ checkpoint cũ, chạy --backfill từ đầu')
     args = parser.parse_args()
     
     print("\n" + "=" * 70)
@@ -673,6 +1081,11 @@ def main():
         print("🔄 Smart Update Mode: Only new/updated movies")
     print("=" * 70)
     
+    # Parallel full-catalog backfill
+    if args.backfill:
+        run_backfill(max_pages=args.pages, workers=args.workers, run_name=args.run_name, reset=args.reset)
+        return
+    
     # Auto import mode
     if args.auto or args.continuous or args.run_now:
         auto_importer = AutoImporter()
@@ -712,7 +1125,7 @@ def main():
         else:
             print(f"❌ Không tìm thấy phim với slug: {args.slug}")
     else:
-        importer.import_batch(num_pages=args.pages, genre=args.genre, year=args.year, check_update_time=args.check_update)
+        importer.import_batch(num_pages=args.pages or 3, genre=args.genre, year=args.year, check_update_time=args.check_update)
     
     print("\n✅ All done!")
 
@@ -88,6 +88,11 @@ def create_fulltext_indexes():
                 'name': 'ft_search_all',
                 'columns': ['title', 'original_title', 'description'],
                 'sql': 'CREATE FULLTEXT INDEX ft_search_all ON movies(title, original_title, description)'
+            },
+            {
+                'name': 'ft_title_search',
+                'columns': ['title_search', 'original_title_search'],
+                'sql': 'CREATE FULLTEXT INDEX ft_title_search ON movies(title_search, original_title_search)'
             }
         ]
         
@@ -0,0 +1,373 @@
+"""
+Smart Search Helper - Vietnamese Movie Search Optimization
+Query building, accent folding and relevance ranking shared by the
+Flask app, the importer and the search benchmarks
+"""
+import re
+import unicodedata
+from collections import namedtuple
+from functools import lru_cache
+
+try:
+    import numpy as np
+except ImportError:
+    np = None  # rank() falls back to the per-row sort
+
+# Bounded LRU sizes for query-side normalization (autocomplete sends the
+# same prefixes over and over; titles are not cached, they are stored folded)
+QUERY_CACHE_SIZE = 4096
+QUERY_WORD_CACHE_SIZE = 8192
+
+
+def _remove_diacritics_nfd(text):
+    """Reference implementation: NFD, drop combining marks, đ -> d"""
+    nfd = unicodedata.normalize('NFD', text)
+    without_accents = ''.join(char for char in nfd if unicodedata.category(char) != 'Mn')
+    return without_accents.replace('đ', 'd').replace('Đ', 'D')
+
+
+def _build_fold_table():
+    """Per-character fast path, derived from the reference implementation
+
+    Covers every precomposed Latin letter (Vietnamese included) whose
+    folded form is plain ASCII. Only strings made entirely of ASCII and
+    these letters take the fast path, where folding per character is
+    exactly what NFD + mark removal does to the whole string.
+    """
+    table = {}
+    for code in list(range(0x00C0, 0x0250)) + list(range(0x1E00, 0x1F00)):
+        char = chr(code)
+        folded = _remove_diacritics_nfd(char)
+        if folded != char and folded.isascii():
+            table[code] = folded
+    return table
+
+
+_FOLD_TABLE = _build_fold_table()
+
+QueryForms = namedtuple('QueryForms', ['normalized', 'words', 'words_na', 'folded'])
+
+
+class SmartSearchHelper:
+    """Helper class for intelligent movie search"""
+    
+    @staticmethod
+    def normalize_vietnamese(text):
+        """Normalize Vietnamese text: lowercase + trim spaces"""
+        if not text:
+            return ''
+        text = text.lower().strip()
+        return re.sub(r'\s+', ' ', text)
+    
+    @staticmethod
+    def remove_diacritics(text):
+        """Remove Vietnamese diacritics for fuzzy matching"""
+        if not text:
+            return ''
+        if text.isascii():
+            return text
+        folded = text.translate(_FOLD_TABLE)
+        if folded.isascii():
+            return folded
+        # Decomposed input, other scripts, symbols: full NFD path
+        return _remove_diacritics_nfd(text)
+    
+    @staticmethod
+    @lru_cache(maxsize=QUERY_WORD_CACHE_SIZE)
+    def fold_query_word(word):
+        """remove_diacritics for query words, memoized (same words on every row)"""
+        return SmartSearchHelper.remove_diacritics(word)
+    
+    @staticmethod
+    @lru_cache(maxsize=QUERY_CACHE_SIZE)
+    def query_forms(query):
+        """Normalized query, its words, accent-free words and search form (memoized)"""
+        normalized = SmartSearchHelper.normalize_vietnamese(query)
+        words = tuple(normalized.split())
+        return QueryForms(
+            normalized=normalized,
+            words=words,
+            words_na=tuple(SmartSearchHelper.fold_query_word(word) for word in words),
+            folded=SmartSearchHelper.to_search_form(normalized)
+        )
+    
+    @staticmethod
+    def cache_stats():
+        """Hit/miss counters of the query normalization caches"""
+        stats = {}
+        for name, cached in (('query_forms', SmartSearchHelper.query_forms),
+                             ('query_words', SmartSearchHelper.fold_query_word)):
+            info = cached.cache_info()
+            lookups = info.hits + info.misses
+            stats[name] = {
+                'hits': info.hits,
+                'misses': info.misses,
+                'size': info.currsize,
+                'maxsize': info.maxsize,
+                'hit_rate': round(info.hits / lookups, 4) if lookups else 0.0,
+            }
+        return stats
+    
+    @staticmethod
+    def to_search_form(text):
+        """Stored search form of a title: trimmed, lowercase, accent-free (đ -> d)
+
+        Written to movies.title_search / original_title_search whenever a
+        movie is saved, so ranking never re-normalizes titles per row.
+        """
+        if not text:
+            return ''
+        return SmartSearchHelper.remove_diacritics(text.strip().lower())
+    
+    @staticmethod
+    def build_smart_search_query(user_query):
+        """Build optimized MySQL FULLTEXT search query with wildcards"""
+        if not user_query or not user_query.strip():
+            return None, None
+        
+        normalized = SmartSearchHelper.normalize_vietnamese(user_query)
+        has_operators = any(op in user_query for op in ['*', '+', '-', '"', '(', ')'])
+        
+        if has_operators:
+            return user_query, 'IN BOOLEAN MODE'
+        
+        words = normalized.split()
+        if not words:
+            return user_query, 'IN BOOLEAN MODE'
+        
+        fuzzy_terms = []
+        for word in words:
+            word_len = len(word)
+            if word_len <= 2:
+                fuzzy_terms.append(f'+{word}')  # Short: exact match
+            elif word_len <= 5:
+                fuzzy_terms.append(f'{word}*')  # Medium: suffix wildcard
+            else:
+                fuzzy_terms.append(f'{word}*')  # Long: flexible
+        
+        return ' '.join(fuzzy_terms), 'IN BOOLEAN MODE'
+    
+    @staticmethod
+    def calculate_relevance_boost(movie, query_words):
+        """Calculate custom relevance score boost for better ranking"""
+        if not movie or not query_words:
+            return 0.0
+        
+        score = 0.0
+        title_vn = movie.get('title', '').strip().lower()
+        title_en = movie.get('original_title', '').strip().lower()
+        # Precomputed search column when the row carries it
+        title_vn_no_accent = movie.get('title_search') or SmartSearchHelper.remove_diacritics(title_vn)
+        
+        query_str = ' '.join(query_words).lower()
+        query_str_no_accent = SmartSearchHelper.fold_query_word(query_str)
+        
+        # Priority 1: Title STARTS with full query (+1000)
+        if (title_vn.startswith(query_str) or 
+            title_vn_no_accent.startswith(query_str_no_accent) or
+            title_en.startswith(query_str)):
+            score += 1000.0
+        # Priority 2: Title STARTS with first word (+500)
+        elif query_words:
+            first_word = query_words[0].lower()
+            first_word_no_accent = SmartSearchHelper.fold_query_word(first_word)
+            if (title_vn.startswith(first_word) or 
+                title_vn_no_accent.startswith(first_word_no_accent) or
+                title_en.startswith(first_word)):
+                score += 500.0
+            # Priority 3: Title STARTS with other word (+300)
+            else:
+                for word in query_words[1:]:
+                    word_norm = word.lower()
+                    word_no_accent = SmartSearchHelper.fold_query_word(word)
+                    if (title_vn.startswith(word_norm) or 
+                        title_vn_no_accent.startswith(word_no_accent) or
+                        title_en.startswith(word_norm)):
+                        score += 300.0
+                        break
+        
+        # Exact match (+200)
+        if (query_str == title_vn or query_str_no_accent == title_vn_no_accent or query_str == title_en):
+            score += 200.0
+        
+        # All words present
+        words_in_title = sum(1 for word in query_words 
+                           if (word.lower() in title_vn or 
+                               SmartSearchHelper.fold_query_word(word).lower() in title_vn_no_accent or 
+                               word.lower() in title_en))
+        score += 100.0 if words_in_title == len(query_words) else words_in_title * 30.0
+        
+        # Position bonus
+        for word in query_words:
+            positions = [p for p in [
+                title_vn.find(word.lower()),
+                title_vn_no_accent.find(SmartSearchHelper.fold_query_word(word).lower()),
+                title_en.find(word.lower())
+            ] if p >= 0]
+            if positions:
+                pos = min(positions)
+                score += 50.0 if pos == 0 else (30.0 if pos <= 5 else (15.0 if pos <= 10 else 0))
+        
+        # Rating boost
+        rating = float(movie.get('imdb_rating', 0) or 0)
+        if rating >= 7.0:
+            score += rating * 5.0
+        
+        # Views boost
+        views = int(movie.get('views', 0) or 0)
+        score += min(views / 1000.0, 50.0)
+        
+        # Recent release boost
+        year = int(movie.get('release_year', 0) or 0)
+        if year >= 2020:
+            score += (year - 2019) * 3.0
+        
+        return score
+    
+    @staticmethod
+    def highlight_keywords(text, keywords):
+        """Highlight keywords in text with <mark> tags"""
+        if not text or not keywords:
+            return text
+        result = text
+        for keyword in keywords:
+            if len(keyword) >= 2:
+                pattern = re.compile(re.escape(keyword), re.IGNORECASE)
+                result = pattern.sub(lambda m: f'<mark>{m.group()}</mark>', result)
+        return result
+
+    @staticmethod
+    def compute_prefix_flags(movie, query_words):
+        """Compute strict prefix priority flags for sorting.
+        Priority order: full query prefix > first word prefix > any other word prefix.
+        Case- and accent-insensitive, supports Vietnamese.
+        Returns tuple: (full_prefix:int, first_prefix:int, other_prefix:int, matched_count:int)
+        """
+        try:
+            title_vn = (movie.get('title') or '').strip()
+            title_en = (movie.get('original_title') or '').strip()
+        except AttributeError:
+            title_vn = str(movie.get('title', '')).strip()
+            title_en = str(movie.get('original_title', '')).strip()
+
+        t_vn_l = title_vn.lower()
+        t_vn_na = movie.get('title_search') or SmartSearchHelper.remove_diacritics(t_vn_l)
+        t_en_l = title_en.lower()
+
+        q_words = [w.lower() for w in (query_words or []) if w]
+        q_words_na = [SmartSearchHelper.fold_query_word(w) for w in q_words]
+
+        full_q = ' '.join(q_words)
+        full_q_na = ' '.join(q_words_na)
+
+        full_prefix = 1 if (t_vn_l.startswith(full_q) or t_vn_na.startswith(full_q_na) or t_en_l.startswith(full_q)) and full_q else 0
+
+        first_prefix = 0
+        other_prefix = 0
+        if not full_prefix and q_words:
+            fw = q_words[0]
+            fw_na = q_words_na[0]
+            if t_vn_l.startswith(fw) or t_vn_na.startswith(fw_na) or t_en_l.startswith(fw):
+                first_prefix = 1
+            else:
+                for w, wna in zip(q_words[1:], q_words_na[1:]):
+                    if t_vn_l.startswith(w) or t_vn_na.startswith(wna) or t_en_l.startswith(w):
+                        other_prefix = 1
+                        break
+
+        # Count how many query words appear anywhere (diacritics-insensitive)
+        matched_count = 0
+        for w, wna in zip(q_words, q_words_na):
+            if (w in t_vn_l) or (wna in t_vn_na) or (w in t_en_l):
+                matched_count += 1
+
+        return (full_prefix, first_prefix, other_prefix, matched_count)
+
+    @staticmethod
+    def sort_key(movie, query_words):
+        """Per-row ranking key: prefix flags, match count, boost, rating, views"""
+        f_full, f_first, f_other, match_cnt = SmartSearchHelper.compute_prefix_flags(movie, query_words)
+        boost = SmartSearchHelper.calculate_relevance_boost(movie, query_words)
+        return (f_full, f_first, f_other, match_cnt, boost,
+                float(movie.get('imdb_rating', 0) or 0), int(movie.get('views', 0) or 0))
+
+    @staticmethod
+    def rank_positions(movies, query):
+        """Rank candidate rows for a query in one batch
+
+        Returns (order, boosts): row positions best first and each row's
+        relevance boost (indexed by original position). The order is
+        identical to sorting by sort_key(..., reverse=True): the same
+        flags, the same float additions in the same order, and a stable
+        lexsort so ties keep their input order.
+        """
+        forms = SmartSearchHelper.query_forms(query)
+        query_words = list(forms.words)
+        if np is None or not movies or not query_words:
+            keys = [SmartSearchHelper.sort_key(movie, query_words) for movie in movies]
+            order = sorted(range(len(movies)), key=keys.__getitem__, reverse=True)
+            return order, [key[4] for key in keys]
+
+        # Columnar titles (the accent-free form is stored in title_search)
+        t_vn = [(movie.get('title') or '').strip().lower() for movie in movies]
+        t_na = np.array([movie.get('title_search') or SmartSearchHelper.remove_diacritics(title)
+                         for movie, title in zip(movies, t_vn)], dtype=str)
+        t_vn = np.array(t_vn, dtype=str)
+        t_en = np.array([(movie.get('original_title') or '').strip().lower() for movie in movies], dtype=str)
+
+        # Query forms are normalized once per query, not once per row
+        words_na = list(forms.words_na)
+        full_q, full_q_na = ' '.join(query_words), ' '.join(words_na)
+
+        def starts(word, word_na):
+            return (np.char.startswith(t_vn, word) | np.char.startswith(t_na, word_na)
+                    | np.char.startswith(t_en, word))
+
+        full = starts(full_q, full_q_na)
+        first = ~full & starts(query_words[0], words_na[0])
+        other = np.zeros(len(movies), dtype=bool)
+        for word, word_na in zip(query_words[1:], words_na[1:]):
+            other |= starts(word, word_na)
+        other &= ~full & ~first
+
+        matched = np.zeros(len(movies), dtype=np.int64)
+        position_bonus = []
+        for word, word_na in zip(query_words, words_na):
+            pos_vn = np.char.find(t_vn, word)
+            pos_na = np.char.find(t_na, word_na)
+            pos_en = np.char.find(t_en, word)
+            matched += (pos_vn >= 0) | (pos_na >= 0) | (pos_en >= 0)
+            # min over the non-negative positions (-1 = not found)
+            big = np.iinfo(np.int64).max
+            pos = np.minimum(np.minimum(np.where(pos_vn >= 0, pos_vn, big), np.where(pos_na >= 0, pos_na, big)),
+                             np.where(pos_en >= 0, pos_en, big))
+            position_bonus.append(np.select([pos == 0, pos <= 5, pos <= 10], [50.0, 30.0, 15.0], 0.0))
+
+        rating = np.array([float(movie.get('imdb_rating', 0) or 0) for movie in movies], dtype=np.float64)
+        views = np.array([int(movie.get('views', 0) or 0) for movie in movies], dtype=np.int64)
+        year = np.array([int(movie.get('release_year', 0) or 0) for movie in movies], dtype=np.int64)
+
+        # Same additions, in the same order, as calculate_relevance_boost
+        boost = np.where(full, 1000.0, np.where(first, 500.0, np.where(other, 300.0, 0.0)))
+        exact = (t_vn == full_q) | (t_na == full_q_na) | (t_en == full_q)
+        boost = boost + np.where(exact, 200.0, 0.0)
+        boost = boost + np.where(matched == len(query_words), 100.0, matched * 30.0)
+        for bonus in position_bonus:
+            boost = boost + bonus
+        boost = boost + np.where(rating >= 7.0, rating * 5.0, 0.0)
+        boost = boost + np.minimum(views / 1000.0, 50.0)
+        boost = boost + np.where(year >= 2020, (year - 2019) * 3.0, 0.0)
+
+        # lexsort: last key is primary; negated keys + stable sort = reverse sort
+        order = np.lexsort((-views, -rating, -boost, -matched,
+                            -other.astype(np.int8), -first.astype(np.int8), -full.astype(np.int8)))
+        return order.tolist(), boost.tolist()
+
+    @staticmethod
+    def rank(movies, query):
+        """Movie ids of the candidate rows, best first (see rank_positions)"""
+        order, _ = SmartSearchHelper.rank_positions(movies, query)
+        return [movies[pos]['id'] for pos in order]
+
+# Create singleton instance
+smart_search = SmartSearchHelper()
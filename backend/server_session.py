@@ -0,0 +1,314 @@
+"""
+Server Session - Flask sessions kept on the server
+The cookie only carries a signed random session id; the data lives in a
+shared store (the MySQL database by default, or process memory), so every
+worker sees the same sessions and logout / rotation take effect everywhere.
+Also provides a secret key that stays the same across workers and restarts.
+"""
+
+import json
+import os
+import secrets
+import threading
+import time
+from datetime import datetime
+
+from flask.sessions import SessionInterface, SessionMixin
+from itsdangerous import BadSignature, Signer
+
+USER_SESSIONS_TABLE_SQL = '''
+    CREATE TABLE IF NOT EXISTS user_sessions (
+        session_id CHAR(43) PRIMARY KEY,
+        user_id INT NULL,
+        data TEXT NOT NULL,
+        expires_at DATETIME NOT NULL,
+        INDEX idx_user_sessions_expires (expires_at),
+        INDEX idx_user_sessions_user (user_id)
+    )
+'''
+
+
+def load_secret_key(path):
+    """SECRET_KEY from the environment, else a key generated once into path
+
+    Every worker on the host reads the same file, so signed cookies stay
+    valid across workers and restarts. Set SECRET_KEY when workers run on
+    several hosts.
+    """
+    key = os.getenv('SECRET_KEY')
+    if key:
+        return key
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            key = f.read().strip()
+        if key:
+            return key
+    except FileNotFoundError:
+        pass
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    key = secrets.token_hex(32)
+    try:
+        # O_EXCL: when workers start together only one key is written
+        fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(key)
+        print(f"🔑 Generated secret key: {path} (set SECRET_KEY to override)")
+        return key
+    except FileExistsError:
+        with open(path, 'r', encoding='utf-8') as f:
+            return f.read().strip()
+
+
+class MemorySessionStore:
+    """Sessions in this process only (development / single worker)"""
+
+    def __init__(self):
+        self._sessions = {}  # sid -> (data, expires_at, user_id)
+        self._lock = threading.Lock()
+
+    def load(self, sid):
+        """(data, expires_at) or None"""
+        with self._lock:
+            entry = self._sessions.get(sid)
+            if entry and entry[1] > datetime.now():
+                return dict(entry[0]), entry[1]
+            self._sessions.pop(sid, None)
+            return None
+
+    def save(self, sid, data, expires_at, user_id=None):
+        with self._lock:
+            self._sessions[sid] = (dict(data), expires_at, user_id)
+
+    def delete(self, sid):
+        with self._lock:
+            self._sessions.pop(sid, None)
+
+    def delete_user(self, user_id, keep_sid=None):
+        """End every session of a user (e.g. after a password change)"""
+        with self._lock:
+            for sid in [sid for sid, entry in self._sessions.items()
+                        if entry[2] == user_id and sid != keep_sid]:
+                del self._sessions[sid]
+
+    def prune(self):
+        now = datetime.now()
+        with self._lock:
+            for sid in [sid for sid, entry in self._sessions.items() if entry[1] <= now]:
+                del self._sessions[sid]
+
+
+class DatabaseSessionStore:
+    """Sessions in the user_sessions table, shared by all workers
+
+    Reads are a primary-key lookup; expired rows are deleted in small
+    batches at most every ``prune_interval`` seconds.
+    """
+
+    def __init__(self, connect, prune_interval=600):
+        """
+        Args:
+            connect: Callable returning a DatabaseConnection
+            prune_interval: Seconds between deletes of expired rows
+        """
+        self.connect = connect
+        self.prune_interval = prune_interval
+        self._last_prune = 0.0
+
+    def load(self, sid):
+        conn = self.connect()
+        try:
+            cursor = conn.cursor()
+            cursor.execute('SELECT data, expires_at FROM user_sessions WHERE session_id = ? AND expires_at > ?',
+                           (sid, datetime.now()))
+            row = cursor.fetchone()
+        finally:
+            conn.close()
+        if not row:
+            return None
+        return json.loads(row['data']), row['expires_at']
+
+    def save(self, sid, data, expires_at, user_id=None):
+        conn = self.connect()
+        try:
+            cursor = conn.cursor()
+            cursor.execute('''
+                INSERT INTO user_sessions (session_id, user_id, data, expires_at)
+                VALUES (?, ?, ?, ?)
+                ON DUPLICATE KEY UPDATE
+                    user_id = VALUES(user_id), data = VALUES(data), expires_at = VALUES(expires_at)
+            ''', (sid, user_id, json.dumps(data), expires_at))
+            conn.commit()
+        finally:
+            conn.close()
+        if time.time() - self._last_prune > self.prune_interval:
+            self._last_prune = time.time()
+            self.prune()
+
+    def delete(self, sid):
+        conn = self.connect()
+        try:
+            cursor = conn.cursor()
+            cursor.execute('DELETE FROM user_sessions WHERE session_id = ?', (sid,))
+            conn.commit()
+        finally:
+            conn.close()
+
+    def delete_user(self, user_id, keep_sid=None):
+        """End every session of a user (e.g. after a password change)"""
+        conn = self.connect()
+        try:
+            cursor = conn.cursor()
+            cursor.execute('DELETE FROM user_sessions WHERE user_id = ? AND session_id <> ?',
+                           (user_id, keep_sid or ''))
+            conn.commit()
+        finally:
+            conn.close()
+
+    def prune(self):
+        try:
+            conn = self.connect()
+            try:
+                cursor = conn.cursor()
+                cursor.execute('DELETE FROM user_sessions WHERE expires_at <= ? LIMIT 1000', (datetime.now(),))
+                conn.commit()
+            finally:
+                conn.close()
+        except Exception as e:
+            print(f"⚠️ [Session] Prune failed: {e}")
+
+
+class ServerSession(SessionMixin):
+    """Session whose data is read from the store on first access
+
+    Requests that never touch the session (static files) cost no store
+    read at all.
+    """
+
+    def __init__(self, sid=None, loader=None):
+        self.sid = sid
+        self._loader = loader
+        self._data = None if loader else {}
+        self.expires_at = None
+        self.modified = False
+        self.accessed = False
+        self.rotated = False
+        self.new = sid is None
+
+    def _load(self):
+        self.accessed = True
+        if self._data is None:
+            loaded = self._loader()
+            if loaded is None:
+                self._data = {}
+                self.new = True
+            else:
+                self._data, self.expires_at = loaded
+        return self._data
+
+    def __getitem__(self, key):
+        return self._load()[key]
+
+    def __setitem__(self, key, value):
+        self._load()[key] = value
+        self.modified = True
+
+    def __delitem__(self, key):
+        del self._load()[key]
+        self.modified = True
+
+    def __iter__(self):
+        return iter(self._load())
+
+    def __len__(self):
+        return len(self._load())
+
+    def __contains__(self, key):
+        return key in self._load()
+
+    def clear(self):
+        self._load().clear()
+        self.modified = True
+
+    def rotate(self):
+        """Issue a new session id at the next save (call on login)"""
+        self._load()
+        self.rotated = True
+        self.modified = True
+
+
+class ServerSessionInterface(SessionInterface):
+    """Flask session interface over a MemorySessionStore / DatabaseSessionStore"""
+
+    salt = 'server-session'
+
+    def __init__(self, store):
+        self.store = store
+
+    def _signer(self, app):
+        return Signer(app.secret_key, salt=self.salt)
+
+    def open_session(self, app, request):
+        cookie = request.cookies.get(self.get_cookie_name(app))
+        if cookie:
+            try:
+                sid = self._signer(app).unsign(cookie).decode('utf-8')
+                return ServerSession(sid, lambda: self.store.load(sid))
+            except BadSignature:
+                pass
+        return ServerSession()
+
+    def save_session(self, app, session, response):
+        name = self.get_cookie_name(app)
+        domain = self.get_cookie_domain(app)
+        path = self.get_cookie_path(app)
+
+        if session.accessed:
+            response.vary.add('Cookie')
+        if session._data is None:
+            return  # never read, nothing can have changed
+
+        if not session._data:
+            if session.sid and not session.new:
+                self.store.delete(session.sid)
+            if session.modified and session.sid:
+                response.delete_cookie(name, domain=domain, path=path,
+                                       secure=self.get_cookie_secure(app),
+                                       samesite=self.get_cookie_samesite(app),
+                                       httponly=self.get_cookie_httponly(app))
+            return
+
+        lifetime = app.permanent_session_lifetime
+        now = datetime.now()
+        # Sliding expiry without a write per request: renew past half-life
+        renew = session.expires_at is None or session.expires_at - now < lifetime / 2
+        if not (session.modified or renew):
+            return
+
+        new_cookie = session.new or session.rotated
+        if session.rotated and session.sid and not session.new:
+            self.store.delete(session.sid)
+        if new_cookie:
+            session.sid = secrets.token_urlsafe(32)
+        expires_at = now + lifetime
+        self.store.save(session.sid, session._data, expires_at, session._data.get('user_id'))
+
+        response.set_cookie(
+            name,
+            self._signer(app).sign(session.sid.encode('utf-8')).decode('utf-8'),
+            expires=self.get_expiration_time(app, session) if session.permanent else None,
+            httponly=self.get_cookie_httponly(app),
+            domain=domain,
+            path=path,
+            secure=self.get_cookie_secure(app),
+            samesite=self.get_cookie_samesite(app),
+        )
+
+
+def make_session_interface(kind, connect=None):
+    """'database' (default), 'memory' or 'cookie' (Flask's signed-cookie sessions)"""
+    if kind == 'cookie':
+        return None
+    if kind == 'memory':
+        return ServerSessionInterface(MemorySessionStore())
+    return ServerSessionInterface(DatabaseSessionStore(connect))
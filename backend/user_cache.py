@@ -0,0 +1,56 @@
+"""
+User Cache - Small TTL cache of user records keyed by id
+Sessions only hold the user id; name, role and subscription tier are read
+through this cache so auth checks are a dict lookup and profile or plan
+changes show up without logging in again
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+# Columns safe to expose (never the password hash)
+PUBLIC_USER_COLUMNS = 'id, name, email, role, subscription_tier, subscription_expires, created_at'
+
+
+class UserCache:
+    """LRU of user_id -> user dict (or None for a missing user), expiring after ``ttl`` seconds"""
+
+    def __init__(self, load, ttl=60, max_users=10000):
+        """
+        Args:
+            load: Callable(user_id) returning the user row or None
+            ttl: Seconds a record is served before it is read again
+            max_users: Records kept in memory (least recently used evicted)
+        """
+        self.load = load
+        self.ttl = ttl
+        self.max_users = max_users
+        self._entries = OrderedDict()  # user_id -> (loaded_at, user or None)
+        self._lock = threading.Lock()
+        self.stats = {'hits': 0, 'loads': 0}
+
+    def get(self, user_id):
+        """User dict or None"""
+        user_id = int(user_id)
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry and time.time() - entry[0] < self.ttl:
+                self._entries.move_to_end(user_id)
+                self.stats['hits'] += 1
+                return entry[1]
+
+        row = self.load(user_id)
+        user = dict(row) if row else None
+        with self._lock:
+            self._entries[user_id] = (time.time(), user)
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.max_users:
+                self._entries.popitem(last=False)
+            self.stats['loads'] += 1
+        return user
+
+    def invalidate(self, user_id):
+        """Drop a record after its row changed (profile, role, subscription)"""
+        with self._lock:
+            self._entries.pop(int(user_id), None)
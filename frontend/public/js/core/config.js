@@ -23,10 +23,17 @@ const AppConfig = {
             // Movie endpoints
             movies: '/api/movies',
             movieDetail: '/api/movies/:id',
+            movieAccess: '/api/movies/:id/access',
             
             // User endpoints
             favorites: '/api/favorites',
+            favoriteIds: '/api/favorites/ids',
+            favoritesContains: '/api/favorites/contains',
             watchHistory: '/api/watch-history',
+            watchHistoryBatch: '/api/watch-history/batch',
+            episodeProgress: '/api/episode-progress',
+            continueWatching: '/api/continue-watching',
+            entitlement: '/api/subscription/entitlement',
             
             // Other endpoints
             genres: '/api/genres',
@@ -455,30 +455,45 @@ function displayRelatedMovies(movies) {
     });
 }
 
-// Load reviews
-async function loadReviews(movieId) {
+// Load reviews (first page + rating summary; later pages via "load more")
+let reviewsCursor = null;
+let reviewsMovieId = null;
+
+async function loadReviews(movieId, cursor = null) {
     try {
-        const response = await fetch(`/api/reviews?movie_id=${movieId}`);
+        let url = `/api/reviews?movie_id=${movieId}&limit=20`;
+        if (cursor) {
+            url += `&cursor=${encodeURIComponent(cursor)}`;
+        }
+        const response = await fetch(url);
         const data = await response.json();
         
         if (data.success && data.data) {
-            displayReviews(data.data);
-            calculateRatingSummary(data.data);
+            reviewsCursor = data.next_cursor;
+            reviewsMovieId = movieId;
+            displayReviews(data.data, Boolean(cursor));
+            if (data.summary) {
+                displayRatingSummary(data.summary);
+            }
         }
     } catch (error) {
         console.error('Error loading reviews:', error);
     }
 }
 
-// Display reviews
-function displayReviews(reviews) {
+// Display reviews (append = next page)
+function displayReviews(reviews, append = false) {
     const reviewsList = document.getElementById('reviewsList');
-    const reviewCount = document.getElementById('reviewCount');
     
-    reviewCount.textContent = reviews.length;
-    reviewsList.innerHTML = '';
+    const oldButton = document.getElementById('loadMoreReviews');
+    if (oldButton) {
+        oldButton.remove();
+    }
+    if (!append) {
+        reviewsList.innerHTML = '';
+    }
 
-    if (reviews.length === 0) {
+    if (!append && reviews.length === 0) {
         reviewsList.innerHTML = '<p style="text-align: center; color: #888;">Chưa có đánh giá nào. Hãy là người đầu tiên!</p>';
         return;
     }
@@ -508,94 +523,132 @@ function displayReviews(reviews) {
         
         reviewsList.appendChild(reviewItem);
     });
-}
 
-// Calculate rating summary
-function calculateRatingSummary(reviews) {
-    if (reviews.length === 0) {
-        document.getElementById('avgRating').textContent = '0.0';
-        document.getElementById('ratingCount').textContent = '0 đánh giá';
-        return;
+    if (reviewsCursor) {
+        const loadMore = document.createElement('button');
+        loadMore.id = 'loadMoreReviews';
+        loadMore.className = 'btn btn-secondary';
+        loadMore.textContent = 'Xem thêm đánh giá';
+        loadMore.onclick = () => loadReviews(reviewsMovieId, reviewsCursor);
+        reviewsList.appendChild(loadMore);
     }
+}
 
-    // Calculate average
-    const total = reviews.reduce((sum, r) => sum + r.rating, 0);
-    const average = (total / reviews.length).toFixed(1);
+// Display rating summary (precomputed on the server)
+function displayRatingSummary(summary) {
+    const count = summary.count || 0;
+    const average = count > 0 ? Number(summary.average).toFixed(1) : '0.0';
+    document.getElementById('reviewCount').textContent = count;
     document.getElementById('avgRating').textContent = average;
-    document.getElementById('ratingCount').textContent = `${reviews.length} đánh giá`;
+    document.getElementById('ratingCount').textContent = `${count} đánh giá`;
 
     // Update stars display
     const avgStars = document.getElementById('avgStars');
     avgStars.innerHTML = '';
     for (let i = 1; i <= 5; i++) {
         const icon = document.createElement('i');
-        icon.className = i <= Math.round(average) ? 'fas fa-star' : 'far fa-star';
+        icon.className = count > 0 && i <= Math.round(average) ? 'fas fa-star' : 'far fa-star';
         avgStars.appendChild(icon);
     }
 
-    // Calculate rating distribution
-    const distribution = [0, 0, 0, 0, 0];
-    reviews.forEach(r => {
-        distribution[r.rating - 1]++;
-    });
-
     // Update rating bars
     for (let i = 1; i <= 5; i++) {
-        const count = distribution[i - 1];
-        const percent = reviews.length > 0 ? (count / reviews.length * 100).toFixed(0) : 0;
+        const stars = summary.histogram ? summary.histogram[i] || 0 : 0;
+        const percent = count > 0 ? (stars / count * 100).toFixed(0) : 0;
         document.getElementById(`bar${i}`).style.width = `${percent}%`;
         document.getElementById(`percent${i}`).textContent = `${percent}%`;
     }
 }
 
-// Load comments
-async function loadComments(movieId) {
+// Load comments (pages of whole threads)
+let commentsCursor = null;
+let commentsMovieId = null;
+
+async function loadComments(movieId, cursor = null) {
     try {
-        const response = await fetch(`/api/comments?movie_id=${movieId}`);
+        let url = `/api/comments?movie_id=${movieId}`;
+        if (cursor) {
+            url += `&cursor=${encodeURIComponent(cursor)}`;
+        }
+        const response = await fetch(url);
         const data = await response.json();
         
         if (data.success && data.data) {
-            displayComments(data.data);
+            commentsCursor = data.next_cursor;
+            commentsMovieId = movieId;
+            displayComments(data.data, Boolean(cursor));
         }
     } catch (error) {
         console.error('Error loading comments:', error);
     }
 }
 
-// Display comments
-function displayComments(comments) {
+// Count a thread (comment + all replies)
+function countThread(comment) {
+    return 1 + (comment.replies || []).reduce((sum, reply) => sum + countThread(reply), 0);
+}
+
+// Build one comment with its replies nested below
+function createCommentItem(comment, depth = 0) {
+    const commentItem = document.createElement('div');
+    commentItem.className = depth > 0 ? 'comment-item comment-reply' : 'comment-item';
+    
+    const date = new Date(comment.created_at).toLocaleDateString('vi-VN');
+    
+    commentItem.innerHTML = `
+        <div class="comment-header">
+            <div class="user-info">
+                <img src="https://ui-avatars.com/api/?name=${encodeURIComponent(comment.user_name)}&background=e50914&color=fff" alt="${comment.user_name}">
+                <div>
+                    <div class="name">${comment.user_name}</div>
+                    <div class="date">${date}</div>
+                </div>
+            </div>
+        </div>
+        <div class="comment-text">${comment.comment_text}</div>
+        <button class="comment-reply-btn" onclick="replyToComment(${comment.id})">
+            <i class="fas fa-reply"></i> Trả lời${comment.reply_count ? ` (${comment.reply_count})` : ''}
+        </button>
+    `;
+    
+    (comment.replies || []).forEach(reply => {
+        commentItem.appendChild(createCommentItem(reply, depth + 1));
+    });
+    return commentItem;
+}
+
+// Display comments (append = next page)
+function displayComments(comments, append = false) {
     const commentsList = document.getElementById('commentsList');
     const commentCount = document.getElementById('commentCount');
     
-    commentCount.textContent = comments.length;
-    commentsList.innerHTML = '';
+    const oldButton = document.getElementById('loadMoreComments');
+    if (oldButton) {
+        oldButton.remove();
+    }
+    const shown = comments.reduce((sum, comment) => sum + countThread(comment), 0);
+    commentCount.textContent = (append ? Number(commentCount.textContent) : 0) + shown;
+    if (!append) {
+        commentsList.innerHTML = '';
+    }
 
-    if (comments.length === 0) {
+    if (!append && comments.length === 0) {
         commentsList.innerHTML = '<p style="text-align: center; color: #888;">Chưa có bình luận nào.</p>';
         return;
     }
 
     comments.forEach(comment => {
-        const commentItem = document.createElement('div');
-        commentItem.className = 'comment-item';
-        
-        const date = new Date(comment.created_at).toLocaleDateString('vi-VN');
-        
-        commentItem.innerHTML = `
-            <div class="comment-header">
-                <div class="user-info">
-                    <img src="https://ui-avatars.com/api/?name=${encodeURIComponent(comment.user_name)}&background=e50914&color=fff" alt="${comment.user_name}">
-                    <div>
-                        <div class="name">${comment.user_name}</div>
-                        <div class="date">${date}</div>
-                    </div>
-                </div>
-            </div>
-            <div class="comment-text">${comment.comment_text}</div>
-        `;
-        
-        commentsList.appendChild(commentItem);
+        commentsList.appendChild(createCommentItem(comment));
     });
+
+    if (commentsCursor) {
+        const loadMore = document.createElement('button');
+        loadMore.id = 'loadMoreComments';
+        loadMore.className = 'btn btn-secondary';
+        loadMore.textContent = 'Xem thêm bình luận';
+        loadMore.onclick = () => loadComments(commentsMovieId, commentsCursor);
+        commentsList.appendChild(loadMore);
+    }
 }
 
 // Switch tab
@@ -755,10 +808,10 @@ async function checkIfFavorite(movieId) {
 
     try {
         // user_id is handled by the session on the backend
-        const response = await api.get(`/api/favorites`);
+        const response = await api.get(`/api/favorites/contains?ids=${parseInt(movieId)}`);
         
         if (response.success && response.data) {
-            const favoriteCheck = response.data.some(fav => fav.movie_id === parseInt(movieId));
+            const favoriteCheck = response.data[parseInt(movieId)] === true;
             isFavorited = favoriteCheck;
             
             // Update heart button (poster)
@@ -870,6 +923,21 @@ async function submitReview() {
     }
 }
 
+// Reply to a comment: the next posted comment goes under it
+let replyingTo = null;
+
+function replyToComment(commentId) {
+    if (!currentUser) {
+        showLoginToast('Đăng nhập để bình luận!');
+        return;
+    }
+    replyingTo = commentId;
+    const textarea = document.getElementById('commentText');
+    textarea.placeholder = 'Viết câu trả lời...';
+    textarea.scrollIntoView({ behavior: 'smooth', block: 'center' });
+    textarea.focus();
+}
+
 // Post comment
 async function postComment() {
     if (!currentUser) {
@@ -888,11 +956,14 @@ async function postComment() {
         // user_id is handled by the session on the backend
         const response = await api.post('/api/comments', {
             movie_id: currentMovie.id,
-            comment_text: commentText
+            comment_text: commentText,
+            parent_id: replyingTo
         });
         
         if (response.success) {
             document.getElementById('commentText').value = '';
+            replyingTo = null;
+            document.getElementById('commentText').placeholder = 'Chia sẻ suy nghĩ của bạn về bộ phim...';
             loadComments(currentMovie.id);
             showSuccessToast('Đã gửi bình luận thành công!');
         } else {